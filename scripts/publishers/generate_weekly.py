@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 generate_weekly.py — Genera el weekly recap + dashboard HTML + PR al blog.
-Toma los datos de noticias_historico.json y produce los entregables.
+Toma los datos del histórico de noticias y produce los entregables.
 
 Uso:
     python generate_weekly.py                           # Modo normal
@@ -21,16 +21,18 @@ from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
 
+import aiohttp
 from google import genai
 
-from scripts.utils.constants_downloadfile import CONFIG, HTML_TEMPLATE, MD_TEMPLATE, SKILLS, LLMS, LENGUAJES, FRAMEWORKS, LIBRERIAS, CATEGORIAS, JS_CONFIG, FALLBACK_GITHUB_IMAGE, FALLBACK_SNEAK_PEEK, FALLBACK_NOTA_PERSONAL, SUBTIPO_KEY, TIPO_KEY, ORIGEN_KEY, SUB_VAL_GITHUB, TIPO_VAL_NOTICIA, VAL_RSS, ENLACE_KEY, FUENTE_KEY, TS_KEY, FECHA_PUB_KEY, CATEGORIA_KEY, ESTRELLAS_KEY, TITULO_KEY, FECHA_REAL_KEY, ID_VIDEO_KEY, LENGUAJE_KEY, DESCRIPCION_KEY, SUB_VAL_GITHUB_TOPIC, SUB_VAL_GITHUB_COLLECTION, SUB_VAL_PRODUCTHUNT, TIPO_VAL_HERRAMIENTA, TIPO_VAL_VIDEO, TIPO_VAL_SHORTS, TIPO_VAL_LIVE, FUENTES, YT_KEY, NOTICIAS_FILENAME, HERRAMIENTAS_FILENAME, LOGS_DIR, LOG_FILES, DASHBOARD_DIR, DASHBOARD_HTML, AUTO_NEWS_DIR, BLOG_AUTO_NEWS_REL
+from scripts.utils.constants_downloadfile import CONFIG, HTML_TEMPLATE, MD_TEMPLATE, SKILLS, LLMS, LENGUAJES, FRAMEWORKS, LIBRERIAS, CATEGORIAS, JS_CONFIG, FALLBACK_GITHUB_IMAGE, FALLBACK_SNEAK_PEEK, FALLBACK_NOTA_PERSONAL, SUBTIPO_KEY, TIPO_KEY, ORIGEN_KEY, SUB_VAL_GITHUB, TIPO_VAL_NOTICIA, VAL_RSS, ENLACE_KEY, FUENTE_KEY, TS_KEY, FECHA_PUB_KEY, CATEGORIA_KEY, ESTRELLAS_KEY, TITULO_KEY, FECHA_REAL_KEY, ID_VIDEO_KEY, LENGUAJE_KEY, DESCRIPCION_KEY, SUB_VAL_GITHUB_TOPIC, SUB_VAL_GITHUB_COLLECTION, SUB_VAL_PRODUCTHUNT, TIPO_VAL_HERRAMIENTA, TIPO_VAL_VIDEO, TIPO_VAL_SHORTS, TIPO_VAL_LIVE, FUENTES, YT_KEY, TRADUCIDO_KEY, HERRAMIENTAS_FILENAME, LOGS_DIR, LOG_FILES, DASHBOARD_DIR, DASHBOARD_HTML, AUTO_NEWS_DIR, BLOG_AUTO_NEWS_REL
 
 # Acceder a valores anidados dentro de JS_CONFIG
 ALL_YT_CHANNELS = JS_CONFIG.get("ALL_YT_CHANNELS", [])
 TABS_MULTIMEDIA = JS_CONFIG.get("TABS_MULTIMEDIA", [])
 EMOJIS_CATEGORIA_MAP = {v: JS_CONFIG.get("EMOJIS_CATEGORIA", "⚡🤖💻🐳🔒📊🎓💡")[i] for i, v in enumerate(["Hardware", "IA", "Programacion", "DevOps", "Ciberseguridad", "Negocios", "General", "Otro"]) if i < len(JS_CONFIG.get("EMOJIS_CATEGORIA", "⚡🤖💻🐳🔒📊🎓💡"))}
 from scripts.scrapers.scraper_base import ScraperPro
-from scripts.utils.common import load_json, save_json, generar_imagen_noticia, obtener_recap_semanal_ia, deduplicar_items, traducir_titulos_ia
+from scripts.utils.history_store import IHistoryStore, usar_historico
+from scripts.utils.common import generar_imagen_noticia, obtener_recap_semanal_ia, deduplicar_items, traducir_titulos_ia
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 logging.basicConfig(
@@ -395,7 +397,8 @@ def render_github_ranking(herramientas: list) -> str:
 
 
 
-def generar_dashboard_html(historial, herramientas, scr, fecha_h, ahora, resumen_ia):
+def generar_dashboard_html(historial, herramientas, avatars_known: dict, fecha_h, ahora, resumen_ia):
+    """``avatars_known``: nombre de canal → URL de avatar (solo los reales en caché, sin ui-avatars)."""
     historial.sort(key=lambda x: x.get(TS_KEY, ""), reverse=True)
     herramientas_github = [
         h for h in herramientas
@@ -404,9 +407,6 @@ def generar_dashboard_html(historial, herramientas, scr, fecha_h, ahora, resumen
     herramientas_github.sort(key=lambda h: int(h.get(ESTRELLAS_KEY, "0")), reverse=True)
     top_github = herramientas_github[:100]
 
-    # Completar avatares — only real cached avatars, no ui-avatars fallback
-    avatars_known = getattr(scr, "avatar_repo", None) and scr.avatar_repo.avatars or {}
-
     # === Renderizar todas las secciones ===
     stats_html = render_stats(historial)
     video_items = [n for n in historial if n.get(ID_VIDEO_KEY)]
@@ -653,31 +653,38 @@ async def generar_recap(noticias_web, client, blog_path: str | None = None) -> s
     return introduccion
 
 
-async def run():
+async def run(argv: list[str] | None = None, store: IHistoryStore | None = None, scr: ScraperPro | None = None):
+    """Con ``store``/``scr`` compartidos no los cierra ni guarda los avatares (lo hace quien los creó)."""
     parser = argparse.ArgumentParser(description="Generate weekly recap + dashboard + PR")
     parser.add_argument("--no-pr", action="store_true", help="Skip PR creation")
     parser.add_argument("--dashboard-only", action="store_true", help="Only regenerate dashboard HTML (skip AI recap and blog PR)")
     parser.add_argument("--blog-path", default=None, help="Path to blog checkout")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     logger.info("🚀 Iniciando generate_weekly.py")
-    scr = ScraperPro()
-
-    path_json = os.path.join(CONFIG["FOLDER"], NOTICIAS_FILENAME)
-    historial = load_json(path_json)
-    if not historial:
-        logger.warning("⚠️ No hay noticias en el histórico. Ejecuta scrape_news.py primero.")
-        return
-    historial = deduplicar_items(historial)
-
-    ahora = datetime.now()
-    fecha_h = ahora.strftime("%d/%m/%Y")
-
-    client = genai.Client(api_key=CONFIG.get("GEMINI_KEY"))
-
-    # Traducir títulos pendientes antes de renderizar
-    historial = await traducir_titulos_ia(historial, client)
-    save_json(path_json, historial)
+    scr_propio = scr is None
+    if scr_propio:
+        scr = ScraperPro()
+
+    with usar_historico(store) as historico:
+        historial = historico.todos()
+        if not historial:
+            logger.warning("⚠️ No hay noticias en el histórico. Ejecuta scrape_news.py primero.")
+            return
+        deduplicados = deduplicar_items(historial)
+        conservados = {n.get(ENLACE_KEY) for n in deduplicados}
+        historico.eliminar({n.get(ENLACE_KEY) for n in historial} - conservados)
+        historial = deduplicados
+
+        ahora = datetime.now()
+        fecha_h = ahora.strftime("%d/%m/%Y")
+
+        client = genai.Client(api_key=CONFIG.get("GEMINI_KEY"))
+
+        # Traducir títulos pendientes antes de renderizar (solo se reescriben esos)
+        pendientes = [n for n in historial if not n.get(TRADUCIDO_KEY)]
+        await traducir_titulos_ia(pendientes, client)
+        historico.actualizar(pendientes)
 
     if args.dashboard_only:
         logger.info("ℹ️ Modo --dashboard-only: saltando recap IA y PR.")
@@ -690,16 +697,18 @@ async def run():
             titulares = [f"• {n['titulo']}" for n in noticias_web[:10]]
             resumen_ia = "Resumen de hoy:\n\n" + "\n".join(titulares)
 
-    # Precargar avatares de todos los canales YouTube
-    for nombre, info in FUENTES.items():
-        if YT_KEY in info:
-            nombre_c = nombre.replace(" Shorts", "")
-            yt_url = info[YT_KEY]
-            scr.obtener_avatar_canal(nombre_c, yt_url)
-
-    herramientas = cargar_herramientas()
-    generar_dashboard_html(historial, herramientas, scr, fecha_h, ahora, resumen_ia or "Sin novedades hoy.")
-    scr.guardar_avatars()
+    # Precargar avatares de todos los canales YouTube (en paralelo; los caducados
+    # se refrescan mientras se renderiza el dashboard)
+    canales = {nombre.replace(" Shorts", ""): info[YT_KEY] for nombre, info in FUENTES.items() if YT_KEY in info}
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False)) as session:
+        await scr.avatar_repo.prefetch(session, canales)
+        herramientas = cargar_herramientas()
+        # Copia de los avatares: los refrescos en curso escriben en el dict mientras el hilo renderiza
+        avatars = dict(scr.avatar_repo.avatars)
+        await asyncio.to_thread(generar_dashboard_html, historial, herramientas, avatars, fecha_h, ahora, resumen_ia or "Sin novedades hoy.")
+        await scr.avatar_repo.esperar_refrescos()
+    if scr_propio:
+        scr.guardar_avatars()
 
     logger.info("✅ generate_weekly.py completado.")
     if args.no_pr or args.dashboard_only:
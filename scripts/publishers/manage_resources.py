@@ -13,7 +13,9 @@ from urllib.parse import urlparse
 
 from google import genai
 
+from scripts.utils.canonical_url import canonicalizar_url
 from scripts.utils.constants_downloadfile import CONFIG, BLOG_PATH_DEFAULT, HERRAMIENTAS_PATH_DEFAULT
+from scripts.utils.translation_memory import abrir_memoria
 
 RESOURCES_PER_FILE = 500
 SECTION_ID = "nuevas-herramientas"
@@ -210,12 +212,12 @@ def merge_sections(sections: list[tuple[str, str]]) -> list[tuple[str, str]]:
             r'<ResourceCard\b[^>]*?/>',
             re.DOTALL,
         )
-        seen_urls = set(extract_card_urls("\n".join(merged.get(cat, []))))
+        seen_urls = {canonicalizar_url(u) for u in extract_card_urls("\n".join(merged.get(cat, [])))}
         for card in card_pattern.findall(text):
             url_match = re.search(r'href="(https?://[^"]+)"', card)
-            if url_match and url_match.group(1) not in seen_urls:
+            if url_match and canonicalizar_url(url_match.group(1)) not in seen_urls:
                 merged[cat].append(card)
-                seen_urls.add(url_match.group(1))
+                seen_urls.add(canonicalizar_url(url_match.group(1)))
 
     result = []
     for cat in merged:
@@ -290,7 +292,7 @@ def deduplicate_all_files(posts_dir: Path) -> int:
                 for card_match in card_pattern.finditer(part_content):
                     card_text = card_match.group(0)
                     url_match = url_pattern.search(card_text)
-                    url = url_match.group(1) if url_match else ""
+                    url = canonicalizar_url(url_match.group(1)) if url_match else ""
                     if url and url not in global_seen_urls:
                         global_seen_urls.add(url)
                         unique_cards.append(card_text)
@@ -338,6 +340,7 @@ def translate_descriptions(posts_dir: Path):
         print("⚠️  No se encontró GEMINI_KEY en CONFIG ni GEMINI_API_KEY en entorno.")
         return
     client = genai.Client(api_key=api_key)
+    memoria = abrir_memoria()
 
     card_pattern = re.compile(
         r'<ResourceCard\b[^>]*?/>',
@@ -373,8 +376,20 @@ def translate_descriptions(posts_dir: Path):
         if not to_translate:
             continue
 
-        # Build batch prompt
-        lines = [f"{i}: {desc}" for i, (_, _, desc) in enumerate(to_translate)]
+        # Descriptions already translated in earlier runs come from the translation memory
+        translated = {}
+        pending = []
+        for idx, (_, _, desc) in enumerate(to_translate):
+            tr = memoria.buscar(desc)
+            if tr:
+                translated[idx] = tr
+            else:
+                pending.append(idx)
+        if translated:
+            print(f"   🧠 {len(translated)} descripciones desde la memoria de traducciones")
+
+        # Build batch prompt (only for descriptions never seen)
+        lines = [f"{i}: {to_translate[idx][2]}" for i, idx in enumerate(pending)]
         batch_text = "\n".join(lines)
         prompt = (
             "Traduce al español las siguientes descripciones de herramientas/recursos tecnológicos. "
@@ -384,15 +399,20 @@ def translate_descriptions(posts_dir: Path):
         )
 
         modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
-        translated = {}
-        for modelo in modelos:
+        for modelo in (modelos if pending else []):
             try:
-                print(f"   🤖 Traduciendo {len(to_translate)} descripciones con {modelo}...")
+                print(f"   🤖 Traduciendo {len(pending)} descripciones con {modelo}...")
                 response = client.models.generate_content(model=modelo, contents=prompt)
                 raw_text = response.text if response.text else "[]"
                 clean = re.sub(r'```(?:json)?\s*|\s*```', '', raw_text.strip())
                 data = json.loads(clean)
-                translated = {item["id"]: item["tr"] for item in data if "tr" in item}
+                for item in data:
+                    i = item.get("id")
+                    if "tr" in item and isinstance(i, int) and 0 <= i < len(pending):
+                        idx = pending[i]
+                        translated[idx] = item["tr"]
+                        memoria.guardar(to_translate[idx][2], item["tr"], origen=modelo)
+                memoria.guardar_si_cambio()
                 break
             except Exception as e:
                 print(f"   ⚠️  Error con {modelo}: {e}")
@@ -826,10 +846,10 @@ def main():
 
         all_existing_urls = set()
         for rf in existing_files:
-            all_existing_urls |= extract_existing_urls(rf.read_text(encoding="utf-8"))
+            all_existing_urls |= {canonicalizar_url(u) for u in extract_existing_urls(rf.read_text(encoding="utf-8"))}
 
         for h in herramientas:
-            url = h.get("enlace", "")
+            url = canonicalizar_url(h.get("enlace", ""))
             if url and url not in all_existing_urls:
                 new_tools.append(h)
                 all_existing_urls.add(url)
@@ -185,6 +185,7 @@ def parse_freefordev(text):
 
 
 from scripts.publishers.manage_resources import format_card as make_card
+from scripts.utils.canonical_url import canonicalizar_url
 
 
 def make_section_header(name):
@@ -265,7 +266,7 @@ def main():
     free_dev_path = Path(args.free_dev_file)
 
     content = resources_path.read_text(encoding="utf-8")
-    existing_urls = extract_existing_urls(content)
+    existing_urls = {canonicalizar_url(u) for u in extract_existing_urls(content)}
     existing_sections = extract_existing_sections(content)
     
     f_text = free_dev_path.read_text(encoding="utf-8")
@@ -285,11 +286,9 @@ def main():
             continue
         
         url_clean = url.rstrip("/")
-        if url_clean in existing_urls or url_clean + "/" in existing_urls:
+        if canonicalizar_url(url_clean) in existing_urls:
             continue
-        if any(u.rstrip("/") == url_clean for u in existing_urls):
-            continue
-        existing_urls.add(url_clean)
+        existing_urls.add(canonicalizar_url(url_clean))
         
         # Map category
         blog_cat = CAT_MAP.get(section_lower, section)
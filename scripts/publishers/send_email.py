@@ -20,8 +20,9 @@ from collections import defaultdict
 import requests
 from google import genai
 
-from scripts.utils.constants_downloadfile import CONFIG, EMAIL_TEMPLATE, EMAIL_ROW_TEMPLATE, EMAIL_SOURCE_HEADER, EMAIL_VIDEO_HEADER, EMAIL_VIDEO_ROW, PROMPT_TRADUCIR_TITULOS, ENLACE_KEY, FUENTE_KEY, TITULO_KEY, ID_VIDEO_KEY, BADGE_KEY, VAL_TECH, TIPO_KEY, NOTICIAS_FILENAME, LOGS_DIR, LOG_FILES
-from scripts.utils.common import load_json, save_json, resumir_noticia
+from scripts.utils.constants_downloadfile import CONFIG, EMAIL_TEMPLATE, EMAIL_ROW_TEMPLATE, EMAIL_SOURCE_HEADER, EMAIL_VIDEO_HEADER, EMAIL_VIDEO_ROW, ENLACE_KEY, FUENTE_KEY, TITULO_KEY, ID_VIDEO_KEY, BADGE_KEY, VAL_TECH, TIPO_KEY, LOGS_DIR, LOG_FILES
+from scripts.utils.common import resumir_noticias, traducir_titulos_ia
+from scripts.utils.history_store import IHistoryStore, usar_historico
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 logging.basicConfig(
@@ -144,52 +145,28 @@ def get_source_style(fuente: str) -> dict:
             return style
     return SOURCE_STYLES["default"]
 
-async def traducir_titulo(titulo: str, client) -> str:
-    """Traduce un título al español usando Gemini."""
-    modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
-    prompt = PROMPT_TRADUCIR_TITULOS.format(texto_a_traducir=f"0|{titulo}")
-    for modelo in modelos:
-        try:
-            response = client.models.generate_content(model=modelo, contents=prompt)
-            if response and response.text:
-                import json as _json
-                data = _json.loads(response.text.strip().removeprefix("```json").removesuffix("```").strip())
-                trads = data.get("traducciones", [])
-                if trads and trads[0].get("tr"):
-                    return trads[0]["tr"]
-        except Exception:
-            continue
-    return titulo
-
-
-
-def _es_multimedia(item: dict) -> bool:
-    return item.get(ID_VIDEO_KEY) is not None
-
-async def run():
+async def run(argv: list[str] | None = None, store: IHistoryStore | None = None):
+    """Con un ``store`` compartido (scripts/tools/downloadFile.py) no lo cierra."""
     parser = argparse.ArgumentParser(description="Send email newsletter with AI per-news summaries")
     parser.add_argument("--dry-run", action="store_true", help="Preview without sending")
     parser.add_argument("--max-items", type=int, default=10, help="Max news to process (default 10)")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not CONFIG.get("MAIL_KEY") or not CONFIG.get("MAIL_DOMAIN") or not CONFIG.get("EMAIL_TO"):
         logger.warning("⚠️ Configuración de Mailgun incompleta. Revisa secrets.")
         return
 
     logger.info("📧 Iniciando send_email.py (con resúmenes IA por noticia)")
-    path_json = os.path.join(CONFIG["FOLDER"], NOTICIAS_FILENAME)
-    historial = load_json(path_json)
+    # Separar videos y noticias (solo se leen los más recientes de cada tipo)
+    with usar_historico(store) as historico:
+        todos_videos = historico.ultimos(10, videos=True)
+        nuevos = historico.ultimos(args.max_items, videos=False)
 
-    if not historial:
+    if not todos_videos and not nuevos:
         logger.info("📭 No hay noticias para enviar.")
         return
 
-    # Separar videos y noticias
-    todos_videos = [n for n in historial if _es_multimedia(n)][:10]
-    historial = [n for n in historial if not _es_multimedia(n)]
-
     client = genai.Client(api_key=CONFIG.get("GEMINI_KEY"))
-    nuevos = historial[:args.max_items]
 
     # Generar sección de videos
     filas_videos = ""
@@ -222,7 +199,15 @@ async def run():
         asunto = f"🔥 {top_titular[:55]}... y {len(nuevos)-1} más"
         c_tech = len([x for x in nuevos if x.get(BADGE_KEY) == VAL_TECH])
 
-        logger.info(f"🤖 Generando resúmenes IA para {len(nuevos)} noticias...")
+        # Un solo lote (memoria de traducciones + Gemini) en vez de una llamada por título
+        await traducir_titulos_ia([n for n in nuevos if not n.get('traducido')], client)
+
+        # Descargas, extracción y resúmenes a la vez: tarda lo que el artículo más lento
+        resumidas = await resumir_noticias(nuevos, client)
+        if resumidas and not args.dry_run:
+            # Al histórico ya: si el envío falla, el reintento no vuelve a resumirlas
+            with usar_historico(store) as historico:
+                historico.actualizar(nuevos)
 
         # Agrupar noticias por fuente
         por_fuente = defaultdict(list)
@@ -241,20 +226,9 @@ async def run():
             for n in items:
                 icon = style["icon"]
                 titulo_original = n['titulo']
-
-                if n.get('traducido'):
-                    titulo_es = titulo_original
-                else:
-                    logger.info(f"  Traduciendo: {titulo_original[:60]}...")
-                    titulo_es = await traducir_titulo(titulo_original, client)
-                    n['traducido'] = True
+                titulo_es = titulo_original
 
                 resumen = n.get('resumen')
-                if not resumen:
-                    logger.info(f"  Resumiendo: {titulo_original[:60]}...")
-                    resumen = await resumir_noticia(n, client)
-                    if resumen:
-                        n['resumen'] = resumen
 
                 resumen_html = f'<p style="color: #64748b; font-size: 12px; line-height: 1.4; margin: 4px 0 0 0; padding-left: 0; font-style: italic;">{resumen}</p>' if resumen else ""
 
@@ -295,7 +269,8 @@ async def run():
         r = requests.post(url_mailgun, auth=auth, data=data, timeout=30)
         if r.status_code == 200:
             logger.info("✅ Newsletter con resúmenes IA enviada exitosamente.")
-            save_json(path_json, historial)
+            with usar_historico(store) as historico:
+                historico.actualizar(nuevos)
         else:
             logger.error(f"❌ Error Mailgun ({r.status_code}): {r.text}")
     except Exception as e:
@@ -14,16 +14,17 @@ import json
 import logging
 import os
 import re
-from datetime import datetime
+from datetime import datetime, timedelta
 from logging.handlers import RotatingFileHandler
 
 import edge_tts
 import requests
 from google import genai
 
-from scripts.utils.cache import CacheManager, FileCache
-from scripts.utils.constants_downloadfile import CONFIG, TELEGRAM_TTS_VOZ, TELEGRAM_DASHBOARD_URL, PROMPT_TRADUCIR_TITULOS, ENLACE_KEY, FUENTE_KEY, TITULO_KEY, FECHA_PUB_KEY, F_KEY, ID_VIDEO_KEY, TS_KEY, NOTICIAS_FILENAME, TELEGRAM_SENT_FILENAME, TELEGRAM_VOICE_SENT_FILENAME, LOGS_DIR, LOG_FILES
-from scripts.utils.common import load_json, save_json
+from scripts.utils.cache import CacheManager, FileCache, abrir_cache
+from scripts.utils.common import traducir_titulos_ia
+from scripts.utils.constants_downloadfile import CONFIG, TELEGRAM_TTS_VOZ, TELEGRAM_DASHBOARD_URL, ENLACE_KEY, FUENTE_KEY, TITULO_KEY, FECHA_PUB_KEY, F_KEY, ID_VIDEO_KEY, TELEGRAM_SENT_FILENAME, TELEGRAM_VOICE_SENT_FILENAME, LOGS_DIR, LOG_FILES
+from scripts.utils.history_store import IHistoryStore, usar_historico
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 logging.basicConfig(
@@ -39,7 +40,7 @@ logger = logging.getLogger("telegram")
 SENT_LOG = TELEGRAM_SENT_FILENAME
 VOICE_SENT_LOG = TELEGRAM_VOICE_SENT_FILENAME
 
-CACHE = CacheManager(FileCache(SENT_LOG), ttl_hours=168)  # 7 días
+CACHE = abrir_cache(SENT_LOG, ttl_hours=168)  # 7 días (telegram_sent.db)
 VOICE_CACHE = CacheManager(FileCache(VOICE_SENT_LOG), ttl_hours=24)  # 1 día
 
 # Emojis para stripping del texto de voz
@@ -61,24 +62,6 @@ def strip_emojis(text: str) -> str:
     return EMOJI_PATTERN.sub("", text).strip()
 
 
-async def traducir_titulo(titulo: str, client) -> str:
-    """Traduce un título al español usando Gemini."""
-    modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
-    prompt = PROMPT_TRADUCIR_TITULOS.format(texto_a_traducir=f"0|{titulo}")
-    for modelo in modelos:
-        try:
-            response = client.models.generate_content(model=modelo, contents=prompt)
-            if response and response.text:
-                import json as _json
-                data = _json.loads(response.text.strip().removeprefix("```json").removesuffix("```").strip())
-                trads = data.get("traducciones", [])
-                if trads and trads[0].get("tr"):
-                    return trads[0]["tr"]
-        except Exception:
-            continue
-    return titulo
-
-
 def enviar_mensaje(texto: str, chat_id: str, token: str, reply_markup: dict | None = None) -> bool:
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {
@@ -198,43 +181,31 @@ def marcar_voz_enviada(noticias_titles: list[str] | None = None):
             json.dump(datos, f)
 
 
-async def run():
+async def run(argv: list[str] | None = None, store: IHistoryStore | None = None):
+    """Con un ``store`` compartido (scripts/tools/downloadFile.py) no lo cierra."""
     parser = argparse.ArgumentParser(description="Send Telegram notifications")
     parser.add_argument("--dry-run", action="store_true", help="Preview without sending")
     parser.add_argument("--max-items", type=int, default=15, help="Max news to send per run (default 15)")
     parser.add_argument("--force-voice", action="store_true", help="Force voice message even if already sent today")
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     if not CONFIG.get("TELEGRAM_TOKEN") or not CONFIG.get("TELEGRAM_CHAT_ID"):
         logger.warning("⚠️ Configuración de Telegram incompleta. Revisa secrets.")
         return
 
     logger.info("📱 Iniciando send_telegram.py")
-    path_json = os.path.join(CONFIG["FOLDER"], NOTICIAS_FILENAME)
-    historial = load_json(path_json)
+    # Noticias de las últimas 24h (sin vídeos); solo se leen esas del histórico
+    cutoff = datetime.now() - timedelta(hours=24)
+    with usar_historico(store) as historico:
+        historial = [n for n in historico.desde(cutoff, incluir_sin_fecha=True) if not n.get(ID_VIDEO_KEY)]
     if not historial:
-        logger.info("📭 No hay noticias en el histórico.")
+        logger.info("📭 No hay noticias en el histórico de las últimas 24h.")
         return
 
     client = genai.Client(api_key=CONFIG.get("GEMINI_KEY"))
 
-    # Filtrar noticias recientes (últimas 24h) y que no estén en caché
-    from datetime import timedelta
-    cutoff = datetime.now() - timedelta(hours=24)
-    recientes = []
-    for n in historial:
-        if n.get(ID_VIDEO_KEY):
-            continue
-        ts = n.get(TS_KEY, "")
-        if ts:
-            try:
-                fecha = datetime.fromisoformat(ts.replace("Z", "+00:00").replace("+00:00", ""))
-                if fecha < cutoff:
-                    continue
-            except (ValueError, AttributeError):
-                pass
-        if CACHE.is_new(n.get(ENLACE_KEY, "")):
-            recientes.append(n)
+    # Filtrar las que no estén en caché
+    recientes = CACHE.filter_new(historial)
 
     nuevos = recientes[:args.max_items]
     if not nuevos:
@@ -247,16 +218,12 @@ async def run():
 
     titulares_enviados = []
 
+    # Un solo lote (memoria de traducciones + Gemini) en vez de una llamada por título
+    await traducir_titulos_ia([n for n in nuevos if not n.get('traducido')], client)
+
     for n in nuevos:
         icono = "💻"
-        titulo_original = n[TITULO_KEY]
-
-        if n.get('traducido'):
-            titulo_es = titulo_original
-        else:
-            logger.info(f"🤖 Traduciendo: {titulo_original[:60]}...")
-            titulo_es = await traducir_titulo(titulo_original, client)
-            n['traducido'] = True
+        titulo_es = n[TITULO_KEY]
 
         titulo_safe = titulo_es.replace("_", "\\_").replace("*", "\\*").replace("[", "\\[").replace("`", "\\`")
         mensaje = f"{icono} *{titulo_safe}*\n\n[Abrir noticia]({n[ENLACE_KEY]})"
@@ -281,22 +248,7 @@ async def run():
         hora_actual = datetime.now().hour
         if args.force_voice or (not hoy_ya_se_envio_voz() and hora_actual >= 21):
             # Recopilar TODAS las noticias del día (no solo las enviadas en este run)
-            cutoff_voz = datetime.now() - timedelta(hours=24)
-            todas_hoy = []
-            for n in historial:
-                if n.get(ID_VIDEO_KEY):
-                    continue
-                ts = n.get(TS_KEY, "")
-                if ts:
-                    try:
-                        fecha = datetime.fromisoformat(ts.replace("Z", "+00:00").replace("+00:00", ""))
-                        if fecha < cutoff_voz:
-                            continue
-                    except (ValueError, AttributeError):
-                        pass
-                titulo = n.get(TITULO_KEY, "")
-                if titulo:
-                    todas_hoy.append(titulo)
+            todas_hoy = [n[TITULO_KEY] for n in historial if n.get(TITULO_KEY)]
 
             if todas_hoy:
                 resumen_voz = "Hoy en tecnología. " + ". ".join(todas_hoy) + ". Fin del resumen."
@@ -316,7 +268,8 @@ async def run():
 
     if not args.dry_run:
         CACHE.flush()
-        save_json(path_json, historial)
+        with usar_historico(store) as historico:
+            historico.actualizar(nuevos)
 
     logger.info("✅ send_telegram.py completado.")
 
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+browser_pool.py — Renderizado headless compartido para fuentes con JavaScript (SPA).
+
+Un único Chromium de larga duración con un pool de contextos reutilizables y una
+cola acotada de páginas. Cada contexto bloquea imágenes, fuentes y media, así
+que solo se descarga lo necesario para obtener el DOM renderizado.
+
+El navegador se arranca perezosamente en el primer ``renderizar`` (las
+ejecuciones sin fuentes "pw" no pagan el arranque). Si Playwright o Chromium no
+están disponibles, ``renderizar`` devuelve None y el llamante usa HTTP plano.
+
+Uso:
+  pool = BrowserPool(contextos=2, paginas=4)
+  html = await pool.renderizar(url, esperar_selector="article h2 a")
+  await pool.cerrar()
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger("scraper_base")
+
+RECURSOS_BLOQUEADOS = frozenset({"image", "font", "media"})
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
+
+
+def debe_bloquear(tipo_recurso: str) -> bool:
+    """True si el recurso no aporta al HTML renderizado."""
+    return tipo_recurso in RECURSOS_BLOQUEADOS
+
+
+async def _filtrar_ruta(route):
+    if debe_bloquear(route.request.resource_type):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class BrowserPool:
+    """Chromium compartido + contextos reutilizables + cola acotada de páginas."""
+
+    def __init__(self, contextos: int = 2, paginas: int = 4, timeout_ms: int = 20000):
+        self.n_contextos = contextos
+        self.timeout_ms = timeout_ms
+        self._paginas = asyncio.Semaphore(paginas)
+        self._contextos: list = []
+        self._turno = 0
+        self._lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+        self.disponible: bool | None = None  # None = aún sin arrancar
+        self.renderizadas = 0
+
+    async def _lanzar(self):
+        """Arranca Playwright y Chromium. Separado para poder sustituirlo en tests."""
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True)
+
+    async def _arrancar(self) -> bool:
+        async with self._lock:
+            if self.disponible is not None:
+                return self.disponible
+            try:
+                self._browser = await self._lanzar()
+                for _ in range(self.n_contextos):
+                    ctx = await self._browser.new_context(user_agent=USER_AGENT, locale="es-ES")
+                    await ctx.route("**/*", _filtrar_ruta)
+                    self._contextos.append(ctx)
+                self.disponible = True
+                logger.info(f"🧭 Navegador headless listo ({self.n_contextos} contextos).")
+            except ImportError:
+                logger.warning("⚠️ playwright no instalado; las fuentes 'pw' se leerán por HTTP plano.")
+                self.disponible = False
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo arrancar Chromium ({e}); las fuentes 'pw' se leerán por HTTP plano.")
+                self.disponible = False
+            return self.disponible
+
+    async def renderizar(self, url: str, esperar_selector: str | None = None) -> str | None:
+        """HTML tras ejecutar el JavaScript de la página, o None si no hay navegador o falla."""
+        if not await self._arrancar():
+            return None
+        async with self._paginas:
+            # Reparto round-robin: varias páginas pueden compartir contexto (caché, cookies)
+            ctx = self._contextos[self._turno % len(self._contextos)]
+            self._turno += 1
+            page = None
+            try:
+                page = await ctx.new_page()
+                await page.goto(url, wait_until="domcontentloaded", timeout=self.timeout_ms)
+                if esperar_selector:
+                    try:
+                        await page.wait_for_selector(esperar_selector, timeout=self.timeout_ms)
+                    except Exception:
+                        logger.debug(f"⏱️ Selector '{esperar_selector}' no apareció en {url}")
+                html_text = await page.content()
+                self.renderizadas += 1
+                return html_text
+            except Exception as e:
+                logger.warning(f"⚠️ Error renderizando {url}: {e}")
+                return None
+            finally:
+                if page is not None:
+                    await page.close()
+
+    async def cerrar(self):
+        """Cierra contextos, navegador y Playwright (si llegaron a arrancar)."""
+        for ctx in self._contextos:
+            await ctx.close()
+        self._contextos = []
+        if self._browser:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        self.disponible = None
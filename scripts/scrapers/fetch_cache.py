@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+fetch_cache.py — Validadores HTTP persistentes por URL (GET condicional).
+
+Guarda por cada URL el ETag, el Last-Modified y un hash del cuerpo. En la
+siguiente ejecución las peticiones salen con If-None-Match / If-Modified-Since;
+un 304 o un 200 con el mismo hash significan "sin cambios" y la fuente se salta.
+
+Uso:
+  cache = FetchCache("files/fetch_cache.json")
+  headers = {**base_headers, **cache.cabeceras(url)}
+  if response.status == 304:
+      cache.registrar_no_modificado(url)
+  elif cache.registrar_respuesta(url, response.headers, cuerpo):
+      ...  # contenido nuevo → parsear
+  cache.guardar_si_cambio()
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+logger = logging.getLogger("scraper_base")
+
+ETAG_KEY = "etag"
+LAST_MODIFIED_KEY = "last_modified"
+HASH_KEY = "hash"
+VISTO_KEY = "visto"
+
+# Entradas no consultadas en este tiempo se descartan al guardar
+RETENCION_DIAS = 30
+
+
+def hash_contenido(cuerpo: bytes | str) -> str:
+    """Huella estable del cuerpo de una respuesta."""
+    if isinstance(cuerpo, str):
+        cuerpo = cuerpo.encode("utf-8", errors="replace")
+    return hashlib.sha1(cuerpo).hexdigest()
+
+
+class FetchCache:
+    """Almacén de validadores HTTP con contadores de aciertos/fallos por ejecución."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entradas: dict[str, dict] = self._cargar()
+        self.cambios = False
+        self.hits_304 = 0
+        self.hits_hash = 0
+        self.misses = 0
+
+    def _cargar(self) -> dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning("⚠️ Error leyendo caché HTTP %s: %s", self.path, e)
+        return {}
+
+    def cabeceras(self, url: str) -> dict:
+        """Cabeceras condicionales para la URL (vacío si no hay validadores)."""
+        entrada = self.entradas.get(url)
+        if not entrada:
+            return {}
+        headers = {}
+        if entrada.get(ETAG_KEY):
+            headers["If-None-Match"] = entrada[ETAG_KEY]
+        if entrada.get(LAST_MODIFIED_KEY):
+            headers["If-Modified-Since"] = entrada[LAST_MODIFIED_KEY]
+        return headers
+
+    def registrar_no_modificado(self, url: str):
+        """Anota un 304 Not Modified."""
+        self.hits_304 += 1
+        entrada = self.entradas.get(url)
+        if entrada is not None:
+            entrada[VISTO_KEY] = datetime.now().isoformat()
+            self.cambios = True
+
+    def registrar_respuesta(self, url: str, headers, cuerpo: bytes | str, digest: str | None = None) -> bool:
+        """Actualiza los validadores tras un 200. Devuelve True si el contenido cambió.
+
+        ``digest`` permite al llamador aportar su propia huella (p. ej. cuando
+        solo ha leído una parte del cuerpo); si no, se calcula sobre ``cuerpo``.
+        """
+        digest = digest or hash_contenido(cuerpo)
+        anterior = self.entradas.get(url, {})
+        cambiado = anterior.get(HASH_KEY) != digest
+        if cambiado:
+            self.misses += 1
+        else:
+            self.hits_hash += 1
+        self.entradas[url] = {
+            ETAG_KEY: headers.get("ETag", "") if headers else "",
+            LAST_MODIFIED_KEY: headers.get("Last-Modified", "") if headers else "",
+            HASH_KEY: digest,
+            VISTO_KEY: datetime.now().isoformat(),
+        }
+        self.cambios = True
+        return cambiado
+
+    def olvidar(self, url: str):
+        """Descarta los validadores de una URL (p. ej. si su parseo falló)."""
+        if self.entradas.pop(url, None) is not None:
+            self.cambios = True
+
+    def _podar(self):
+        limite = (datetime.now() - timedelta(days=RETENCION_DIAS)).isoformat()
+        self.entradas = {u: e for u, e in self.entradas.items() if e.get(VISTO_KEY, "") >= limite}
+
+    def guardar_si_cambio(self):
+        if not self.cambios:
+            return
+        self._podar()
+        basedir = os.path.dirname(self.path) or "."
+        os.makedirs(basedir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.entradas, f, indent=1, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp, self.path)
+            self.cambios = False
+            logger.info("💾 Caché HTTP actualizada (%d URLs).", len(self.entradas))
+        except OSError as e:
+            logger.error("❌ Error escribiendo caché HTTP %s: %s", self.path, e)
+
+    @property
+    def hits(self) -> int:
+        return self.hits_304 + self.hits_hash
+
+    def resumen(self) -> str:
+        total = self.hits + self.misses
+        return (
+            f"🗄️ Caché HTTP: {self.hits}/{total} sin cambios "
+            f"(304: {self.hits_304}, mismo hash: {self.hits_hash}), {self.misses} descargas nuevas"
+        )
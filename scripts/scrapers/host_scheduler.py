@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+host_scheduler.py — Planificador de concurrencia por host para los scrapers.
+
+Cada hostname tiene su propio carril (semáforo) con un límite pequeño, y un
+semáforo global acota el total de peticiones en vuelo. Así fuentes de hosts
+distintos avanzan en paralelo sin martillear a un mismo origen.
+
+Ante un 429/503 el host entra en pausa (respetando Retry-After si viene, o con
+backoff exponencial si no) y las siguientes peticiones a ese host esperan.
+
+Uso:
+  scheduler = HostScheduler(limite_global=32, limite_por_host=2)
+  async with scheduler.turno(url):
+      async with session.get(url) as r:
+          if r.status in (429, 503):
+              scheduler.penalizar(url, r.headers.get("Retry-After"))
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger("scraper_base")
+
+# Carriles propios para hosts con muchas fuentes (158 canales de YouTube, GitHub…)
+LIMITES_HOST = {
+    "youtube.com": 4,
+    "github.com": 2,
+}
+
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 120.0
+ESTADOS_BACKOFF = (429, 503)
+
+
+def host_de(url: str) -> str:
+    """Hostname normalizado (sin www./m.) que identifica el carril."""
+    host = (urlparse(url).hostname or "").lower()
+    for prefijo in ("www.", "m."):
+        if host.startswith(prefijo):
+            host = host[len(prefijo):]
+    if host == "youtu.be":
+        return "youtube.com"
+    return host
+
+
+def segundos_retry_after(valor: str | None) -> float | None:
+    """Interpreta Retry-After (segundos o fecha HTTP). None si no es válido."""
+    if not valor:
+        return None
+    valor = valor.strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        fecha = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, fecha.timestamp() - time.time())
+
+
+class HostScheduler:
+    """Concurrencia global + carril por host con pausas adaptativas."""
+
+    def __init__(self, limite_global: int = 32, limite_por_host: int = 2, limites_host: dict | None = None):
+        self.limite_por_host = limite_por_host
+        self.limites_host = {**LIMITES_HOST, **(limites_host or {})}
+        self._global = asyncio.Semaphore(limite_global)
+        self._carriles: dict[str, asyncio.Semaphore] = {}
+        self._pausa_hasta: dict[str, float] = {}
+        self._fallos: dict[str, int] = {}
+
+    def _carril(self, host: str) -> asyncio.Semaphore:
+        if host not in self._carriles:
+            self._carriles[host] = asyncio.Semaphore(self.limites_host.get(host, self.limite_por_host))
+        return self._carriles[host]
+
+    @asynccontextmanager
+    async def turno(self, url: str):
+        """Reserva un hueco en el carril del host y en el cupo global."""
+        host = host_de(url)
+        async with self._carril(host):
+            espera = self._pausa_hasta.get(host, 0.0) - time.monotonic()
+            if espera > 0:
+                logger.info(f"⏳ {host} en pausa, esperando {espera:.1f}s...")
+                await asyncio.sleep(espera)
+            async with self._global:
+                yield
+
+    def penalizar(self, url: str, retry_after: str | None = None) -> float:
+        """Pone el host en pausa tras un 429/503. Devuelve los segundos de pausa."""
+        host = host_de(url)
+        self._fallos[host] = self._fallos.get(host, 0) + 1
+        espera = segundos_retry_after(retry_after)
+        if espera is None:
+            espera = BACKOFF_BASE ** self._fallos[host]
+        espera = min(espera, BACKOFF_MAX)
+        self._pausa_hasta[host] = max(self._pausa_hasta.get(host, 0.0), time.monotonic() + espera)
+        logger.warning(f"🐢 {host} limitado ({self._fallos[host]}º aviso). Pausa de {espera:.1f}s.")
+        return espera
+
+    def exito(self, url: str):
+        """Respuesta correcta: el backoff del host vuelve a empezar."""
+        self._fallos.pop(host_de(url), None)
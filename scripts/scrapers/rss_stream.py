@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+rss_stream.py — Lectura incremental de feeds RSS 2.0 / Atom con parada temprana.
+
+``LectorRSS`` se alimenta con trozos del cuerpo HTTP según llegan (XMLPullParser).
+Cada <item>/<entry> se convierte en una entrada (título, enlace, fecha) al
+cerrarse y se vacía, así que el árbol nunca contiene los ``content:encoded``
+completos. Al llegar a ``limite`` entradas deja de aceptar datos: usado como
+condición ``parar`` de ScraperPro._fetch, la conexión se suelta ahí mismo.
+
+Mismas reglas que el parseo anterior con ElementTree.fromstring:
+  - RSS: <item> hijos de <channel>; título, link y pubDate (o dc:date).
+  - Atom: cualquier <entry>; título, href del primer <link>, published (o updated).
+  - Se cuentan las primeras ``limite`` entradas, tengan o no título y enlace.
+
+Uso:
+  lector = LectorRSS(limite=12)
+  text = await scraper._fetch(session, url, parar=lector)
+  for titulo, enlace, fecha in lector.entradas: ...
+"""
+import json
+import logging
+from xml.etree import ElementTree
+
+from scripts.scrapers.fetch_cache import hash_contenido
+
+logger = logging.getLogger("scraper_base")
+
+LIMITE_ITEMS = 12
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+DC_DATE = "{http://purl.org/dc/elements/1.1/}date"
+
+
+class LectorRSS:
+    """Parser incremental de RSS/Atom que se detiene tras ``limite`` entradas."""
+
+    def __init__(self, limite: int = LIMITE_ITEMS):
+        self.limite = limite
+        self.entradas: list[tuple[str, str, str]] = []
+        self.error: str | None = None
+        self._parser = ElementTree.XMLPullParser(events=("start", "end"))
+        self._pila: list[str] = []
+        self._leidos = 0
+
+    @property
+    def completo(self) -> bool:
+        return len(self.entradas) >= self.limite or self.error is not None
+
+    def alimentar(self, datos: bytes | str) -> bool:
+        """Procesa un trozo del documento. Devuelve True cuando ya no hace falta leer más."""
+        if self.completo:
+            return True
+        try:
+            self._parser.feed(datos)
+            self._procesar_eventos()
+        except ElementTree.ParseError as e:
+            self.error = str(e)
+            logger.debug(f"⚠️ RSS mal formado tras {len(self.entradas)} entradas: {e}")
+        return self.completo
+
+    def __call__(self, buffer: bytes | bytearray) -> bool:
+        """Condición ``parar`` de _fetch: recibe el buffer acumulado y procesa solo lo nuevo."""
+        nuevo = bytes(buffer[self._leidos:])
+        self._leidos = len(buffer)
+        return self.alimentar(nuevo)
+
+    def digest(self, cuerpo: bytes | None = None) -> str:
+        """Huella de las entradas leídas (estable aunque el corte del cuerpo varíe).
+
+        Sin entradas (feed vacío, una página HTML, un XML de error) se hashea el cuerpo:
+        si no, todas esas respuestas compartirían huella y pasarían por "sin cambios".
+        """
+        if not self.entradas and cuerpo is not None:
+            return hash_contenido(cuerpo)
+        return hash_contenido(json.dumps(self.entradas, ensure_ascii=False))
+
+    def _procesar_eventos(self):
+        for evento, elem in self._parser.read_events():
+            if evento == "start":
+                self._pila.append(elem.tag)
+                continue
+            self._pila.pop()
+            padre = self._pila[-1] if self._pila else ""
+            if elem.tag == "item" and padre == "channel":
+                fecha = elem.findtext("pubDate", "") or elem.findtext(DC_DATE, "")
+                self._anadir(elem.findtext("title", ""), elem.findtext("link", ""), fecha, elem)
+            elif elem.tag == f"{ATOM}entry":
+                link_el = elem.find(f"{ATOM}link")
+                enlace = link_el.get("href", "") if link_el is not None else ""
+                fecha = elem.findtext(f"{ATOM}published", "") or elem.findtext(f"{ATOM}updated", "")
+                self._anadir(elem.findtext(f"{ATOM}title", ""), enlace, fecha, elem)
+            if self.completo:
+                return
+
+    def _anadir(self, titulo: str, enlace: str, fecha: str, elem):
+        self.entradas.append((titulo or "", enlace or "", fecha or ""))
+        elem.clear()
@@ -35,6 +35,8 @@ SCRIPT_DIR = Path(__file__).resolve().parent
 REPO_DIR = SCRIPT_DIR.parent.parent
 sys.path.insert(0, str(REPO_DIR))
 
+from scripts.utils.canonical_url import canonicalizar_url, url_destino, url_msn  # noqa: E402
+
 PELICULA = "Eixam"
 PELICULA_ES = "Enjambre"
 OUTPUT_PATH = Path(REPO_DIR) / "files" / "eixam_pelicula.json"
@@ -187,24 +189,15 @@ def _es_relevante(titulo: str) -> bool:
 
 
 def _url_real(url: str) -> str:
-    """Extrae la URL destino real de servidores de redirección (Bing apiclick)."""
-    from urllib.parse import unquote
-    m = re.search(r"[?&]url=", url)
-    if m:
-        real = unquote(url.split(m.group(0), 1)[1].split("&")[0])
-        if real.startswith(("http://", "https://")):
-            url = real
+    """Extrae la URL destino real de servidores de redirección (Bing apiclick).
+
+    Los espejos regionales y de categoría de MSN se reducen al slug del artículo
+    (ver scripts/utils/canonical_url.py).
+    """
+    url = url_destino(url)
     m = re.search(r"https?://[^\s\"<>]+", url)
     url = m.group(0) if m else url
-    # Normaliza los espejos regionales de MSN (es-us/es-ve/es-mx → mismo artículo)
-    if "msn.com/" in url:
-        url = re.sub(r"https?://[^/]+/[a-z]{2}-[a-z]{2}/", "https://www.msn.com/", url)
-        # Une variantes de categoría (other/cine/entretenimiento/noticias...) del mismo
-        # contenido: conserva solo dominio + slug del artículo (vi-... o id-...).
-        slug = re.search(r"/(?:vi-|id-?|AA)[A-Za-z0-9_-]+", url)
-        if slug:
-            url = "https://www.msn.com" + slug.group(0)
-    return url
+    return url_msn(url)
 
 # Palabras que orientan la clasificación por tipo de contenido
 CLASIFICADOR = [
@@ -363,9 +356,9 @@ def _anexar(items, resultados, vistos):
         if not _es_relevante(it["titulo"]):
             continue
         url = _url_real(it["url"])
-        if not url or url in vistos:
+        if not url or canonicalizar_url(url) in vistos:
             continue
-        vistos.add(url)
+        vistos.add(canonicalizar_url(url))
         it["url"] = url
         it["tipo"] = clasificar(it["titulo"])
         it["relevancia"] = _relevancia(it["titulo"])
@@ -461,9 +454,9 @@ def main():
     # Filtrado adicional con IA (solo si hay GEMINI_API_KEY) para reducir falsos positivos
     nuevos = _validar_ia(nuevos)
     existentes = cargar_existente()
-    urls_existentes = {e["url"] for e in existentes}
+    urls_existentes = {canonicalizar_url(e["url"]) for e in existentes}
 
-    realmente_nuevos = [n for n in nuevos if n["url"] not in urls_existentes]
+    realmente_nuevos = [n for n in nuevos if canonicalizar_url(n["url"]) not in urls_existentes]
 
     # Conteo por tipo de lo que hay acumulado + lo nuevo
     todos = existentes + realmente_nuevos
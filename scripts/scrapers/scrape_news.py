@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 """
 scrape_news.py — Scrapea fuentes de noticias web y YouTube.
-Actualiza noticias_historico.json con nuevos items.
+Añade los items nuevos al histórico (scripts/utils/history_store.py). Lo ya
+visto en cualquier ejecución anterior se descarta antes de deduplicar y
+traducir con el índice de scripts/utils/seen_index.py, que no se recorta.
 
 Uso:
     python scrape_news.py                         # Scrapea todas las fuentes
-    python scrape_news.py --limit 5                # Máximo 5 requests simultáneos
+    python scrape_news.py --limit 32               # Máximo 32 requests simultáneos (global)
+    python scrape_news.py --per-host 2             # Máximo 2 requests simultáneos por host
+    python scrape_news.py --no-cache               # Ignora ETag/Last-Modified y descarga todo
+    python scrape_news.py --inline-parse           # Parseo HTML sin pool de procesos (depuración)
+    python scrape_news.py --yt-html                # Canales de YouTube siempre desde /videos (sin feed)
 """
 import argparse
 import asyncio
@@ -17,9 +23,13 @@ from logging.handlers import RotatingFileHandler
 
 import aiohttp
 
-from scripts.utils.constants_downloadfile import CONFIG, FUENTES, YT_KEY, URL_KEY, TIPO_KEY, QUICK_KEY, TIPO_VAL_HERRAMIENTA, ENLACE_KEY, ID_VIDEO_KEY, NOTICIAS_FILENAME, LOGS_DIR, LOG_FILES
+from scripts.utils.constants_downloadfile import CONFIG, FUENTES, YT_KEY, URL_KEY, TIPO_KEY, QUICK_KEY, TIPO_VAL_HERRAMIENTA, ENLACE_KEY, ID_VIDEO_KEY, LOGS_DIR, LOG_FILES
+from scripts.scrapers.host_scheduler import HostScheduler
 from scripts.scrapers.scraper_base import ScraperPro
-from scripts.utils.common import load_json, save_json, traducir_titulos_ia, deduplicar_items
+from scripts.scrapers.source_health import SourceHealth
+from scripts.utils.common import traducir_titulos_ia, deduplicar_items
+from scripts.utils.history_store import IHistoryStore, abrir_historico
+from scripts.utils.seen_index import abrir_vistos
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 logging.basicConfig(
@@ -34,65 +44,83 @@ logger = logging.getLogger("news")
 
 
 
-def _filtrar_fuentes_por_tier(tier: str) -> dict:
-    """Filtra FUENTES según el tier de scraping."""
+def _filtrar_fuentes_por_tier(tier: str, salud: SourceHealth | None = None) -> dict:
+    """Filtra FUENTES según el tier de scraping.
+
+    Con ``salud``, el tier light parte del flag estático ``quick`` pero incluye
+    las fuentes promocionadas por rendimiento y excluye las quick obsoletas.
+    """
     todas = {k: v for k, v in FUENTES.items() if v.get(TIPO_KEY) != TIPO_VAL_HERRAMIENTA}
     if tier == "full":
         return todas
     if tier == "standard":
         return {k: v for k, v in todas.items() if URL_KEY in v}
     if tier == "light":
+        if salud:
+            return {k: v for k, v in todas.items() if salud.en_tier_rapido(k, bool(v.get(QUICK_KEY)))}
         return {k: v for k, v in todas.items() if v.get(QUICK_KEY)}
     logger.warning("⚠️ Tier '%s' desconocido. Usando full.", tier)
     return todas
 
 
-async def run():
+async def run(argv: list[str] | None = None, store: IHistoryStore | None = None, scr: ScraperPro | None = None):
+    """Scrapea e inserta en el histórico.
+
+    Con ``store``/``scr`` compartidos (scripts/tools/downloadFile.py) no los cierra
+    ni guarda el estado del scraper: lo hace quien los creó, una vez al final.
+    """
     parser = argparse.ArgumentParser(description="Scrape news sources")
-    parser.add_argument("--limit", type=int, default=5, help="Máximo de requests simultáneos")
+    parser.add_argument("--limit", type=int, default=32, help="Máximo de requests simultáneos (global)")
+    parser.add_argument("--per-host", type=int, default=2, help="Máximo de requests simultáneos por host")
     parser.add_argument("--tier", choices=["light", "standard", "full"], default="full",
                         help="Tier de scraping: light (solo quick), standard (web), full (todo)")
-    args = parser.parse_args()
+    parser.add_argument("--no-cache", action="store_true", help="Desactiva el GET condicional (ETag/Last-Modified)")
+    parser.add_argument("--inline-parse", action="store_true", help="Parsea el HTML en el event loop (sin pool de procesos, para depurar)")
+    parser.add_argument("--yt-html", action="store_true", help="Scrapea siempre la página /videos de los canales en vez de su feed Atom")
+    args = parser.parse_args(argv)
 
     logger.info("🚀 Iniciando scrape_news.py (tier=%s)", args.tier)
-    scr = ScraperPro()
-
-    path_json = os.path.join(CONFIG["FOLDER"], NOTICIAS_FILENAME)
-    historial = load_json(path_json)
-    existing_urls = {n.get(ENLACE_KEY) for n in historial if n.get(ENLACE_KEY)}
-    existing_video_ids = {n.get(ID_VIDEO_KEY) for n in historial if n.get(ID_VIDEO_KEY)}
-
-    sem = asyncio.Semaphore(args.limit)
-
-    async def con_semaforo(session, nombre, info):
-        async with sem:
-            await asyncio.sleep(1)
-            return await scr.extraer(session, nombre, info)
-
-    connector = aiohttp.TCPConnector(ssl=False)
-    news_sources = _filtrar_fuentes_por_tier(args.tier)
+    scr_propio = scr is None
+    if scr_propio:
+        scr = ScraperPro(
+            cache_http=not args.no_cache,
+            scheduler=HostScheduler(args.limit, args.per_host),
+            parse_workers=0 if args.inline_parse else None,
+            yt_feed=not args.yt_html,
+        )
+
+    store_propio = store is None
+    if store_propio:
+        store = abrir_historico()
+    vistos = abrir_vistos("noticias")
+    if vistos.nuevo:
+        vistos.marcar_items(store.todos())
+        logger.info(f"👁️ Índice de vistos creado desde el histórico ({len(vistos)} claves)")
+
+    connector = aiohttp.TCPConnector(ssl=False, limit=args.limit)
+    news_sources = _filtrar_fuentes_por_tier(args.tier, scr.health)
 
     async with aiohttp.ClientSession(connector=connector) as session:
-        tareas = [con_semaforo(session, nombre, info) for nombre, info in news_sources.items()]
+        tareas = [scr.extraer(session, nombre, info) for nombre, info in news_sources.items()]
         resultados_agrupados = await asyncio.gather(*tareas)
+    if scr_propio:
+        await scr.cerrar()
 
     nuevos = []
     for lista_res in resultados_agrupados:
         for item in lista_res:
             enlace = item.get(ENLACE_KEY)
             id_vid = item.get(ID_VIDEO_KEY)
-            if enlace and enlace in existing_urls:
-                continue
-            if id_vid and id_vid in existing_video_ids:
+            if vistos.visto(enlace=enlace, id_video=id_vid):
                 continue
             nuevos.append(item)
-            if enlace:
-                existing_urls.add(enlace)
-            if id_vid:
-                existing_video_ids.add(id_vid)
+            vistos.marcar(enlace=enlace, id_video=id_vid)
+    logger.info(f"👁️ Vistos: {vistos.resumen()}")
 
     nuevos = deduplicar_items(nuevos)
     logger.info(f"✨ Encontrados {len(nuevos)} nuevos elementos (tras dedup).")
+    if scr.health:
+        scr.health.registrar_nuevos_items(nuevos)
 
     if nuevos:
         try:
@@ -103,11 +131,16 @@ async def run():
         except Exception as e:
             logger.error(f"❌ Error en traducción: {e}")
 
-        historial = nuevos + historial
-        save_json(path_json, historial)
-        logger.info(f"💾 {len(nuevos)} nuevos items guardados en {path_json}")
+        store.insertar(nuevos)
+        logger.info(f"💾 {len(nuevos)} nuevos items guardados en el histórico ({store.contar()} en total)")
+    if store_propio:
+        store.cerrar()
+    vistos.guardar_si_cambio()
 
-    scr.guardar_avatars()
+    if scr_propio:
+        scr.guardar_avatars()
+        scr.guardar_cache_http()
+        scr.guardar_salud()
     logger.info("✅ scrape_news.py completado.")
 
 
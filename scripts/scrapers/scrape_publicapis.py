@@ -12,6 +12,8 @@ from pathlib import Path
 import requests
 from bs4 import BeautifulSoup
 
+from scripts.utils.canonical_url import canonicalizar_url
+
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 logger = logging.getLogger("scrape_publicapis")
 
@@ -107,8 +109,8 @@ def scrape_all() -> list[dict]:
 
         new_count = 0
         for r in resources:
-            if r["enlace"] not in seen_urls:
-                seen_urls.add(r["enlace"])
+            if canonicalizar_url(r["enlace"]) not in seen_urls:
+                seen_urls.add(canonicalizar_url(r["enlace"]))
                 all_resources.append(r)
                 new_count += 1
 
@@ -137,8 +139,8 @@ def scrape_all() -> list[dict]:
         resources = parse_resources(html)
         new_count = 0
         for r in resources:
-            if r["enlace"] not in seen_urls:
-                seen_urls.add(r["enlace"])
+            if canonicalizar_url(r["enlace"]) not in seen_urls:
+                seen_urls.add(canonicalizar_url(r["enlace"]))
                 r["categoria"] = cat.replace("-", " ").title()
                 all_resources.append(r)
                 new_count += 1
@@ -159,8 +161,8 @@ def save_resources(resources: list[dict]):
         except Exception:
             existing = []
 
-    existing_urls = {r.get("enlace") for r in existing}
-    new_resources = [r for r in resources if r["enlace"] not in existing_urls]
+    existing_urls = {canonicalizar_url(r.get("enlace", "")) for r in existing}
+    new_resources = [r for r in resources if canonicalizar_url(r["enlace"]) not in existing_urls]
 
     combined = existing + new_resources
     OUTPUT_FILE.write_text(json.dumps(combined, indent=4, ensure_ascii=False), encoding="utf-8")
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 """
 scrape_tools.py — Scrapea GitHub Trending + Product Hunt para herramientas.
-Actualiza files/herramientas.json con nuevos descubrimientos.
+Actualiza files/herramientas.json con nuevos descubrimientos. herramientas.json
+guarda solo las 200 últimas; files/vistos/herramientas.txt recuerda todas las
+URLs ya vistas para que las antiguas no vuelvan a entrar como nuevas.
 
 Uso:
     python scrape_tools.py
@@ -17,6 +19,7 @@ import aiohttp
 from scripts.utils.constants_downloadfile import CONFIG, FUENTES, TIPO_KEY, TIPO_VAL_HERRAMIENTA, ENLACE_KEY, HERRAMIENTAS_FILENAME, LOGS_DIR, LOG_FILES
 from scripts.utils.common import load_json, save_json
 from scripts.scrapers.scraper_base import ScraperPro
+from scripts.utils.seen_index import abrir_vistos
 
 os.makedirs(LOGS_DIR, exist_ok=True)
 logging.basicConfig(
@@ -31,38 +34,38 @@ logger = logging.getLogger("tools")
 
 
 
-async def run():
+async def run(scr: ScraperPro | None = None):
+    """Con un ``scr`` compartido no lo cierra ni guarda su estado (lo hace quien lo creó)."""
     logger.info("🚀 Iniciando scrape_tools.py")
-    scr = ScraperPro()
+    scr_propio = scr is None
+    if scr_propio:
+        scr = ScraperPro()
 
     herramientas_path = os.path.join(CONFIG["FOLDER"], HERRAMIENTAS_FILENAME)
     herramientas_hist = load_json(herramientas_path)
-    existing_urls = {h.get(ENLACE_KEY) for h in herramientas_hist if h.get(ENLACE_KEY)}
+    vistos = abrir_vistos("herramientas")
+    if vistos.nuevo:
+        vistos.marcar_items(herramientas_hist)
 
     tool_sources = {k: v for k, v in FUENTES.items() if v.get(TIPO_KEY) == TIPO_VAL_HERRAMIENTA}
     logger.info(f"🔧 Fuentes de herramientas: {list(tool_sources.keys())}")
 
-    sem = asyncio.Semaphore(3)
-
-    async def con_semaforo(session, nombre, info):
-        async with sem:
-            await asyncio.sleep(1)
-            return await scr.extraer(session, nombre, info)
-
     connector = aiohttp.TCPConnector(ssl=False)
     async with aiohttp.ClientSession(connector=connector) as session:
-        tareas = [con_semaforo(session, nombre, info) for nombre, info in tool_sources.items()]
+        tareas = [scr.extraer(session, nombre, info) for nombre, info in tool_sources.items()]
         resultados_agrupados = await asyncio.gather(*tareas)
+    if scr_propio:
+        await scr.cerrar()
 
     nuevas = []
     for lista_res in resultados_agrupados:
         for item in lista_res:
             enlace = item.get(ENLACE_KEY)
-            if enlace and enlace in existing_urls:
+            if vistos.visto(enlace=enlace):
                 continue
             nuevas.append(item)
-            if enlace:
-                existing_urls.add(enlace)
+            vistos.marcar(enlace=enlace)
+    logger.info(f"👁️ Vistos: {vistos.resumen()}")
 
     if nuevas:
         herramientas_hist = nuevas + herramientas_hist
@@ -71,8 +74,14 @@ async def run():
         logger.info(f"🔧 {len(nuevas)} herramientas nuevas guardadas en {herramientas_path}")
     else:
         logger.info("📭 No hay herramientas nuevas.")
-
-    scr.guardar_avatars()
+    vistos.guardar_si_cambio()
+
+    if scr.health:
+        scr.health.registrar_nuevos_items(nuevas)
+    if scr_propio:
+        scr.guardar_avatars()
+        scr.guardar_cache_http()
+        scr.guardar_salud()
     logger.info("✅ scrape_tools.py completado.")
 
 
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """
 scraper_base.py — Clases base de extracción compartidas entre todos los scrapers.
-YouTubeExtractor, WebExtractor, ScraperPro, AvatarRepository, ContentFilter.
+YouTubeExtractor, WebExtractor, ScraperPro, AvatarRepository, ChannelIdRepository, ContentFilter.
 """
 import asyncio
 import hashlib
@@ -10,18 +10,68 @@ import json
 import logging
 import os
 import re
-from datetime import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime, timedelta
 from urllib.parse import urljoin
 
 import aiohttp
 import requests
 from bs4 import BeautifulSoup
 
-from scripts.utils.constants_downloadfile import ALL_KEYWORDS, CATEGORIAS, CONFIG, clasificar_noticia, YT_KEY, RSS_KEY, URL_KEY, TIPO_KEY, SUBTIPO_KEY, SELECTOR_KEY, ORIGEN_KEY, BADGE_KEY, TIPO_VAL_HERRAMIENTA, TIPO_VAL_NOTICIA, TIPO_VAL_VIDEO, TIPO_VAL_SHORTS, TIPO_VAL_LIVE, SUB_VAL_GITHUB, SUB_VAL_GITHUB_TOPIC, SUB_VAL_GITHUB_COLLECTION, SUB_VAL_PRODUCTHUNT, VAL_RSS, VAL_TECH, ENLACE_KEY, FUENTE_KEY, TITULO_KEY, CATEGORIA_KEY, ESTRELLAS_KEY, DESCRIPCION_KEY, LENGUAJE_KEY, REPO_KEY, TS_KEY, F_KEY, FECHA_REAL_KEY, FECHA_PUB_KEY, ID_VIDEO_KEY, IMAGEN_URL_KEY, AVATARS_CACHE_FILENAME
-from xml.etree import ElementTree
+from scripts.utils.constants_downloadfile import KEYWORD_MATCHER, CATEGORIAS, CATEGORIA_GENERAL, CONFIG, clasificar_noticia, YT_KEY, RSS_KEY, URL_KEY, TIPO_KEY, SUBTIPO_KEY, SELECTOR_KEY, ORIGEN_KEY, BADGE_KEY, TIPO_VAL_HERRAMIENTA, TIPO_VAL_NOTICIA, TIPO_VAL_VIDEO, TIPO_VAL_SHORTS, TIPO_VAL_LIVE, SUB_VAL_GITHUB, SUB_VAL_GITHUB_TOPIC, SUB_VAL_GITHUB_COLLECTION, SUB_VAL_PRODUCTHUNT, VAL_RSS, VAL_TECH, ENLACE_KEY, FUENTE_KEY, TITULO_KEY, CATEGORIA_KEY, ESTRELLAS_KEY, DESCRIPCION_KEY, LENGUAJE_KEY, REPO_KEY, TS_KEY, F_KEY, FECHA_REAL_KEY, FECHA_PUB_KEY, ID_VIDEO_KEY, IMAGEN_URL_KEY, AVATARS_CACHE_FILENAME, FETCH_CACHE_FILENAME, YT_CHANNEL_IDS_FILENAME, PLAYWRIGHT_KEY, SOURCE_HEALTH_FILENAME, AVATARS_META_FILENAME
+from scripts.scrapers.browser_pool import BrowserPool
+from scripts.scrapers.fetch_cache import FetchCache
+from scripts.scrapers.host_scheduler import ESTADOS_BACKOFF, HostScheduler
+from scripts.scrapers.rss_stream import LectorRSS
+from scripts.scrapers.source_health import SourceHealth
+from scripts.scrapers.yt_initial_data import FinDeYtInitialData, extraer_yt_initial_data
 
 logger = logging.getLogger("scraper_base")
 
+# Tras un 429/503 se reintenta una vez si la pausa pedida no supera este valor
+MAX_ESPERA_REINTENTO = 30
+STREAM_CHUNK = 64 * 1024
+SELECTOR_NOTICIAS = "article h2 a, h3 a, h2 a, .post-title a"
+
+# Avatares: edad a partir de la cual se refrescan, memoria de fallos y tope del <head>
+TTL_AVATAR_DIAS = 30
+TTL_NEGATIVO_H = 72
+MAX_HEAD_AVATAR = 512 * 1024
+
+
+def og_image(html_text: str) -> str | None:
+    meta_img = BeautifulSoup(html_text, "html.parser").find("meta", property="og:image")
+    return meta_img["content"] if meta_img and meta_img.get("content") else None
+
+
+# Contadores de la fuente en curso (errores, sin_cambios) para SourceHealth.
+# Cada extraer() corre en su propia tarea, así que no se mezclan entre fuentes.
+_ESTADO_FUENTE: ContextVar[dict | None] = ContextVar("estado_fuente", default=None)
+
+
+def _anotar(clave: str, error: str = ""):
+    estado = _ESTADO_FUENTE.get()
+    if estado is not None:
+        estado[clave] = estado.get(clave, 0) + 1
+        if error:
+            estado["error"] = error
+
+# Feed Atom por canal (~15 últimos vídeos, unos KB frente a los MB de /videos)
+YT_FEED_URL = "https://www.youtube.com/feeds/videos.xml?channel_id={}"
+# Pestañas cuyo contenido no trae el feed: se siguen scrapeando en HTML
+YT_RUTAS_SOLO_HTML = ("/shorts", "/streams")
+# Equivalente a ContentFilter.es_fecha_valida para fechas absolutas ("hace 1 mes" ya no vale)
+YT_FEED_MAX_DIAS = 30
+_RE_CANAL_ID = (
+    re.compile(r"feeds/videos\.xml\?channel_id=(UC[\w-]{22})"),
+    re.compile(r'<link rel="canonical" href="https://www\.youtube\.com/channel/(UC[\w-]{22})"'),
+    re.compile(r'"externalId":"(UC[\w-]{22})"'),
+)
+_RE_CANAL_EN_URL = re.compile(r"youtube\.com/channel/(UC[\w-]{22})")
+_RE_ID_VIDEO = re.compile(r"(?:[?&]v=|/shorts/)([\w-]{11})")
+
 
 class ContentFilter:
     @staticmethod
@@ -30,20 +80,31 @@ class ContentFilter:
 
     @staticmethod
     def coincide_con_keywords(titulo: str) -> bool:
-        t_low = titulo.lower()
-        return any(key.lower() in t_low for key in ALL_KEYWORDS)
+        return KEYWORD_MATCHER.coincide(titulo)
 
 
 class AvatarRepository:
-    def __init__(self, cache_path: str):
+    """Avatares de canal (og:image) con caché persistente.
+
+    Junto a avatars_cache.json ({nombre: url}) se guarda un fichero de metadatos
+    con la fecha de cada consulta y si tuvo éxito: los fallos se recuerdan
+    durante TTL_NEGATIVO_H y los avatares con más de TTL_AVATAR_DIAS se
+    refrescan en segundo plano en ``prefetch``.
+    """
+
+    def __init__(self, cache_path: str, meta_path: str | None = None):
         self.cache_file = cache_path
-        self.avatars = self._cargar_avatars()
+        self.meta_file = meta_path or os.path.join(os.path.dirname(cache_path), AVATARS_META_FILENAME)
+        self.avatars = self._cargar_json(self.cache_file)
+        self.meta = self._cargar_json(self.meta_file)
         self.cambios_en_cache = False
+        self._refrescos: list[asyncio.Task] = []
 
-    def _cargar_avatars(self):
-        if os.path.exists(self.cache_file):
+    @staticmethod
+    def _cargar_json(path: str) -> dict:
+        if os.path.exists(path):
             try:
-                with open(self.cache_file, "r", encoding="utf-8") as f:
+                with open(path, "r", encoding="utf-8") as f:
                     return json.load(f)
             except Exception:
                 return {}
@@ -53,25 +114,127 @@ class AvatarRepository:
         if self.cambios_en_cache:
             with open(self.cache_file, "w") as f:
                 json.dump(self.avatars, f, indent=4, ensure_ascii=False)
+            with open(self.meta_file, "w", encoding="utf-8") as f:
+                json.dump(self.meta, f, indent=1, ensure_ascii=False, sort_keys=True)
             logger.info("💾 Caché de avatares actualizada.")
 
+    @staticmethod
+    def _placeholder(nombre: str) -> str:
+        return f"https://ui-avatars.com/api/?name={nombre}&background=random"
+
+    @staticmethod
+    def _url_perfil(url_canal: str) -> str:
+        return url_canal.replace("/videos", "").replace("/shorts", "")
+
+    def _registrar(self, nombre: str, url_avatar: str | None):
+        """Anota el resultado de una consulta (None = fallo: se recuerda con TTL y se conserva el avatar previo)."""
+        if url_avatar:
+            self.avatars[nombre] = url_avatar
+        self.meta[nombre] = {"ts": datetime.now().isoformat(), "ok": bool(url_avatar)}
+        self.cambios_en_cache = True
+
+    def _estado(self, nombre: str, ahora: datetime) -> str:
+        """"fresco", "caducado" (hay avatar pero viejo), "negativo" (fallo reciente) o "falta"."""
+        meta = self.meta.get(nombre)
+        edad = ahora - datetime.fromisoformat(meta["ts"]) if meta else None
+        if nombre in self.avatars:
+            # Si el último refresco falló, se reintenta tras el TTL negativo
+            ttl = timedelta(days=TTL_AVATAR_DIAS) if meta and meta.get("ok") else timedelta(hours=TTL_NEGATIVO_H)
+            return "fresco" if edad is not None and edad < ttl else "caducado"
+        if meta and not meta.get("ok") and edad < timedelta(hours=TTL_NEGATIVO_H):
+            return "negativo"
+        return "falta"
+
     def obtener_avatar(self, nombre: str, url_canal: str) -> str:
         if nombre in self.avatars:
             return self.avatars[nombre]
+        if self._estado(nombre, datetime.now()) == "negativo":
+            return self._placeholder(nombre)
+        url_avatar = None
         try:
             logger.info(f"🔍 Buscando avatar real para: {nombre}...")
-            target = url_canal.replace("/videos", "").replace("/shorts", "")
-            r = requests.get(target, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-            soup = BeautifulSoup(r.text, "html.parser")
-            meta_img = soup.find("meta", property="og:image")
-            if meta_img:
-                url_avatar = meta_img["content"]
-                self.avatars[nombre] = url_avatar
-                self.cambios_en_cache = True
-                return url_avatar
+            r = requests.get(self._url_perfil(url_canal), timeout=10, headers={"User-Agent": "Mozilla/5.0"})
+            url_avatar = og_image(r.text)
         except Exception:
             pass
-        return f"https://ui-avatars.com/api/?name={nombre}&background=random"
+        self._registrar(nombre, url_avatar)
+        return url_avatar or self._placeholder(nombre)
+
+    async def _descargar(self, session, sem, nombre: str, url_canal: str):
+        """Lee solo el <head> del perfil del canal y extrae og:image."""
+        url_avatar = None
+        try:
+            async with sem:
+                async with session.get(self._url_perfil(url_canal), timeout=15, headers={"User-Agent": "Mozilla/5.0"}) as r:
+                    if r.status == 200:
+                        head = bytearray()
+                        async for chunk in r.content.iter_chunked(16 * 1024):
+                            head.extend(chunk)
+                            if b"</head>" in head or len(head) > MAX_HEAD_AVATAR:
+                                break
+                        url_avatar = og_image(head.decode(r.charset or "utf-8", errors="replace"))
+        except Exception as e:
+            logger.debug(f"⚠️ Avatar de {nombre} no disponible: {e}")
+        self._registrar(nombre, url_avatar)
+
+    async def prefetch(self, session, canales: dict[str, str], concurrencia: int = 8):
+        """Resuelve en paralelo los avatares que faltan; los caducados se refrescan en segundo plano.
+
+        Vuelve en cuanto están los que faltaban. Los refrescos siguen en curso
+        (el avatar antiguo sigue sirviendo mientras tanto); ``esperar_refrescos``
+        los espera antes de guardar.
+        """
+        ahora = datetime.now()
+        sem = asyncio.Semaphore(concurrencia)
+        faltan, caducados = [], []
+        for nombre, url_canal in canales.items():
+            estado = self._estado(nombre, ahora)
+            if estado == "falta":
+                faltan.append((nombre, url_canal))
+            elif estado == "caducado":
+                caducados.append((nombre, url_canal))
+        logger.info(f"🖼️ Avatares: {len(faltan)} por descargar, {len(caducados)} a refrescar, "
+                    f"{len(canales) - len(faltan) - len(caducados)} en caché.")
+        self._refrescos += [asyncio.create_task(self._descargar(session, sem, n, u)) for n, u in caducados]
+        await asyncio.gather(*(self._descargar(session, sem, n, u) for n, u in faltan))
+
+    async def esperar_refrescos(self):
+        if self._refrescos:
+            await asyncio.gather(*self._refrescos)
+            self._refrescos = []
+
+
+class ChannelIdRepository:
+    """URL de canal de YouTube → channel ID (UC…), resuelto una vez y persistido."""
+
+    def __init__(self, cache_path: str):
+        self.cache_file = cache_path
+        self.ids = self._cargar_ids()
+        self.cambios_en_cache = False
+
+    def _cargar_ids(self):
+        if os.path.exists(self.cache_file):
+            try:
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except Exception:
+                return {}
+        return {}
+
+    def guardar_si_cambio(self):
+        if self.cambios_en_cache:
+            with open(self.cache_file, "w", encoding="utf-8") as f:
+                json.dump(self.ids, f, indent=4, ensure_ascii=False, sort_keys=True)
+            logger.info("💾 Caché de channel IDs actualizada.")
+
+    def obtener(self, url_canal: str) -> str | None:
+        m = _RE_CANAL_EN_URL.search(url_canal)
+        return m.group(1) if m else self.ids.get(url_canal)
+
+    def registrar(self, url_canal: str, channel_id: str):
+        if self.ids.get(url_canal) != channel_id:
+            self.ids[url_canal] = channel_id
+            self.cambios_en_cache = True
 
 
 class BaseExtractor:
@@ -209,6 +372,40 @@ class YouTubeExtractor(BaseExtractor):
 
         return results
 
+    @staticmethod
+    def canal_id_desde_html(html_text: str) -> str | None:
+        """channel ID de la página del canal (enlace RSS, canonical o metadata)."""
+        for patron in _RE_CANAL_ID:
+            m = patron.search(html_text)
+            if m:
+                return m.group(1)
+        return None
+
+    def adaptar_items_feed(self, items: list) -> list:
+        """Items de extraer_rss sobre el feed de un canal → items de vídeo como los del HTML."""
+        results = []
+        limite = datetime.now().astimezone().timestamp() - YT_FEED_MAX_DIAS * 86400
+        for item in items[:10]:
+            m = _RE_ID_VIDEO.search(item.get(ENLACE_KEY, ""))
+            if not m:
+                continue
+            try:
+                if datetime.fromisoformat(item.get(FECHA_PUB_KEY, "")).timestamp() < limite:
+                    continue
+            except ValueError:
+                pass
+            video_id = m.group(1)
+            es_short = "/shorts/" in item[ENLACE_KEY]
+            item.pop(BADGE_KEY, None)
+            item.pop(ORIGEN_KEY, None)
+            item.update({
+                ENLACE_KEY: f"https://www.youtube.com/watch?v={video_id}",
+                TIPO_KEY: TIPO_VAL_SHORTS if es_short else TIPO_VAL_VIDEO,
+                ID_VIDEO_KEY: video_id,
+            })
+            results.append(item)
+        return results
+
     def ejecutar_fallback(self, html_text: str, nombre: str) -> list:
         results = []
         logger.warning(f"⚠️ No se obtuvieron resultados vía JSON para {nombre}. Intentando fallback con Regex...")
@@ -225,7 +422,7 @@ class WebExtractor(BaseExtractor):
     def extraer_noticias(self, html_text: str, nombre: str, target: str, info: dict) -> list:
         results = []
         soup = BeautifulSoup(html_text, "html.parser")
-        selector = info.get(SELECTOR_KEY, "article h2 a, h3 a, h2 a, .post-title a")
+        selector = info.get(SELECTOR_KEY, SELECTOR_NOTICIAS)
         items = soup.select(selector)[:10]
 
         for i in items:
@@ -236,7 +433,8 @@ class WebExtractor(BaseExtractor):
             if len(t_raw) < 5:
                 continue
             is_english = any(x in target for x in ["wired", "verge", "techcrunch", "github", "openai", "astro.build"])
-            if ContentFilter.coincide_con_keywords(t_raw) or is_english:
+            coincide, categoria = KEYWORD_MATCHER.analizar(t_raw)
+            if coincide or is_english:
                 img_url = ""
                 parent = i.find_parent(["article", "div", "section"])
                 if parent:
@@ -257,52 +455,29 @@ class WebExtractor(BaseExtractor):
                 item = self.generar_item_base(t_raw, enlace, nombre, TIPO_VAL_NOTICIA, fecha_pub)
                 item.update({
                     BADGE_KEY: VAL_TECH,
-                    CATEGORIA_KEY: clasificar_noticia(t_raw),
+                    CATEGORIA_KEY: categoria or CATEGORIA_GENERAL,
                     IMAGEN_URL_KEY: urljoin(target, img_url) if img_url else "",
                 })
                 results.append(self.enriquecer_fechas(item))
         return results
 
     def extraer_rss(self, xml_text: str, nombre: str, info: dict | None = None) -> list:
+        lector = LectorRSS()
+        lector.alimentar(xml_text)
+        return self.items_desde_rss(lector.entradas, nombre, info)
+
+    def items_desde_rss(self, entradas: list[tuple[str, str, str]], nombre: str, info: dict | None = None) -> list:
+        """Entradas (título, enlace, fecha) de LectorRSS → items de noticia."""
         results = []
-        try:
-            root = ElementTree.fromstring(xml_text)
-            ns = {"content": "http://purl.org/rss/1.0/modules/content/",
-                  "dc": "http://purl.org/dc/elements/1.1/",
-                  "atom": "http://www.w3.org/2005/Atom",
-                  "media": "http://search.yahoo.com/mrss/"}
-            channel = root.find("channel")
-            items_xml = channel.findall("item") if channel is not None else []
-            if not items_xml:
-                items_xml = root.findall(".//{http://www.w3.org/2005/Atom}entry")
-                for entry in items_xml[:12]:
-                    titulo = entry.findtext("{http://www.w3.org/2005/Atom}title", "")
-                    link_el = entry.find("{http://www.w3.org/2005/Atom}link")
-                    enlace = link_el.get("href") if link_el is not None else ""
-                    fecha = entry.findtext("{http://www.w3.org/2005/Atom}published", "") or entry.findtext("{http://www.w3.org/2005/Atom}updated", "")
-                    if titulo and enlace:
-                        item = self.generar_item_base(titulo, enlace, nombre, TIPO_VAL_NOTICIA, fecha)
-                        item.update({
-                            BADGE_KEY: VAL_TECH,
-                            CATEGORIA_KEY: clasificar_noticia(titulo),
-                            ORIGEN_KEY: VAL_RSS,
-                        })
-                        results.append(self.enriquecer_fechas(item))
-                return results
-            for i in items_xml[:12]:
-                titulo = i.findtext("title", "")
-                enlace = i.findtext("link", "")
-                fecha = i.findtext("pubDate", "") or i.findtext("dc:date", "", ns)
-                if titulo and enlace:
-                    item = self.generar_item_base(titulo, enlace, nombre, TIPO_VAL_NOTICIA, fecha)
-                    item.update({
-                        BADGE_KEY: VAL_TECH,
-                        CATEGORIA_KEY: clasificar_noticia(titulo),
-                        ORIGEN_KEY: VAL_RSS,
-                    })
-                    results.append(self.enriquecer_fechas(item))
-        except Exception as e:
-            logger.debug(f"⚠️ Error parseando RSS {nombre}: {e}")
+        for titulo, enlace, fecha in entradas:
+            if titulo and enlace:
+                item = self.generar_item_base(titulo, enlace, nombre, TIPO_VAL_NOTICIA, fecha)
+                item.update({
+                    BADGE_KEY: VAL_TECH,
+                    CATEGORIA_KEY: clasificar_noticia(titulo),
+                    ORIGEN_KEY: VAL_RSS,
+                })
+                results.append(self.enriquecer_fechas(item))
         if info and info.get("solo_tech"):
             results = [r for r in results if ContentFilter.coincide_con_keywords(r.get(TITULO_KEY, ""))]
         return results
@@ -400,82 +575,264 @@ class WebExtractor(BaseExtractor):
         return results
 
 
+def parsear_web(html_text: str, nombre: str, target: str, info: dict) -> list:
+    """HTML crudo → items (dicts). Función de módulo para poder ejecutarse en el pool de procesos."""
+    extractor = WebExtractor()
+    if info.get(TIPO_KEY) == TIPO_VAL_HERRAMIENTA:
+        return extractor.extraer_herramientas(html_text, nombre, target, info)
+    return extractor.extraer_noticias(html_text, nombre, target, info)
+
+
 class ScraperPro:
-    def __init__(self):
+    def __init__(self, cache_http: bool = True, scheduler: HostScheduler | None = None, parse_workers: int | None = None,
+                 yt_feed: bool = True, browser_pool: BrowserPool | None = None, salud_fuentes: bool = True):
+        """
+        Args:
+            cache_http: Usa GET condicional (ETag/Last-Modified) entre ejecuciones.
+            scheduler: Planificador por host; por defecto uno con límites estándar.
+            parse_workers: Procesos para parsear HTML. 0 = parseo inline en el event loop
+                           (útil para depurar; también con SCRAPER_INLINE_PARSE=1).
+            yt_feed: Lee los canales de YouTube desde su feed Atom (videos.xml) una vez
+                     conocido su channel ID; False = siempre la página /videos.
+            browser_pool: Navegador headless para las fuentes marcadas con "pw" (SPA).
+                          Solo arranca Chromium si alguna fuente lo necesita.
+            salud_fuentes: Registra éxito/latencia por fuente y salta las que tienen el
+                           circuito abierto (ver source_health.py).
+        """
+        self.scheduler = scheduler or HostScheduler()
+        if os.environ.get("SCRAPER_INLINE_PARSE") == "1":
+            parse_workers = 0
+        self.parse_workers = (os.cpu_count() or 1) if parse_workers is None else parse_workers
+        self._parse_pool: ProcessPoolExecutor | None = None
+        self._parse_sem = asyncio.Semaphore(max(1, self.parse_workers) * 2)
         self.avatar_repo = AvatarRepository(os.path.join(CONFIG["FOLDER"], AVATARS_CACHE_FILENAME))
+        self.fetch_cache = FetchCache(os.path.join(CONFIG["FOLDER"], FETCH_CACHE_FILENAME)) if cache_http else None
+        self.yt_feed = yt_feed
+        self.channel_ids = ChannelIdRepository(os.path.join(CONFIG["FOLDER"], YT_CHANNEL_IDS_FILENAME))
+        self._sin_cambios: set[str] = set()
+        self.browser_pool = browser_pool or BrowserPool()
+        self.health = SourceHealth(os.path.join(CONFIG["FOLDER"], SOURCE_HEALTH_FILENAME)) if salud_fuentes else None
         self.yt_extractor = YouTubeExtractor()
         self.web_extractor = WebExtractor()
 
     def guardar_avatars(self):
+        """Persiste los metadatos de canal: avatares y channel IDs de YouTube."""
         self.avatar_repo.guardar_si_cambio()
+        self.channel_ids.guardar_si_cambio()
+
+    def guardar_cache_http(self):
+        if self.fetch_cache:
+            logger.info(self.fetch_cache.resumen())
+            self.fetch_cache.guardar_si_cambio()
+
+    def guardar_salud(self):
+        if self.health:
+            logger.info(self.health.resumen())
+            self.health.guardar_si_cambio()
 
     def obtener_avatar_canal(self, nombre, url_canal):
         return self.avatar_repo.obtener_avatar(nombre, url_canal)
 
+    async def cerrar(self):
+        """Libera los recursos del scraper (pool de parseo y navegador headless)."""
+        if self._parse_pool:
+            self._parse_pool.shutdown(wait=True, cancel_futures=True)
+            self._parse_pool = None
+        await self.browser_pool.cerrar()
+
+    def _olvidar_validadores(self, *urls: str):
+        """Tras un fallo de parseo: la próxima ejecución no debe recibir un 304 / mismo hash
+        y dar la página por procesada, así que se descartan sus validadores."""
+        if self.fetch_cache:
+            for url in urls:
+                if url:
+                    self.fetch_cache.olvidar(url)
+
+    async def _parsear_web(self, html_text: str, nombre: str, target: str, info: dict) -> list:
+        """Parsea HTML fuera del event loop (pool de procesos acotado) salvo en modo inline."""
+        if self.parse_workers == 0:
+            return parsear_web(html_text, nombre, target, info)
+        if self._parse_pool is None:
+            self._parse_pool = ProcessPoolExecutor(max_workers=self.parse_workers)
+        loop = asyncio.get_running_loop()
+        async with self._parse_sem:
+            return await loop.run_in_executor(self._parse_pool, parsear_web, html_text, nombre, target, info)
+
+    async def _fetch(self, session, url, parar=None) -> str | None:
+        """GET condicional. Devuelve el cuerpo, o None si no es 200 o no ha cambiado.
+
+        Si se pasa ``parar`` (callable sobre los bytes leídos), el cuerpo se lee en
+        streaming y la conexión se suelta en cuanto la condición se cumple. Como el
+        corte depende de cómo lleguen los trozos, ``parar.digest(cuerpo)`` aporta la
+        huella estable de lo leído para la caché HTTP.
+        """
+        headers = self.yt_extractor.headers
+        if self.fetch_cache:
+            headers = {**headers, **self.fetch_cache.cabeceras(url)}
+        try:
+            for intento in range(2):
+                async with self.scheduler.turno(url):
+                    async with session.get(url, timeout=20, headers=headers) as response:
+                        if response.status in ESTADOS_BACKOFF:
+                            espera = self.scheduler.penalizar(url, response.headers.get("Retry-After"))
+                            if intento == 0 and espera <= MAX_ESPERA_REINTENTO:
+                                continue
+                            _anotar("errores", f"HTTP {response.status}")
+                            return None
+                        self.scheduler.exito(url)
+                        if response.status == 304 and self.fetch_cache:
+                            self.fetch_cache.registrar_no_modificado(url)
+                            self._sin_cambios.add(url)
+                            _anotar("sin_cambios")
+                            logger.info(f"♻️ Sin cambios (304): {url}")
+                            return None
+                        if response.status != 200:
+                            _anotar("errores", f"HTTP {response.status}")
+                            return None
+                        if parar is None:
+                            cuerpo = await response.read()
+                            text = await response.text()
+                        else:
+                            buffer = bytearray()
+                            async for chunk in response.content.iter_chunked(STREAM_CHUNK):
+                                buffer.extend(chunk)
+                                if parar(buffer):
+                                    break
+                            cuerpo = bytes(buffer)
+                            text = cuerpo.decode(response.charset or "utf-8", errors="replace")
+                        digest = parar.digest(cuerpo) if parar is not None else None
+                        if self.fetch_cache and not self.fetch_cache.registrar_respuesta(url, response.headers, cuerpo, digest):
+                            self._sin_cambios.add(url)
+                            _anotar("sin_cambios")
+                            logger.info(f"♻️ Sin cambios (mismo hash): {url}")
+                            return None
+                        return text
+        except Exception as e:
+            _anotar("errores", f"{type(e).__name__}: {e}")
+            raise
+        return None
+
+    async def _obtener_html(self, session, url, info) -> str | None:
+        """HTML de una fuente web: renderizado en el navegador si lleva "pw", si no GET condicional."""
+        if info.get(PLAYWRIGHT_KEY):
+            esperar = info.get(SELECTOR_KEY) or (SELECTOR_NOTICIAS if info.get(TIPO_KEY) != TIPO_VAL_HERRAMIENTA else None)
+            async with self.scheduler.turno(url):
+                text = await self.browser_pool.renderizar(url, esperar)
+            if text is not None:
+                return text
+        return await self._fetch(session, url)
+
+    async def _extraer_yt_feed(self, session, nombre, url) -> list | None:
+        """Vídeos desde el feed Atom del canal. None si hay que recurrir al HTML."""
+        if not self.yt_feed or any(r in url.lower() for r in YT_RUTAS_SOLO_HTML):
+            return None
+        channel_id = self.channel_ids.obtener(url)
+        if not channel_id:
+            return None
+        feed_url = YT_FEED_URL.format(channel_id)
+        lector = LectorRSS()
+        try:
+            text = await self._fetch(session, feed_url, parar=lector)
+        except Exception as e:
+            logger.debug(f"⚠️ Error leyendo feed de {nombre}: {e}")
+            text = None
+        if text is None:
+            if feed_url in self._sin_cambios:
+                return []
+            logger.warning(f"⚠️ Feed de {nombre} no disponible, se vuelve a la página del canal.")
+            return None
+        logger.info(f"📺 Procesando feed de YouTube: {nombre} ({channel_id})")
+        return self.yt_extractor.adaptar_items_feed(self.web_extractor.items_desde_rss(lector.entradas, nombre))
+
     async def _extraer_yt(self, session, nombre, url):
-        """Extrae videos de YouTube desde una URL de canal."""
+        """Extrae videos de YouTube desde una URL de canal (feed si es posible, si no HTML)."""
         results = []
         try:
-            async with session.get(url, timeout=20, headers=self.yt_extractor.headers) as response:
-                if response.status != 200:
-                    return []
-                text = await response.text()
+            results = await self._extraer_yt_feed(session, nombre, url)
+            if results is not None:
+                return results
+            results = []
+            text = await self._fetch(session, url, parar=FinDeYtInitialData())
+            if text is None:
+                return []
+            channel_id = self.yt_extractor.canal_id_desde_html(text)
+            if channel_id:
+                self.channel_ids.registrar(url, channel_id)
             logger.info(f"📺 Procesando fuente de YouTube: {nombre} ({url})")
-            json_data = re.search(r"ytInitialData\s*=\s*(\{.*?\});", text)
-            if not json_data:
-                json_data = re.search(r'window\[["\']ytInitialData["\']\]\s*=\s*(\{.*?\});', text)
-            if not json_data:
-                json_data = re.search(r"ytInitialPlayerResponse\s*=\s*(\{.*?\});", text)
-            if json_data:
-                logger.info(f"✅ JSON de YouTube encontrado para {nombre}.")
-                try:
-                    data = json.loads(json_data.group(1))
+            try:
+                data = extraer_yt_initial_data(text)
+                if data:
+                    logger.info(f"✅ JSON de YouTube encontrado para {nombre}.")
                     results = self.yt_extractor.extraer_desde_json(data, nombre, url)
-                except Exception as e:
-                    logger.error(f"⚠️ Error procesando JSON de YT ({nombre}): {e}", exc_info=True)
+            except Exception as e:
+                logger.error(f"⚠️ Error procesando JSON de YT ({nombre}): {e}", exc_info=True)
+                _anotar("errores", f"parseo: {type(e).__name__}: {e}")
             if not results:
                 results = self.yt_extractor.ejecutar_fallback(text, nombre)
         except Exception as e:
             logger.error(f"❌ Error extrayendo YT {nombre}: {e}")
+            _anotar("errores", f"{type(e).__name__}: {e}")
+            channel_id = self.channel_ids.obtener(url)
+            self._olvidar_validadores(url, YT_FEED_URL.format(channel_id) if channel_id else "")
         return results
 
     async def _extraer_web(self, session, nombre, url, info):
         """Extrae noticias/herramientas desde una URL web."""
         results = []
         try:
-            async with session.get(url, timeout=20, headers=self.yt_extractor.headers) as response:
-                if response.status != 200:
-                    return []
-                text = await response.text()
+            text = await self._obtener_html(session, url, info)
+            if text is None:
+                return []
             if info.get(TIPO_KEY) == TIPO_VAL_HERRAMIENTA:
                 logger.info(f"🔧 Extrayendo herramientas desde: {nombre}")
-                results = self.web_extractor.extraer_herramientas(text, nombre, url, info)
+                results = await self._parsear_web(text, nombre, url, info)
             else:
                 logger.info(f"🌐 Extrayendo noticias web desde: {nombre} ({url})")
-                results = self.web_extractor.extraer_noticias(text, nombre, url, info)
+                results = await self._parsear_web(text, nombre, url, info)
         except Exception as e:
             logger.error(f"❌ Error extrayendo web {nombre}: {e}")
+            _anotar("errores", f"{type(e).__name__}: {e}")
+            self._olvidar_validadores(url)
         return results
 
     async def extraer(self, session, nombre, info):
+        """Items de una fuente. Con salud_fuentes, registra el resultado y respeta el circuito."""
+        if self.health and not self.health.disponible(nombre):
+            logger.info(f"🔌 {nombre}: circuito abierto, se omite hasta el próximo sondeo.")
+            return []
+        estado = {}
+        _ESTADO_FUENTE.set(estado)
+        inicio = time.monotonic()
+        results = await self._extraer_fuente(session, nombre, info)
+        if self.health:
+            # Éxito = se descargó y parseó, aunque no trajera items (un canal sin vídeos nuevos:
+            # su videos.xml cambia en cada ejecución, así que nunca es 304). Solo los errores de
+            # descarga o parseo cuentan para el circuito, y los de pasos con alternativa
+            # (feed → HTML, RSS → web) no cuentan si hubo items.
+            ok = bool(results) or not estado.get("errores")
+            self.health.registrar(nombre, ok, time.monotonic() - inicio, estado.get("error", ""), items=len(results))
+        return results
+
+    async def _extraer_fuente(self, session, nombre, info):
         target = info.get(YT_KEY) or info.get(URL_KEY) or info.get(RSS_KEY)
         results = []
         es_rss = RSS_KEY in info
         try:
             if es_rss:
-                async with session.get(target, timeout=20, headers=self.yt_extractor.headers) as response:
-                    if response.status != 200:
-                        return []
-                    text = await response.text()
-                logger.info(f"📡 Extrayendo RSS desde: {nombre} ({target})")
-                results = self.web_extractor.extraer_rss(text, nombre, info)
+                rss_url = info[RSS_KEY]
+                lector = LectorRSS()
+                text = await self._fetch(session, rss_url, parar=lector)
+                if text is not None:
+                    logger.info(f"📡 Extrayendo RSS desde: {nombre} ({rss_url})")
+                    results = self.web_extractor.items_desde_rss(lector.entradas, nombre, info)
+                # Sin items del feed (vacío, sin cambios o no disponible) la web tiene la última
+                # palabra; su GET también es condicional, así que si no cambió sale barato
                 if not results and URL_KEY in info:
                     logger.info(f"⚠️ RSS vacío para {nombre}, intentando web scraping...")
                     fallback_url = info[URL_KEY]
-                    async with session.get(fallback_url, timeout=20, headers=self.yt_extractor.headers) as response:
-                        if response.status == 200:
-                            text = await response.text()
-                            results = self.web_extractor.extraer_noticias(text, nombre, fallback_url, info)
+                    text = await self._obtener_html(session, fallback_url, info)
+                    if text is not None:
+                        results = await self._parsear_web(text, nombre, fallback_url, {**info, TIPO_KEY: TIPO_VAL_NOTICIA})
             elif YT_KEY in info and URL_KEY in info:
                 yt_url = info[YT_KEY]
                 web_url = info[URL_KEY]
@@ -491,4 +848,6 @@ class ScraperPro:
                 results = await self._extraer_web(session, nombre, target, info)
         except Exception as e:
             print(f"❌ Error en fuente {nombre}: {e}")
+            _anotar("errores", f"{type(e).__name__}: {e}")
+            self._olvidar_validadores(target, info.get(URL_KEY), info.get(RSS_KEY))
         return results
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+source_health.py — Registro persistente de salud por fuente + circuit breaker.
+
+Por cada fuente guarda el último éxito, los fallos consecutivos, la latencia
+media, el rendimiento medio (items nuevos por ejecución, media exponencial) y
+las ejecuciones seguidas que respondieron bien pero sin items.
+
+  - Circuito: solo cuentan los fallos de descarga o parseo; una respuesta
+    correcta sin items es un éxito. Tras UMBRAL_FALLOS fallos seguidos la fuente deja de consultarse
+    durante REPROBE_BASE_H horas, duplicando la pausa en cada re-sondeo fallido
+    (hasta REPROBE_MAX_H). Un éxito la cierra.
+  - Sondeo adaptativo: fuentes con buen rendimiento se promocionan al tier
+    light (cada hora) aunque no tengan "quick"; las "quick" sin novedades en
+    DIAS_OBSOLETA días se degradan y el tier light solo las consulta cada
+    HORAS_DEGRADADA horas. También cuentan como sin novedades las que llevan
+    MIN_EJECUCIONES ejecuciones seguidas sin items.
+
+Uso:
+  python -m scripts.scrapers.source_health            # informe JSON
+  python -m scripts.scrapers.source_health --fuente X # registro de una fuente
+"""
+import argparse
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+
+from scripts.utils.constants_downloadfile import CONFIG, FUENTE_KEY, SOURCE_HEALTH_FILENAME
+
+logger = logging.getLogger("scraper_base")
+
+ULTIMO_EXITO_KEY = "ultimo_exito"
+ULTIMO_NUEVO_KEY = "ultimo_nuevo"
+FALLOS_KEY = "fallos_consecutivos"
+LATENCIA_KEY = "latencia_media"
+RENDIMIENTO_KEY = "rendimiento_medio"
+EJECUCIONES_KEY = "ejecuciones"
+ABIERTO_HASTA_KEY = "abierto_hasta"
+ULTIMO_ERROR_KEY = "ultimo_error"
+ULTIMA_CONSULTA_KEY = "ultima_consulta"
+SIN_ITEMS_KEY = "sin_items_consecutivas"
+
+UMBRAL_FALLOS = 3
+REPROBE_BASE_H = 6
+REPROBE_MAX_H = 24 * 7
+# Peso de la última ejecución en las medias exponenciales
+ALFA = 0.2
+# Items nuevos medios por ejecución para subir al tier light
+UMBRAL_PROMOCION = 1.0
+MIN_EJECUCIONES = 5
+DIAS_OBSOLETA = 7
+HORAS_DEGRADADA = 6
+
+
+class SourceHealth:
+    """Salud por fuente persistida en JSON (mismo patrón que FetchCache)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.fuentes: dict[str, dict] = self._cargar()
+        self.cambios = False
+        self.consultadas: set[str] = set()
+
+    def _cargar(self) -> dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning("⚠️ Error leyendo salud de fuentes %s: %s", self.path, e)
+        return {}
+
+    def _entrada(self, nombre: str) -> dict:
+        return self.fuentes.setdefault(nombre, {
+            ULTIMO_EXITO_KEY: "", ULTIMO_NUEVO_KEY: "", FALLOS_KEY: 0, LATENCIA_KEY: 0.0,
+            RENDIMIENTO_KEY: 0.0, EJECUCIONES_KEY: 0, ABIERTO_HASTA_KEY: "", ULTIMO_ERROR_KEY: "",
+            ULTIMA_CONSULTA_KEY: "",
+        })
+
+    # ── Circuit breaker ──
+
+    def disponible(self, nombre: str, ahora: datetime | None = None) -> bool:
+        """False mientras el circuito de la fuente está abierto."""
+        abierto_hasta = self.fuentes.get(nombre, {}).get(ABIERTO_HASTA_KEY, "")
+        return not abierto_hasta or (ahora or datetime.now()).isoformat() >= abierto_hasta
+
+    def registrar(self, nombre: str, ok: bool, latencia: float, error: str = "", ahora: datetime | None = None,
+                  items: int | None = None):
+        """Resultado de una consulta: éxito (aunque no haya novedades) o fallo.
+        ``items`` (extraídos en esta consulta) lleva la cuenta de respuestas vacías seguidas."""
+        ahora = ahora or datetime.now()
+        e = self._entrada(nombre)
+        self.consultadas.add(nombre)
+        e[EJECUCIONES_KEY] += 1
+        e[ULTIMA_CONSULTA_KEY] = ahora.isoformat()
+        e[LATENCIA_KEY] = round(latencia if e[EJECUCIONES_KEY] == 1 else (1 - ALFA) * e[LATENCIA_KEY] + ALFA * latencia, 3)
+        if ok and items is not None:
+            e[SIN_ITEMS_KEY] = 0 if items else e.get(SIN_ITEMS_KEY, 0) + 1
+        if ok:
+            if e[FALLOS_KEY] >= UMBRAL_FALLOS:
+                logger.info(f"✅ {nombre} vuelve a responder, circuito cerrado.")
+            e.update({ULTIMO_EXITO_KEY: ahora.isoformat(), FALLOS_KEY: 0, ABIERTO_HASTA_KEY: "", ULTIMO_ERROR_KEY: ""})
+        else:
+            e[FALLOS_KEY] += 1
+            e[ULTIMO_ERROR_KEY] = error[:200]
+            if e[FALLOS_KEY] >= UMBRAL_FALLOS:
+                horas = min(REPROBE_BASE_H * 2 ** (e[FALLOS_KEY] - UMBRAL_FALLOS), REPROBE_MAX_H)
+                e[ABIERTO_HASTA_KEY] = (ahora + timedelta(hours=horas)).isoformat()
+                logger.warning(f"🔌 {nombre}: {e[FALLOS_KEY]} fallos seguidos, circuito abierto {horas}h.")
+        self.cambios = True
+
+    # ── Sondeo adaptativo ──
+
+    def registrar_nuevos(self, nombre: str, nuevos: int, ahora: datetime | None = None):
+        """Items nuevos (tras dedup contra el histórico) aportados en esta ejecución."""
+        e = self._entrada(nombre)
+        e[RENDIMIENTO_KEY] = round((1 - ALFA) * e[RENDIMIENTO_KEY] + ALFA * nuevos, 3)
+        if nuevos:
+            e[ULTIMO_NUEVO_KEY] = (ahora or datetime.now()).isoformat()
+        self.cambios = True
+
+    def registrar_nuevos_items(self, nuevos: list[dict], ahora: datetime | None = None):
+        """Reparte los items nuevos de la ejecución entre las fuentes consultadas (0 si no aportaron)."""
+        por_fuente: dict[str, int] = {}
+        for item in nuevos:
+            por_fuente[item.get(FUENTE_KEY, "")] = por_fuente.get(item.get(FUENTE_KEY, ""), 0) + 1
+        for nombre in self.consultadas:
+            self.registrar_nuevos(nombre, por_fuente.get(nombre, 0), ahora)
+
+    def promocionada(self, nombre: str) -> bool:
+        e = self.fuentes.get(nombre, {})
+        return e.get(EJECUCIONES_KEY, 0) >= MIN_EJECUCIONES and e.get(RENDIMIENTO_KEY, 0.0) >= UMBRAL_PROMOCION
+
+    def obsoleta(self, nombre: str, ahora: datetime | None = None) -> bool:
+        e = self.fuentes.get(nombre, {})
+        if e.get(EJECUCIONES_KEY, 0) < MIN_EJECUCIONES:
+            return False
+        if e.get(SIN_ITEMS_KEY, 0) >= MIN_EJECUCIONES:
+            return True
+        limite = ((ahora or datetime.now()) - timedelta(days=DIAS_OBSOLETA)).isoformat()
+        return e.get(ULTIMO_NUEVO_KEY, "") < limite
+
+    def en_tier_rapido(self, nombre: str, quick: bool, ahora: datetime | None = None) -> bool:
+        """¿Se consulta en el tier light? quick estático, ajustado por rendimiento."""
+        ahora = ahora or datetime.now()
+        if not quick:
+            return self.promocionada(nombre)
+        if not self.obsoleta(nombre, ahora):
+            return True
+        limite = (ahora - timedelta(hours=HORAS_DEGRADADA)).isoformat()
+        return self.fuentes[nombre].get(ULTIMA_CONSULTA_KEY, "") < limite
+
+    # ── Persistencia e informe ──
+
+    def guardar_si_cambio(self):
+        if not self.cambios:
+            return
+        basedir = os.path.dirname(self.path) or "."
+        os.makedirs(basedir, exist_ok=True)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.fuentes, f, indent=1, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp, self.path)
+            self.cambios = False
+            logger.info("💾 Salud de fuentes actualizada (%d fuentes).", len(self.fuentes))
+        except OSError as e:
+            logger.error("❌ Error escribiendo salud de fuentes %s: %s", self.path, e)
+
+    def informe(self, ahora: datetime | None = None) -> dict:
+        ahora = ahora or datetime.now()
+        abiertas = {n: e for n, e in self.fuentes.items() if not self.disponible(n, ahora)}
+        return {
+            "generado": ahora.isoformat(timespec="seconds"),
+            "fuentes": len(self.fuentes),
+            "circuito_abierto": {
+                n: {k: e[k] for k in (FALLOS_KEY, ABIERTO_HASTA_KEY, ULTIMO_EXITO_KEY, ULTIMO_ERROR_KEY)}
+                for n, e in sorted(abiertas.items())
+            },
+            "promocionadas": sorted(n for n in self.fuentes if self.promocionada(n)),
+            "obsoletas": sorted(n for n in self.fuentes if self.obsoleta(n, ahora)),
+            "sin_items": sorted(n for n, e in self.fuentes.items() if e.get(SIN_ITEMS_KEY, 0) >= MIN_EJECUCIONES),
+            "mas_lentas": [
+                {"fuente": n, LATENCIA_KEY: e[LATENCIA_KEY]}
+                for n, e in sorted(self.fuentes.items(), key=lambda x: -x[1][LATENCIA_KEY])[:10]
+            ],
+        }
+
+    def resumen(self) -> str:
+        inf = self.informe()
+        return (
+            f"🩺 Salud de fuentes: {len(inf['circuito_abierto'])} con circuito abierto, "
+            f"{len(inf['promocionadas'])} promocionadas, {len(inf['obsoletas'])} obsoletas"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Informe de salud de las fuentes de scraping")
+    parser.add_argument("--fuente", help="Muestra el registro completo de una fuente")
+    args = parser.parse_args()
+    salud = SourceHealth(os.path.join(CONFIG["FOLDER"], SOURCE_HEALTH_FILENAME))
+    data = salud.fuentes.get(args.fuente, {}) if args.fuente else salud.informe()
+    print(json.dumps(data, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
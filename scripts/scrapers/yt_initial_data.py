@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+yt_initial_data.py — Extracción acotada de ytInitialData en páginas de canal de YouTube.
+
+En lugar de aplicar una regex sobre varios MB de HTML y hacer json.loads del
+blob completo, se localiza el inicio de ytInitialData, se salta directamente a
+la lista de vídeos de la primera pestaña y se decodifican solo los primeros
+elementos con ``json.JSONDecoder.raw_decode``. Si la estructura no es la
+esperada, se recorta el objeto completo con un tokenizador de llaves (que
+respeta cadenas y escapes) y se decodifica entero.
+
+Además ``FinDeYtInitialData`` sirve como condición de parada para leer el
+cuerpo HTTP en streaming: en cuanto el <script> de ytInitialData está completo
+no hace falta seguir descargando.
+"""
+import json
+import re
+
+from scripts.scrapers.fetch_cache import hash_contenido
+
+MARCADORES = (
+    re.compile(r"ytInitialData\s*=\s*"),
+    re.compile(r'window\[["\']ytInitialData["\']\]\s*=\s*'),
+    re.compile(r"ytInitialPlayerResponse\s*=\s*"),
+)
+
+# Listas de vídeos de la primera pestaña (layout actual y layout antiguo)
+_LISTA_RICH = re.compile(r'"richGridRenderer"\s*:\s*\{\s*"contents"\s*:\s*\[')
+_LISTA_GRID = re.compile(r'"gridRenderer"\s*:\s*\{\s*"items"\s*:\s*\[')
+
+_DECODER = json.JSONDecoder()
+_ESPACIOS = " \t\r\n"
+
+
+def localizar_inicio(texto: str) -> int:
+    """Posición de la '{' que abre ytInitialData (o -1 si no aparece)."""
+    for marcador in MARCADORES:
+        m = marcador.search(texto)
+        if m and texto.startswith("{", m.end()):
+            return m.end()
+    return -1
+
+
+def fin_objeto(texto: str, inicio: int) -> int:
+    """Índice justo después de la '}' que cierra el objeto abierto en ``inicio``.
+
+    Tokenizador mínimo de llaves: ignora llaves dentro de cadenas JSON y
+    respeta los escapes. Devuelve -1 si el objeto está incompleto.
+    """
+    profundidad = 0
+    en_cadena = False
+    i = inicio
+    n = len(texto)
+    while i < n:
+        c = texto[i]
+        if en_cadena:
+            if c == "\\":
+                i += 2
+                continue
+            if c == '"':
+                en_cadena = False
+        elif c == '"':
+            en_cadena = True
+        elif c == "{" or c == "[":
+            profundidad += 1
+        elif c == "}" or c == "]":
+            profundidad -= 1
+            if profundidad == 0:
+                return i + 1
+        i += 1
+    return -1
+
+
+def _decodificar_lista(texto: str, pos: int, limite: int) -> list | None:
+    """Decodifica hasta ``limite`` elementos de un array JSON que empieza en ``pos``."""
+    items = []
+    n = len(texto)
+    while len(items) < limite:
+        while pos < n and texto[pos] in _ESPACIOS:
+            pos += 1
+        if pos >= n:
+            return None
+        if texto[pos] == "]":
+            break
+        try:
+            item, pos = _DECODER.raw_decode(texto, pos)
+        except json.JSONDecodeError:
+            return None
+        items.append(item)
+        while pos < n and texto[pos] in _ESPACIOS:
+            pos += 1
+        if pos < n and texto[pos] == ",":
+            pos += 1
+    return items
+
+
+def _envolver(items: list, clave: str) -> dict:
+    """Estructura mínima que entiende YouTubeExtractor.extraer_desde_json."""
+    if clave == "richGridRenderer":
+        contenido = {"richGridRenderer": {"contents": items}}
+    else:
+        contenido = {"sectionListRenderer": {"contents": [
+            {"itemSectionRenderer": {"contents": [{"gridRenderer": {"items": items}}]}}
+        ]}}
+    return {"contents": {"twoColumnBrowseResultsRenderer": {"tabs": [{"tabRenderer": {"content": contenido}}]}}}
+
+
+def extraer_yt_initial_data(texto: str, limite: int = 10) -> dict | None:
+    """Devuelve ytInitialData (o una versión recortada con los primeros vídeos)."""
+    inicio = localizar_inicio(texto)
+    if inicio < 0:
+        return None
+
+    # Vía rápida: primera lista de vídeos tras ytInitialData, solo ``limite`` elementos
+    for patron, clave in ((_LISTA_RICH, "richGridRenderer"), (_LISTA_GRID, "gridRenderer")):
+        m = patron.search(texto, inicio)
+        if m:
+            items = _decodificar_lista(texto, m.end(), limite)
+            if items:
+                return _envolver(items, clave)
+
+    # Vía completa: objeto entero delimitado por el tokenizador de llaves
+    fin = fin_objeto(texto, inicio)
+    if fin < 0:
+        return None
+    try:
+        return json.loads(texto[inicio:fin])
+    except json.JSONDecodeError:
+        return None
+
+
+class FinDeYtInitialData:
+    """Condición de parada para leer en streaming: True cuando ytInitialData ya está completo."""
+
+    MARCADOR = b"ytInitialData"
+    CIERRE = b"</script>"
+
+    def __init__(self):
+        self._inicio = -1
+        self._desde = 0
+        self._fin = -1
+
+    def __call__(self, buffer: bytes | bytearray) -> bool:
+        if self._inicio < 0:
+            self._inicio = buffer.find(self.MARCADOR, max(0, self._desde - len(self.MARCADOR)))
+            if self._inicio < 0:
+                self._desde = len(buffer)
+                return False
+            self._desde = self._inicio
+        encontrado = buffer.find(self.CIERRE, max(self._inicio, self._desde - len(self.CIERRE)))
+        self._desde = len(buffer)
+        if encontrado >= 0:
+            self._fin = encontrado + len(self.CIERRE)
+        return encontrado >= 0
+
+    def digest(self, cuerpo: bytes) -> str:
+        """Huella hasta el cierre del <script> de ytInitialData (no depende del tamaño de los trozos)."""
+        return hash_contenido(cuerpo[:self._fin] if self._fin >= 0 else cuerpo)
@@ -10,6 +10,7 @@ Uso:
     python scripts/tips_generator.py --stats            # estadísticas
 """
 
+import asyncio
 import json
 import os
 import random
@@ -21,9 +22,10 @@ import requests
 
 # ── Paths ──
 SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent))  # para importar scripts.utils (history_store, ai_client)
 DB_PATH = SCRIPT_DIR / "utils" / "tips_database.json"
 HISTORY_PATH = SCRIPT_DIR.parent / "tips_history.json"
-NEWS_PATH = SCRIPT_DIR.parent / "files" / "noticias_historico.json"
+NEWS_DIR = SCRIPT_DIR.parent / "files"
 TOOLS_PATH = SCRIPT_DIR.parent / "files" / "herramientas.json"
 
 # ── Telegram config ──
@@ -596,14 +598,12 @@ def save_history(history):
 
 
 def load_recent_news(count=15):
-    if not NEWS_PATH.exists():
-        return []
     try:
-        with open(NEWS_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            return []
-        recent = sorted(data, key=lambda x: x.get("ts", ""), reverse=True)[:count]
+        # Solo se leen las últimas filas del histórico, no el fichero entero
+        from scripts.utils.history_store import abrir_historico
+
+        with abrir_historico(folder=str(NEWS_DIR)) as store:
+            recent = store.ultimos(count)
         result = []
         for item in recent:
             titulo = item.get("titulo", "")
@@ -764,6 +764,7 @@ def generate_tips_gemini(count, categories, sent_titles):
 
     try:
         from google import genai
+        from scripts.utils.ai_client import generar_contenido
         client = genai.Client(api_key=GEMINI_API_KEY)
     except ImportError:
         print("⚠️  google-genai no instalado. Solo se usarán tips de la DB.")
@@ -777,10 +778,8 @@ def generate_tips_gemini(count, categories, sent_titles):
     prompt = build_gemini_prompt(categories, sent_titles, news, tools)
 
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
+        # Mismo router de cuota y timeout que el resto de llamadas a Gemini
+        response = asyncio.run(generar_contenido(client, "gemini-2.5-flash", prompt))
         text = response.text.strip()
         if text.startswith("```"):
             text = text.split("\n", 1)[1] if "\n" in text else text[3:]
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+benchmarks.py — Micro-benchmarks de las rutas calientes del scraping.
+
+Uso:
+    python -m scripts.tools.benchmarks yt                         # páginas sintéticas
+    python -m scripts.tools.benchmarks yt --pages "grabaciones/*.html"
+    python -m scripts.tools.benchmarks keywords                   # títulos del histórico
+    python -m scripts.tools.benchmarks keywords --sinteticos      # títulos generados
+    python -m scripts.tools.benchmarks rss                        # feed sintético con content:encoded
+    python -m scripts.tools.benchmarks dedup --n 1000 10000 100000  # títulos casi duplicados
+    python -m scripts.tools.benchmarks n8n --n 1000 20000         # N8nCache contra el servidor local
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import tempfile
+import time
+import tracemalloc
+from xml.etree import ElementTree
+
+from scripts.scrapers.rss_stream import LectorRSS
+from scripts.scrapers.scraper_base import YouTubeExtractor
+from scripts.scrapers.yt_initial_data import FinDeYtInitialData, extraer_yt_initial_data
+from scripts.utils.cache import CacheManager, N8nCache
+from scripts.utils.cache_server import ServidorCacheLocal
+from scripts.utils.common import deduplicar_items, normalizar_url
+from scripts.utils.constants_downloadfile import (
+    ALL_KEYWORDS, CATEGORIAS, CATEGORIA_GENERAL, CONFIG, ENLACE_KEY, KEYWORD_MATCHER, TITULO_KEY,
+)
+from scripts.utils.history_store import abrir_historico
+from scripts.utils.title_dedup import MODO_FUZZY, MODO_PREFIJO
+
+
+def _medir(fn, repeticiones: int) -> float:
+    """Tiempo medio por llamada en milisegundos."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        fn()
+    return (time.perf_counter() - inicio) * 1000 / repeticiones
+
+
+def _tabla(filas: list[tuple]):
+    anchos = [max(len(str(f[i])) for f in filas) for i in range(len(filas[0]))]
+    for fila in filas:
+        print("  ".join(str(c).ljust(a) for c, a in zip(fila, anchos)))
+
+
+# ── YouTube: ytInitialData ──
+
+def _pagina_yt_sintetica(n_videos: int = 30, relleno_kb: int = 1500) -> str:
+    """Página de canal con un ytInitialData del tamaño de una real (~MB)."""
+    def video(i):
+        return {"richItemRenderer": {"content": {"videoRenderer": {
+            "videoId": f"v{i:010d}",
+            "thumbnail": {"thumbnails": [{"url": f"https://i.ytimg.com/vi/{i}/hq.jpg", "width": 336}] * 4},
+            "title": {"runs": [{"text": f"Tutorial {i}: novedades de Python y Rust"}]},
+            "publishedTimeText": {"simpleText": f"hace {i % 6 + 1} días"},
+            "navigationEndpoint": {"clickTrackingParams": "x" * 400, "commandMetadata": {"webCommandMetadata": {"url": f"/watch?v={i}"}}},
+            "trackingParams": "t" * 300,
+        }}}}
+    data = {
+        "responseContext": {"serviceTrackingParams": [{"params": [{"k": "x" * 200}] * 50}]},
+        "contents": {"twoColumnBrowseResultsRenderer": {"tabs": [
+            {"tabRenderer": {"title": "Inicio", "trackingParams": "t" * 100}},
+            {"tabRenderer": {"selected": True, "content": {"richGridRenderer": {
+                "contents": [video(i) for i in range(n_videos)],
+            }}}},
+        ]}},
+        "frameworkUpdates": {"entityBatchUpdate": {"mutations": [
+            {"payload": {"blob": "".join(random.choices("abcdef0123456789", k=1024))}} for _ in range(relleno_kb // 2)
+        ]}},
+    }
+    pie = "<script>var ytcfg = " + json.dumps({"pie": "y" * (relleno_kb * 512)}) + ";</script>"
+    return f"<html><head></head><body><script>var ytInitialData = {json.dumps(data)};</script>{pie}</body></html>"
+
+
+def _ruta_regex_json(texto: str):
+    """Ruta anterior de ScraperPro._extraer_yt: regex sobre todo el HTML + json.loads completo."""
+    m = re.search(r"ytInitialData\s*=\s*(\{.*?\});", texto)
+    if not m:
+        m = re.search(r'window\[["\']ytInitialData["\']\]\s*=\s*(\{.*?\});', texto)
+    if not m:
+        m = re.search(r"ytInitialPlayerResponse\s*=\s*(\{.*?\});", texto)
+    return json.loads(m.group(1)) if m else None
+
+
+def _bytes_hasta_parada(cuerpo: bytes, chunk: int = 64 * 1024) -> int:
+    parar = FinDeYtInitialData()
+    buffer = bytearray()
+    for i in range(0, len(cuerpo), chunk):
+        buffer.extend(cuerpo[i:i + chunk])
+        if parar(buffer):
+            break
+    return len(buffer)
+
+
+def bench_yt(args):
+    paginas = [(p, open(p, encoding="utf-8", errors="replace").read()) for p in sorted(glob.glob(args.pages))] if args.pages else []
+    if not paginas:
+        paginas = [(f"sintética-{i}", _pagina_yt_sintetica()) for i in range(3)]
+    ext = YouTubeExtractor()
+    filas = [("página", "KB", "KB leídos", "regex+json ms", "acotado ms", "x", "mismos vídeos")]
+    for nombre, texto in paginas:
+        url = "https://www.youtube.com/@canal/videos"
+        viejo = _ruta_regex_json(texto)
+        nuevo = extraer_yt_initial_data(texto)
+        ids_viejo = [r["id_video"] for r in ext.extraer_desde_json(viejo, "c", url)] if viejo else []
+        ids_nuevo = [r["id_video"] for r in ext.extraer_desde_json(nuevo, "c", url)] if nuevo else []
+        t_viejo = _medir(lambda: _ruta_regex_json(texto), args.repeticiones)
+        t_nuevo = _medir(lambda: extraer_yt_initial_data(texto), args.repeticiones)
+        cuerpo = texto.encode("utf-8")
+        filas.append((
+            nombre[-30:], len(cuerpo) // 1024, _bytes_hasta_parada(cuerpo) // 1024,
+            f"{t_viejo:.2f}", f"{t_nuevo:.2f}", f"{t_viejo / t_nuevo:.1f}", ids_viejo == ids_nuevo,
+        ))
+    _tabla(filas)
+
+
+# ── Keywords: clasificar_noticia + ContentFilter ──
+
+def _clasificar_por_bucles(titulo: str) -> str:
+    """clasificar_noticia original: un `in` por keyword de cada categoría."""
+    t_padded = " " + titulo.lower() + " "
+    for cat, keywords in CATEGORIAS.items():
+        for k in keywords:
+            if " " + k.lower() + " " in t_padded:
+                return cat
+    return CATEGORIA_GENERAL
+
+
+def _coincide_por_bucles(titulo: str) -> bool:
+    """ContentFilter.coincide_con_keywords original."""
+    t_low = titulo.lower()
+    return any(key.lower() in t_low for key in ALL_KEYWORDS)
+
+
+def _titulos_sinteticos(n: int = 10000) -> list[str]:
+    rnd = random.Random(42)
+    keywords = ALL_KEYWORDS + [k for ks in CATEGORIAS.values() for k in ks]
+    relleno = ("el la de nuevo lanza para con sobre según hoy guía análisis empresa usuarios "
+               "versión the new with how why launch said main update").split()
+    titulos = []
+    for _ in range(n):
+        palabras = rnd.choices(relleno, k=rnd.randint(6, 14))
+        for _ in range(rnd.randint(0, 2)):
+            palabras.insert(rnd.randrange(len(palabras) + 1), rnd.choice(keywords) + rnd.choice(["", "", ":", "s"]))
+        titulos.append(" ".join(palabras))
+    return titulos
+
+
+def bench_keywords(args):
+    if args.sinteticos:
+        titulos, origen = _titulos_sinteticos(), "sintéticos"
+    else:
+        with abrir_historico(args.carpeta) as store:
+            titulos = [t for t in (n.get(TITULO_KEY, "") for n in store.todos()) if t]
+        origen = f"histórico ({args.carpeta})"
+        if not titulos:
+            raise SystemExit(f"❌ Histórico sin títulos en {args.carpeta}: usa --carpeta o --sinteticos")
+    viejos = [(_coincide_por_bucles(t), _clasificar_por_bucles(t)) for t in titulos]
+    nuevos = [(c, cat or CATEGORIA_GENERAL) for c, cat in map(KEYWORD_MATCHER.analizar, titulos)]
+    t_viejo = _medir(lambda: [(_coincide_por_bucles(t), _clasificar_por_bucles(t)) for t in titulos], args.repeticiones)
+    t_nuevo = _medir(lambda: [KEYWORD_MATCHER.analizar(t) for t in titulos], args.repeticiones)
+    _tabla([
+        ("títulos", "origen", "bucles ms", "autómata ms", "x", "idénticos"),
+        (len(titulos), origen, f"{t_viejo:.1f}", f"{t_nuevo:.1f}", f"{t_viejo / t_nuevo:.1f}", viejos == nuevos),
+    ])
+
+
+# ── RSS: fromstring completo vs LectorRSS incremental ──
+
+def _feed_sintetico(n_items: int = 60, cuerpo_kb: int = 15) -> bytes:
+    """Feed con artículos completos en content:encoded, como los de los blogs grandes."""
+    items = "".join(
+        f"<item><title>Artículo {i}</title><link>https://blog.dev/{i}</link>"
+        f"<pubDate>Mon, 01 Jun 2026 10:00:00 GMT</pubDate><description>Resumen {i}</description>"
+        f"<content:encoded><![CDATA[<p>{'lorem ipsum ' * (cuerpo_kb * 85)}</p>]]></content:encoded></item>"
+        for i in range(n_items)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0" '
+        'xmlns:content="http://purl.org/rss/1.0/modules/content/">'
+        f"<channel><title>Blog</title>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+def _rss_completo(cuerpo: bytes) -> list:
+    root = ElementTree.fromstring(cuerpo)
+    return [(i.findtext("title", ""), i.findtext("link", ""), i.findtext("pubDate", "")) for i in root.find("channel").findall("item")[:12]]
+
+
+def _rss_incremental(cuerpo: bytes, chunk: int = 64 * 1024) -> tuple[list, int]:
+    lector = LectorRSS()
+    buffer = bytearray()
+    for i in range(0, len(cuerpo), chunk):
+        buffer.extend(cuerpo[i:i + chunk])
+        if lector(buffer):
+            break
+    return lector.entradas, len(buffer)
+
+
+def _pico_kb(fn) -> int:
+    tracemalloc.start()
+    fn()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return pico // 1024
+
+
+def bench_rss(args):
+    cuerpo = _feed_sintetico(args.items, args.kb)
+    completo = _rss_completo(cuerpo)
+    incremental, leidos = _rss_incremental(cuerpo)
+    _tabla([
+        ("feed KB", "KB leídos", "completo ms", "incremental ms", "pico completo KB", "pico incremental KB", "mismas entradas"),
+        (
+            len(cuerpo) // 1024, leidos // 1024,
+            f"{_medir(lambda: _rss_completo(cuerpo), args.repeticiones):.1f}",
+            f"{_medir(lambda: _rss_incremental(cuerpo), args.repeticiones):.1f}",
+            _pico_kb(lambda: _rss_completo(cuerpo)), _pico_kb(lambda: _rss_incremental(cuerpo)),
+            completo == incremental,
+        ),
+    ])
+
+
+# ── Dedup: bucle O(n²) de prefijos vs TitleDeduplicator ──
+
+def _deduplicar_por_bucles(items: list, umbral_similitud: float = 0.85) -> list:
+    """deduplicar_items original: cada título contra todos los ya aceptados."""
+    urls_vistas: set = set()
+    titulos_vistos: list[str] = []
+    resultado: list = []
+    for item in items:
+        url = normalizar_url(item.get(ENLACE_KEY, ""))
+        if url and url in urls_vistas:
+            continue
+        if url:
+            urls_vistas.add(url)
+        titulo = (item.get(TITULO_KEY) or "").lower().strip()
+        if titulo:
+            duplicado = False
+            for t in titulos_vistos:
+                min_len = min(len(titulo), len(t))
+                if min_len > 10:
+                    prefijo = int(min_len * umbral_similitud)
+                    if titulo[:prefijo] == t[:prefijo]:
+                        duplicado = True
+                        break
+            if duplicado:
+                continue
+            titulos_vistos.append(titulo)
+        resultado.append(item)
+    return resultado
+
+
+def _items_con_duplicados(n: int, proporcion: float = 0.1) -> list[dict]:
+    """Titulares aleatorios; ``proporcion`` de ellos son variantes de uno anterior."""
+    rnd = random.Random(7)
+    vocabulario = ["".join(rnd.choices("abcdefghijklmnopqrstuvwxyz", k=rnd.randint(3, 10))) for _ in range(5000)]
+    titulos: list[str] = []
+    for _ in range(n):
+        if titulos and rnd.random() < proporcion:
+            palabras = rnd.choice(titulos).split()
+            variante = rnd.randrange(3)
+            if variante == 0:
+                palabras.append(rnd.choice(["| Blog", "- Xataka", "(vídeo)"]))
+            elif variante == 1:
+                palabras[-1] = rnd.choice(vocabulario)
+            else:
+                palabras[len(palabras) // 3] = rnd.choice(vocabulario)
+            titulos.append(" ".join(palabras))
+        else:
+            titulos.append(" ".join(rnd.choices(vocabulario, k=rnd.randint(6, 14))).capitalize())
+    return [{TITULO_KEY: t, ENLACE_KEY: f"https://blog.dev/{i}"} for i, t in enumerate(titulos)]
+
+
+def bench_dedup(args):
+    filas = [("items", "bucles ms", "prefijo ms", "fuzzy ms", "quedan bucles", "quedan prefijo", "quedan fuzzy", "idénticos")]
+    for n in args.n:
+        items = _items_con_duplicados(n)
+        prefijo = deduplicar_items(items, modo=MODO_PREFIJO)
+        fuzzy = deduplicar_items(items, modo=MODO_FUZZY)
+        t_prefijo = _medir(lambda: deduplicar_items(items, modo=MODO_PREFIJO), 1)
+        t_fuzzy = _medir(lambda: deduplicar_items(items, modo=MODO_FUZZY), 1)
+        if n <= args.max_bucles:
+            bucles = _deduplicar_por_bucles(items)
+            t_bucles = f"{_medir(lambda: _deduplicar_por_bucles(items), 1):.0f}"
+            quedan_bucles, identicos = len(bucles), bucles == prefijo
+        else:
+            t_bucles, quedan_bucles, identicos = "—", "—", "—"
+        filas.append((n, t_bucles, f"{t_prefijo:.0f}", f"{t_fuzzy:.0f}", quedan_bucles, len(prefijo), len(fuzzy), identicos))
+    _tabla(filas)
+
+
+def bench_n8n(args):
+    """Estado completo (lo que hacía un save() entero) vs PATCH con los cambios; GET 200 vs 304."""
+    filas = [("claves", "cambios", "completo KB", "completo ms", "delta KB", "delta ms", "GET 200 ms", "GET 304 ms")]
+    ahora = time.time()
+    with ServidorCacheLocal() as servidor:
+        for n in args.n:
+            datos = {f"https://blog.dev/{n}/{i}": {"ts": ahora - i} for i in range(n)}
+            completo = N8nCache(servidor.url(f"completo{n}"), backoff=0.01)
+            completo.load()
+            inicio = time.perf_counter()
+            completo.save(datos)
+            t_completo = (time.perf_counter() - inicio) * 1000
+
+            base = N8nCache(servidor.url(f"delta{n}"), backoff=0.01)
+            base.load()
+            base.save(datos)
+            with tempfile.TemporaryDirectory() as d:
+                copia = os.path.join(d, "copia.json")
+                delta = N8nCache(servidor.url(f"delta{n}"), copia_local=copia, backoff=0.01)
+                inicio = time.perf_counter()
+                cm = CacheManager(delta)
+                cm.size()
+                t_get = (time.perf_counter() - inicio) * 1000
+                inicio = time.perf_counter()
+                cm.mark_sent_many([f"https://nuevo.dev/{i}" for i in range(args.cambios)])
+                cm.flush()
+                t_delta = (time.perf_counter() - inicio) * 1000
+                inicio = time.perf_counter()
+                N8nCache(servidor.url(f"delta{n}"), copia_local=copia).load()
+                t_304 = (time.perf_counter() - inicio) * 1000
+            filas.append((n, args.cambios, f"{completo.bytes_enviados / 1024:.0f}", f"{t_completo:.0f}",
+                          f"{delta.bytes_enviados / 1024:.1f}", f"{t_delta:.0f}", f"{t_get:.0f}", f"{t_304:.0f}"))
+    _tabla(filas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks del scraper")
+    sub = parser.add_subparsers(dest="bench", required=True)
+    p_yt = sub.add_parser("yt", help="Extracción de ytInitialData: regex+json vs extractor acotado")
+    p_yt.add_argument("--pages", help="Glob de páginas de canal grabadas (HTML)")
+    p_yt.add_argument("--repeticiones", type=int, default=20)
+    p_yt.set_defaults(func=bench_yt)
+    p_kw = sub.add_parser("keywords", help="Clasificación de títulos: bucles de `in` vs autómata Aho-Corasick")
+    p_kw.add_argument("--carpeta", default=CONFIG["FOLDER"], help="Carpeta con el histórico (files/)")
+    p_kw.add_argument("--sinteticos", action="store_true", help="Títulos generados en lugar del histórico")
+    p_kw.add_argument("--repeticiones", type=int, default=5)
+    p_kw.set_defaults(func=bench_keywords)
+    p_rss = sub.add_parser("rss", help="Parseo de feeds: ElementTree.fromstring vs LectorRSS con parada temprana")
+    p_rss.add_argument("--items", type=int, default=60)
+    p_rss.add_argument("--kb", type=int, default=15, help="KB de content:encoded por item")
+    p_rss.add_argument("--repeticiones", type=int, default=10)
+    p_rss.set_defaults(func=bench_rss)
+    p_dd = sub.add_parser("dedup", help="deduplicar_items: bucle O(n²) vs buckets por prefijo / MinHash-LSH")
+    p_dd.add_argument("--n", type=int, nargs="+", default=[1000, 10000, 100000])
+    p_dd.add_argument("--max-bucles", type=int, default=20000, help="Tamaño máximo al que se mide el bucle original")
+    p_dd.set_defaults(func=bench_dedup)
+    p_n8n = sub.add_parser("n8n", help="N8nCache: estado completo vs PATCH por lotes, GET 200 vs 304")
+    p_n8n.add_argument("--n", type=int, nargs="+", default=[1000, 20000])
+    p_n8n.add_argument("--cambios", type=int, default=15, help="Claves nuevas por ejecución")
+    p_n8n.set_defaults(func=bench_n8n)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 """clean_news.py — Quarterly maintenance: validate old links, remove broken ones."""
 import os
-import json
 import requests
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from scripts.utils.constants_downloadfile import CONFIG, TIPO_KEY, ENLACE_KEY, TITULO_KEY, TS_KEY, ULTIMA_VERIF_KEY, NOTICIAS_FILENAME
+from scripts.utils.constants_downloadfile import CONFIG, TIPO_KEY, ENLACE_KEY, TITULO_KEY, TS_KEY, ULTIMA_VERIF_KEY
+from scripts.utils.history_store import abrir_historico
+
+MAX_HISTORICO = 600
 
 
 def limpiar_y_validar_historial(historial):
@@ -86,20 +88,21 @@ def limpiar_y_validar_historial(historial):
 def main():
     os.makedirs(CONFIG["FOLDER"], exist_ok=True)
 
-    ruta = os.path.join(CONFIG["FOLDER"], NOTICIAS_FILENAME)
-
-    if os.path.exists(ruta):
-        with open(ruta, 'r', encoding='utf-8') as f:
-            historial = json.load(f)
-    else:
-        historial = []
+    with abrir_historico() as store:
+        historial = store.todos()
+        verificados_antes = {i.get(ENLACE_KEY): i.get(ULTIMA_VERIF_KEY) for i in historial}
 
-    total = limpiar_y_validar_historial(historial)
+        total = limpiar_y_validar_historial(historial)
 
-    with open(ruta, 'w', encoding='utf-8') as f:
-        json.dump(total[:600], f, indent=4, ensure_ascii=False)
+        # Solo se tocan las filas eliminadas o revalidadas en esta pasada
+        vivos = {i.get(ENLACE_KEY) for i in total}
+        store.eliminar(set(verificados_antes) - vivos)
+        store.actualizar([i for i in total if i.get(ULTIMA_VERIF_KEY) != verificados_antes.get(i.get(ENLACE_KEY))])
+        # Lo recortado sigue en files/vistos/ (seen_index.py): no vuelve a entrar como nuevo
+        store.recortar(MAX_HISTORICO)
+        store.compactar()
 
-    print(f"💾 Guardados {min(len(total), 600)} items en {ruta}")
+        print(f"💾 Guardados {store.contar()} items en el histórico")
 
 
 if __name__ == "__main__":
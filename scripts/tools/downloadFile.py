@@ -1,24 +1,45 @@
 #!/usr/bin/env python3
 """
-downloadFile.py — Delegation wrapper for backward compatibility.
-
-Replaced the monolithic scraper. Now delegates to the modular scripts:
-  - scrape_news.py      → noticias_historico.json
-  - scrape_tools.py     → herramientas.json
-  - generate_weekly.py  → dashboard HTML + weekly recap MD
-  - send_email.py       → Mailgun newsletter
-  - send_telegram.py    → Telegram notification
-
-Usage:
-  python downloadFile.py               # run full pipeline
-  python downloadFile.py --news-only   # scrape news only
-"""
+downloadFile.py — Pipeline completo en un solo proceso (compatibilidad con el monolito).
+
+Etapas (scripts/utils/pipeline.py) y sus entradas:
+  - news      scrape_news.run      → files/historico/            (siempre)
+  - tools     scrape_tools.run     → herramientas.json           (siempre, a la vez que news)
+  - weekly    generate_weekly.run  ← historico + herramientas.json
+  - email     send_email.run       ← historico                   (tras weekly)
+  - telegram  send_telegram.run                                  (siempre, tras email)
+
+Todas comparten un mismo event loop, el histórico abierto una vez (con los
+segmentos leídos en memoria) y un ScraperPro, cuyo estado (avatares, caché
+HTTP, salud de fuentes) se guarda una sola vez al final. Las etapas cuyas
+entradas no cambiaron desde la última ejecución correcta se saltan
+(huellas en files/pipeline_estado.json).
+
+email y telegram van en serie, como en el monolito: las dos traducen y
+reescriben los mismos items del histórico, y ``actualizar`` sustituye items
+enteros por enlace, así que a la vez la última escritura perdería los campos
+de la otra. telegram no se salta por entradas: su resumen de voz de las 21:00
+depende de la hora, no del histórico.
 
-import sys
+Uso:
+  python -m scripts.tools.downloadFile                     # pipeline completo
+  python -m scripts.tools.downloadFile --news-only         # solo scrape de noticias
+  python -m scripts.tools.downloadFile --solo weekly email # etapas concretas
+  python -m scripts.tools.downloadFile --forzar            # no salta etapas sin cambios
+  python -m scripts.tools.downloadFile --dry-run           # email/telegram sin enviar
+"""
+import argparse
+import asyncio
 import logging
-import subprocess
 import os
 
+from scripts.utils.ai_client import router_modelos
+from scripts.utils.constants_downloadfile import (
+    CONFIG, HERRAMIENTAS_FILENAME, NOTICIAS_SEGMENTOS_DIRNAME, PIPELINE_ESTADO_FILENAME,
+)
+from scripts.utils.history_store import abrir_historico
+from scripts.utils.pipeline import ERROR, Etapa, Pipeline
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(message)s',
@@ -26,47 +47,100 @@ logging.basicConfig(
 )
 logger = logging.getLogger("downloadFile")
 
-SCRIPTS = {
-    "news": "scrape_news.py",
-    "tools": "scrape_tools.py",
-    "weekly": "generate_weekly.py",
-    "email": "send_email.py",
-    "telegram": "send_telegram.py",
-}
-
-def run_script(name, script):
-    logger.info(f"🚀 Delegando a {script}...")
-    result = subprocess.run(
-        [sys.executable, script],
-        capture_output=False,
-    )
-    if result.returncode != 0:
-        logger.error(f"❌ {script} falló con código {result.returncode}")
-        return False
-    logger.info(f"✅ {script} completado")
-    return True
+HISTORICO_DIR = os.path.join(CONFIG["FOLDER"], NOTICIAS_SEGMENTOS_DIRNAME)
+HERRAMIENTAS_PATH = os.path.join(CONFIG["FOLDER"], HERRAMIENTAS_FILENAME)
+
+
+class Contexto:
+    """Estado compartido entre etapas."""
+
+    def __init__(self, store, dry_run: bool = False):
+        self.store = store
+        self.dry_run = dry_run
+        self._scr = None
+
+    @property
+    def scr(self):
+        # Se crea al primer uso: --solo email no arranca el scraper
+        if self._scr is None:
+            from scripts.scrapers.scraper_base import ScraperPro
+            self._scr = ScraperPro()
+        return self._scr
+
+    async def cerrar(self):
+        if self._scr is not None:
+            await self._scr.cerrar()
+            self._scr.guardar_avatars()
+            self._scr.guardar_cache_http()
+            self._scr.guardar_salud()
+        self.store.cerrar()
+
+
+# Las importaciones van dentro de cada etapa: --news-only no carga PIL, edge-tts...
+
+async def _news(ctx: Contexto):
+    from scripts.scrapers import scrape_news
+    await scrape_news.run([], store=ctx.store, scr=ctx.scr)
+
+
+async def _tools(ctx: Contexto):
+    from scripts.scrapers import scrape_tools
+    await scrape_tools.run(scr=ctx.scr)
+
+
+async def _weekly(ctx: Contexto):
+    from scripts.publishers import generate_weekly
+    await generate_weekly.run([], store=ctx.store, scr=ctx.scr)
+
+
+async def _email(ctx: Contexto):
+    from scripts.publishers import send_email
+    await send_email.run(["--dry-run"] if ctx.dry_run else [], store=ctx.store)
+
+
+async def _telegram(ctx: Contexto):
+    from scripts.publishers import send_telegram
+    await send_telegram.run(["--dry-run"] if ctx.dry_run else [], store=ctx.store)
+
+
+ETAPAS = [
+    Etapa("news", _news),
+    Etapa("tools", _tools),
+    Etapa("weekly", _weekly, depende=("news", "tools"), entradas=(HISTORICO_DIR, HERRAMIENTAS_PATH)),
+    Etapa("email", _email, depende=("weekly",), entradas=(HISTORICO_DIR,)),
+    Etapa("telegram", _telegram, depende=("email",)),
+]
+
+
+async def run(argv: list[str] | None = None) -> dict[str, str]:
+    parser = argparse.ArgumentParser(description="Pipeline news → tools → weekly → email → telegram en un proceso")
+    parser.add_argument("--news-only", action="store_true", help="Solo scrape de noticias")
+    parser.add_argument("--solo", nargs="+", choices=[e.nombre for e in ETAPAS], help="Etapas a ejecutar")
+    parser.add_argument("--forzar", action="store_true", help="Ejecuta también las etapas con entradas sin cambios")
+    parser.add_argument("--dry-run", action="store_true", help="email y telegram sin enviar")
+    args = parser.parse_args(argv)
+
+    solo = ["news"] if args.news_only else args.solo
+    # Un dry-run no cuenta como ejecución: no deja huellas que salten el envío real
+    estado_path = None if args.dry_run else os.path.join(CONFIG["FOLDER"], PIPELINE_ESTADO_FILENAME)
+    pipeline = Pipeline(ETAPAS, estado_path=estado_path)
+    ctx = Contexto(abrir_historico(en_memoria=True), dry_run=args.dry_run)
+    try:
+        resultados = await pipeline.ejecutar(ctx, solo=solo, forzar=args.forzar)
+    finally:
+        await ctx.cerrar()
+
+    fallidas = [n for n, r in resultados.items() if r == ERROR]
+    if fallidas:
+        logger.warning(f"⚠️ Pipeline completado con fallos en: {', '.join(fallidas)}")
+    logger.info("🎯 downloadFile.py — " + ", ".join(f"{n}: {r}" for n, r in resultados.items()))
+    logger.info(f"🤖 Modelos IA: {router_modelos().resumen()}")
+    return resultados
+
 
 def main():
-    args = set(sys.argv[1:])
-    news_only = "--news-only" in args
-
-    if news_only:
-        scripts_to_run = ["news"]
-    else:
-        scripts_to_run = ["news", "tools", "weekly", "email", "telegram"]
-
-    for key in scripts_to_run:
-        if key not in SCRIPTS:
-            continue
-        script = SCRIPTS[key]
-        script_path = os.path.join(os.path.dirname(__file__), script)
-        if not os.path.exists(script_path):
-            logger.warning(f"⚠️  {script} no encontrado, saltando")
-            continue
-        if not run_script(key, script_path):
-            logger.warning(f"⚠️  Pipeline continuando tras fallo en {script}")
-
-    logger.info("🎯 downloadFile.py — pipeline delegado completado")
+    asyncio.run(run())
+
 
 if __name__ == "__main__":
     main()
@@ -7,6 +7,10 @@ import unicodedata
 import hashlib
 import shutil
 import subprocess
+import threading
+import time
+import atexit
+import os
 from pathlib import Path
 from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
@@ -80,17 +84,66 @@ def prune_cache(cache_data: Dict[str, Any]) -> Dict[str, Any]:
         )
     return pruned
 
-cache: Dict[str, Any] = {}
-try:
-    with open(CACHE_FILE, "r", encoding="utf-8") as f:
-        cache = json.load(f)
-except Exception:
-    cache = {}
-cache = prune_cache(cache)
+# Escritura diferida: las búsquedas solo modifican la memoria y el fichero se
+# reescribe de golpe al acumular FLUSH_EVERY cambios, al pasar FLUSH_INTERVAL
+# segundos desde la última escritura o al salir (atexit / fin de process_posts).
+FLUSH_EVERY: int = 50
+FLUSH_INTERVAL: float = 60.0
+
+class ImageCache(dict):
+    """Caché de búsquedas (Unsplash y Gemini) con persistencia por lotes.
+
+    Las corrutinas de process_file comparten el event loop y flush() no cede
+    el control, así que una escritura nunca ve el dict a medio modificar; el
+    lock cubre además llamadas desde hilos (asyncio.to_thread).
+    """
+
+    def __init__(self, path: Path, data: Optional[Dict[str, Any]] = None) -> None:
+        super().__init__(data or {})
+        self.path: Path = path
+        self.dirty: int = 0
+        self.writes: int = 0
+        self._last_flush: float = time.monotonic()
+        self._lock = threading.RLock()
+
+    @classmethod
+    def load(cls, path: Path) -> "ImageCache":
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception:
+            data = {}
+        return cls(path, prune_cache(data if isinstance(data, dict) else {}))
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+            self.dirty += 1
+            if self.dirty >= FLUSH_EVERY or time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+                self.flush()
+
+    def flush(self) -> None:
+        """Escribe la caché (podada con prune_cache) si hay cambios pendientes. Atómico: tmp + os.replace."""
+        with self._lock:
+            if not self.dirty:
+                return
+            # Las entradas negativas (None) solo viven en memoria: prune_cache las descarta
+            snapshot: Dict[str, Any] = prune_cache(dict(self))
+            tmp: Path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self.dirty = 0
+            self.writes += 1
+            self._last_flush = time.monotonic()
+
+cache: ImageCache = ImageCache.load(CACHE_FILE)
 
 def save_cache() -> None:
-    with open(CACHE_FILE, "w", encoding="utf-8") as f:
-        json.dump(cache, f, indent=2, ensure_ascii=False)
+    cache.flush()
+
+# Se resuelve el global al salir: __main__ puede sustituir la caché por la de --blog-path
+atexit.register(save_cache)
 
 # ==============================================================================
 # ALGORITMO SSIM (Structural Similarity Index)
@@ -198,7 +251,7 @@ def process_svg_fallback(input_path: Path, out_dir: Path, filename: str) -> None
 # ==============================================================================
 # IA EDITORIAL (MIGRADO AL NUEVO SDK GOOGLE-GENAI)
 # ==============================================================================
-def get_gemini_tech_context(title: str, content_snippet: str = "", tags: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+async def get_gemini_tech_context(title: str, content_snippet: str = "", tags: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
     if not GEMINI_KEY:
         return None
 
@@ -209,6 +262,7 @@ def get_gemini_tech_context(title: str, content_snippet: str = "", tags: Optiona
 
     try:
         from google import genai
+        from scripts.utils.ai_client import generar_contenido
         client = genai.Client(api_key=GEMINI_KEY)
 
         tag_str: str = ", ".join(tags[:5]) if tags else ""
@@ -230,21 +284,17 @@ Devuelve EXACTAMENTE este JSON, sin markdown ni código alrededor:
   "unsplash_query": "consulta visual corta para buscar una imagen de portada en Unsplash, que mezcle el concepto técnico con una metáfora visual atractiva (ej: 'server rack blue lights', 'neon code editor dark', 'robot writing AI', 'circuit board geometric', 'data center purple', 'developer desk minimal')"
 }}
 """
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=prompt,
-        )
+        # Sin bloquear el loop: el resto de process_file sigue mientras Gemini responde
+        response = await generar_contenido(client, 'gemini-2.5-flash', prompt)
         if response.text:
             match = re.search(r'(\{.*\})', response.text, re.DOTALL)
             if match:
                 result: Dict[str, Any] = json.loads(match.group(1))
                 cache[gemini_key] = result
-                save_cache()
                 return result
     except Exception as e:
         print(f"⚠️ Aviso en el cliente Gemini GenAI: {e}")
     cache[gemini_key] = None
-    save_cache()
     return None
 
 # ==============================================================================
@@ -323,21 +373,17 @@ async def search_unsplash(session: aiohttp.ClientSession, query: str) -> Optiona
         async with session.get(url, params=params, headers=headers, timeout=15) as r:
             if r.status != 200:
                 cache[query] = None
-                save_cache()
                 return None
             data: Dict[str, Any] = await r.json()
             if not data.get("results"):
                 cache[query] = None
-                save_cache()
                 return None
             results: List[Dict[str, Any]] = data["results"]
             best: Dict[str, Any] = max(results, key=lambda p: p.get("likes", 0))
             cache[query] = best
-            save_cache()
             return best
     except Exception:
         cache[query] = None
-        save_cache()
         return None
 
 # ==============================================================================
@@ -601,7 +647,7 @@ async def search_all_providers(session: aiohttp.ClientSession, title: str, conte
     photo: Optional[Dict[str, Any]] = await search_unsplash(session, query)
     if photo: 
         return {"url": photo["urls"]["raw"], "source": "unsplash"}
-    return {"source": "local_gen", "title": title, "theme": get_gemini_tech_context(title, content_snippet, tags)}
+    return {"source": "local_gen", "title": title, "theme": await get_gemini_tech_context(title, content_snippet, tags)}
 
 # ==============================================================================
 # ORQUESTADOR (BÚSQUEDA RECURSIVA CONTROLADA POR SEMÁFORO)
@@ -626,6 +672,7 @@ async def process_posts() -> None:
         if tasks: 
             await asyncio.gather(*tasks)
     save_cache()
+    print(f"💾 Caché de imágenes: {len(cache)} entradas, {cache.writes} escritura(s) en disco")
 
 if __name__ == "__main__":
     import argparse
@@ -636,4 +683,5 @@ if __name__ == "__main__":
     TARGET_DIR = ROOT_DIR / "src" / "content"
     IMG_DIR = ROOT_DIR / "public" / "img"
     CACHE_FILE = ROOT_DIR / "image_cache.json"
+    cache = ImageCache.load(CACHE_FILE)
     asyncio.run(process_posts())
@@ -17,6 +17,7 @@ from scripts.utils.constants_retos import (
     PROMPT_IMAGEN_TEMPLATE_RETO
 )
 from scripts.utils.utils_retos import obtener_solucion_ia, generar_imagen_noticia, traducir_titulos_ia
+from scripts.utils.ai_client import generar_contenido
 try:
     from scripts.solutions.solutions_db import lookup as db_lookup, generate_generic
 except ImportError:
@@ -94,11 +95,7 @@ async def generar_retos_ia_puros(client, folder):
             Responde SOLO el título, sin explicaciones ni formato.
             """
             modelo_actual = (CONFIG.get("AI_MODELS") or ["gemini-2.5-flash"])[0]
-            res_titulo = await asyncio.to_thread(
-                client.models.generate_content,
-                model=modelo_actual,
-                contents=prompt_inventar
-            )
+            res_titulo = await generar_contenido(client, modelo_actual, prompt_inventar)
             titulo_inventado = res_titulo.text.strip()
 
             if await solve_and_save(titulo_inventado, "IA Creativa", client, folder, index_hint=idx):
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+ai_client.py — Llamadas a Gemini que no bloquean el event loop, repartidas entre modelos.
+
+Los helpers async (common.py, utils_retos.py) llamaban directamente a
+``client.models.generate_content`` / ``generate_images``, que son síncronos:
+mientras el modelo contestaba, el loop entero (scrapers, descargas, otras
+etapas del pipeline) se quedaba parado.
+
+Aquí cada llamada:
+  - usa la interfaz async del SDK (``client.aio.models``) si el cliente la
+    tiene: la petición HTTP se cancela de verdad al cancelar la tarea;
+  - si no (clientes falsos de los tests, SDK antiguo), corre en un pool de
+    hilos propio (AI_HILOS), separado del pool por defecto del loop que usan
+    las extracciones de texto y la E/S de ficheros;
+  - tiene un tiempo máximo (CONFIG["AI_TIMEOUT"], o ``timeout=`` por llamada).
+    Al agotarse lanza TimeoutError, que los helpers tratan como un fallo más
+    del modelo y pasan al siguiente. En el pool de hilos la llamada abandonada
+    termina en segundo plano, pero ya nadie la espera;
+  - pasa por el RouterModelos del proceso.
+
+Router: cada helper recorría CONFIG["AI_MODELS"] desde el principio en cada
+llamada, así que tras un 429 de gemini-2.5-flash todas las siguientes
+volvían a gastar una petición en él antes de pasar al siguiente. El router
+anota el resultado de cada llamada:
+  - cuota (429/RESOURCE_EXHAUSTED): el modelo se enfría el tiempo que sugiere
+    el error ("retry in 37s"), o ENFRIAMIENTO_CUOTA (una hora si la cuota es
+    diaria);
+  - no disponible (404/NOT_FOUND): se enfría ENFRIAMIENTO_NO_DISPONIBLE;
+  - API key inválida: ningún modelo está disponible en lo que queda de proceso.
+``orden(modelos)`` devuelve solo los disponibles: primero los que tienen
+turno ya, en el orden configurado, y después los que esperan, por espera.
+Cada modelo con límite en CONFIG["AI_RPM"] tiene un cubo de tokens (ráfaga
+de hasta ``rpm`` peticiones, luego ``rpm`` por minuto): la llamada espera
+turno en vez de provocar el 429. Con CONFIG["AI_ROUTER_ESTADO"] (ruta) los
+enfriamientos se guardan y la siguiente ejecución los respeta.
+
+Uso:
+  router = router_modelos()
+  for modelo in router.orden(CONFIG["AI_MODELS"]):
+      try:
+          response = await generar_contenido(client, modelo, prompt)
+          break
+      except Exception as e:
+          if clasificar_error(e) == CLAVE_INVALIDA:
+              break
+
+  response = await generar_imagenes(client, "imagen-3.0-generate-002", prompt,
+                                    config=dict(number_of_images=1), timeout=120)
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable
+
+from scripts.utils.constants_downloadfile import CONFIG
+
+logger = logging.getLogger(__name__)
+
+AI_TIMEOUT = 90.0
+AI_HILOS = 8
+
+CUOTA = "cuota"
+NO_DISPONIBLE = "no_disponible"
+CLAVE_INVALIDA = "clave_invalida"
+OTRO = "otro"
+
+ENFRIAMIENTO_CUOTA = 60.0
+ENFRIAMIENTO_CUOTA_DIARIA = 3600.0
+ENFRIAMIENTO_NO_DISPONIBLE = 6 * 3600.0
+# Enfriamientos de hasta estos segundos se esperan en el mismo modelo en vez de cambiar
+ESPERA_MAX_REINTENTO = 10.0
+
+_RE_REINTENTO = re.compile(r"retry in ([\d.]+)\s*s|retryDelay['\"]?\s*:\s*['\"]?([\d.]+)s", re.IGNORECASE)
+
+_pool: ThreadPoolExecutor | None = None
+
+
+def clasificar_error(e: BaseException) -> str:
+    """CUOTA, NO_DISPONIBLE, CLAVE_INVALIDA u OTRO según el texto del error del SDK."""
+    texto = str(e).upper()
+    if "API_KEY_INVALID" in texto or ("INVALID_ARGUMENT" in texto and "API KEY" in texto):
+        return CLAVE_INVALIDA
+    if "429" in texto or "QUOTA" in texto or "RESOURCE_EXHAUSTED" in texto or "RATE_LIMIT" in texto:
+        return CUOTA
+    if "404" in texto or "NOT_FOUND" in texto:
+        return NO_DISPONIBLE
+    return OTRO
+
+
+def _espera_sugerida(e: BaseException) -> float | None:
+    match = _RE_REINTENTO.search(str(e))
+    return float(match.group(1) or match.group(2)) if match else None
+
+
+class CuboTokens:
+    """Hasta ``por_minuto`` peticiones de golpe; se rellena a ``por_minuto`` por minuto."""
+
+    def __init__(self, por_minuto: float, ahora: float):
+        self.capacidad = float(por_minuto)
+        self.ritmo = por_minuto / 60.0
+        self.tokens = self.capacidad
+        self.ultimo = ahora
+
+    def _rellenar(self, ahora: float):
+        self.tokens = min(self.capacidad, self.tokens + max(ahora - self.ultimo, 0.0) * self.ritmo)
+        self.ultimo = ahora
+
+    def espera(self, ahora: float) -> float:
+        """Segundos hasta que haya un token (0 si ya lo hay)."""
+        self._rellenar(ahora)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.ritmo
+
+    def tomar(self, ahora: float):
+        self._rellenar(ahora)
+        self.tokens -= 1
+
+
+class RouterModelos:
+    """Estado de cuota de cada modelo (enfriamientos) y ritmo por minuto (cubos de tokens)."""
+
+    def __init__(self, rpm: dict[str, float] | None = None, path: str | None = None,
+                 reloj: Callable[[], float] = time.time):
+        self.rpm = dict(rpm or {})
+        self.path = path
+        self._reloj = reloj
+        self._cubos: dict[str, CuboTokens] = {}
+        self.enfriados: dict[str, dict] = self._cargar()
+        self.clave_invalida = False
+        self.exitos: dict[str, int] = {}
+        self.fallos: dict[str, int] = {}
+        self.saltados = 0
+
+    # ── Persistencia ──
+
+    def _cargar(self) -> dict[str, dict]:
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            ahora = self._reloj()
+            return {m: e for m, e in data.items() if isinstance(e, dict) and e.get("hasta", 0) > ahora}
+        except (OSError, json.JSONDecodeError, AttributeError) as e:
+            logger.warning("⚠️ Error leyendo estado de modelos %s: %s", self.path, e)
+            return {}
+
+    def _guardar(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.enfriados, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    # ── Consulta ──
+
+    def enfriamiento(self, modelo: str, ahora: float | None = None) -> float:
+        """Segundos que le quedan a ``modelo`` enfriándose (0 si está disponible)."""
+        if self.clave_invalida:
+            return float("inf")
+        entrada = self.enfriados.get(modelo)
+        if not entrada:
+            return 0.0
+        return max(entrada["hasta"] - (self._reloj() if ahora is None else ahora), 0.0)
+
+    def _cubo(self, modelo: str) -> CuboTokens | None:
+        if modelo not in self._cubos and self.rpm.get(modelo):
+            self._cubos[modelo] = CuboTokens(self.rpm[modelo], self._reloj())
+        return self._cubos.get(modelo)
+
+    def espera_turno(self, modelo: str, ahora: float | None = None) -> float:
+        cubo = self._cubo(modelo)
+        return cubo.espera(self._reloj() if ahora is None else ahora) if cubo else 0.0
+
+    def orden(self, modelos: Iterable[str]) -> list[str]:
+        """Modelos disponibles, los que tienen turno ya primero (en el orden dado)."""
+        ahora = self._reloj()
+        modelos = list(modelos)
+        disponibles = [m for m in modelos if self.enfriamiento(m, ahora) <= 0]
+        self.saltados += len(modelos) - len(disponibles)
+        if modelos and not disponibles:
+            logger.warning("⏳ Ningún modelo disponible (%s)", ", ".join(modelos))
+        return sorted(disponibles, key=lambda m: self.espera_turno(m, ahora))
+
+    # ── Registro ──
+
+    async def turno(self, modelo: str):
+        """Espera a que el cubo de ``modelo`` tenga un token y lo gasta."""
+        cubo = self._cubo(modelo)
+        if cubo is None:
+            return
+        while (espera := cubo.espera(self._reloj())) > 0:
+            await asyncio.sleep(espera)
+        cubo.tomar(self._reloj())
+
+    def exito(self, modelo: str):
+        self.exitos[modelo] = self.exitos.get(modelo, 0) + 1
+
+    def fallo(self, modelo: str, error: BaseException) -> str:
+        """Anota el fallo, enfría el modelo si hace falta y devuelve su clasificación."""
+        self.fallos[modelo] = self.fallos.get(modelo, 0) + 1
+        tipo = clasificar_error(error)
+        if tipo == CLAVE_INVALIDA:
+            if not self.clave_invalida:
+                logger.error("🔑 API KEY INVÁLIDA. Configura GEMINI_API_KEY correctamente.")
+            self.clave_invalida = True
+            return tipo
+        if tipo == CUOTA:
+            segundos = _espera_sugerida(error)
+            if segundos is None:
+                segundos = ENFRIAMIENTO_CUOTA_DIARIA if "PERDAY" in str(error).upper() else ENFRIAMIENTO_CUOTA
+        elif tipo == NO_DISPONIBLE:
+            segundos = ENFRIAMIENTO_NO_DISPONIBLE
+        else:
+            return tipo
+        self.enfriados[modelo] = {"hasta": self._reloj() + segundos, "motivo": tipo}
+        logger.warning(f"🧊 {modelo}: {tipo}, fuera de la rotación {segundos:.0f}s")
+        self._guardar()
+        return tipo
+
+    def resumen(self) -> str:
+        llamadas = sum(self.exitos.values()) + sum(self.fallos.values())
+        enfriados = ", ".join(sorted(m for m in self.enfriados if self.enfriamiento(m) > 0)) or "ninguno"
+        return f"{llamadas} llamadas, {sum(self.fallos.values())} fallidas, {self.saltados} saltos, enfriados: {enfriados}"
+
+
+_router: RouterModelos | None = None
+
+
+def router_modelos() -> RouterModelos:
+    """El router del proceso: todos los helpers comparten enfriamientos y cubos."""
+    global _router
+    if _router is None:
+        _router = RouterModelos(CONFIG.get("AI_RPM"), CONFIG.get("AI_ROUTER_ESTADO"))
+    return _router
+
+
+def _pool_hilos() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=AI_HILOS, thread_name_prefix="gemini")
+    return _pool
+
+
+def _metodo_async(client, nombre: str):
+    """``client.aio.models.<nombre>`` o None si el cliente no tiene interfaz async."""
+    modelos = getattr(getattr(client, "aio", None), "models", None)
+    return getattr(modelos, nombre, None)
+
+
+async def _llamar(client, nombre: str, timeout: float | None, **kwargs) -> Any:
+    limite = CONFIG.get("AI_TIMEOUT", AI_TIMEOUT) if timeout is None else timeout
+    modelo = kwargs.get("model")
+    router = router_modelos()
+    if router.clave_invalida:
+        # Con la clave rechazada cualquier petición fallaría igual: ni turno ni llamada
+        router.saltados += 1
+        raise RuntimeError(f"API_KEY_INVALID: clave rechazada antes, no se llama a {modelo}")
+    await router.turno(modelo)
+    metodo = _metodo_async(client, nombre)
+    if metodo is not None:
+        llamada = metodo(**kwargs)
+    else:
+        loop = asyncio.get_running_loop()
+        llamada = loop.run_in_executor(_pool_hilos(), functools.partial(getattr(client.models, nombre), **kwargs))
+    try:
+        respuesta = await asyncio.wait_for(llamada, limite)
+    except asyncio.TimeoutError:
+        logger.warning(f"⏱️ {modelo} no respondió en {limite:g}s")
+        error = TimeoutError(f"{nombre} ({modelo}): sin respuesta en {limite:g}s")
+        router.fallo(modelo, error)
+        raise error from None
+    except Exception as e:
+        router.fallo(modelo, e)
+        raise
+    router.exito(modelo)
+    return respuesta
+
+
+async def generar_contenido(client, modelo: str, contents: Any, timeout: float | None = None, **kwargs) -> Any:
+    """``generate_content`` sin bloquear el loop. TimeoutError si se pasa de ``timeout``."""
+    return await _llamar(client, "generate_content", timeout, model=modelo, contents=contents, **kwargs)
+
+
+async def generar_imagenes(client, modelo: str, prompt: str, timeout: float | None = None, **kwargs) -> Any:
+    """``generate_images`` sin bloquear el loop. TimeoutError si se pasa de ``timeout``."""
+    return await _llamar(client, "generate_images", timeout, model=modelo, prompt=prompt, **kwargs)
@@ -7,8 +7,20 @@ Interfaces:
   CacheManager    — orquestador con TTL opcional y estrategia de clave
 
 Backends concretos:
-  FileCache       — JSON plano en disco
-  N8nCache        — esqueleto para migración a n8n (vía webhook)
+  FileCache       — JSON plano en disco (se reescribe entero en cada flush)
+  SQLiteCache     — una fila por clave con ts indexado: cada mark_sent se
+                    escribe al momento (transacción propia, a prueba de
+                    caídas) y la expiración por TTL es un DELETE por rango
+  N8nCache        — webhook HTTP (n8n): GET condicional con ETag y PATCH por
+                    lotes con solo los cambios; cache_server.py lo imita en local
+
+Los backends "incrementales" (SQLiteCache) no se cargan enteros en memoria:
+CacheManager consulta y escribe clave a clave. SQLiteCache importa el JSON
+de FileCache la primera vez que se crea la base de datos.
+
+Con el resto de backends, CacheManager carga el caché una vez con los ts
+normalizados a float y un montículo (ts, clave): flush expira sacando del
+montículo solo las k entradas caducadas, O(k log n), sin recorrer el dict.
 
 Uso:
   from cache import CacheManager, FileCache
@@ -16,22 +28,41 @@ Uso:
   if cache.is_new(item[ENLACE_KEY]):
       cache.mark_sent(item[ENLACE_KEY])
   cache.flush()
+
+  nuevos = cache.filter_new(items)        # una consulta para todo el lote
+  cache.mark_sent_many(nuevos)
+
+  cache = abrir_cache("telegram_sent.json", ttl_hours=168)   # CONFIG["CACHE_BACKEND"]
 """
 
+import heapq
 import json
 import logging
 import os
+import sqlite3
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from typing import Any
+from datetime import timedelta
+from typing import Any, Iterable
 
-from scripts.utils.constants_downloadfile import ENLACE_KEY, TS_KEY
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scripts.utils.canonical_url import canonicalizar_url
+from scripts.utils.constants_downloadfile import CONFIG, ENLACE_KEY, TS_KEY
 
 logger = logging.getLogger(__name__)
 
 
 class ICacheBackend(ABC):
-    """Backend de persistencia para el caché."""
+    """Backend de persistencia para el caché.
+
+    Si ``incremental`` es True, el backend implementa además obtener/poner/
+    expirar/contar/vaciar y CacheManager no llama a load/save.
+    """
+
+    incremental = False
 
     @abstractmethod
     def load(self) -> dict[str, Any]:
@@ -93,31 +124,287 @@ class FileCache(ICacheBackend):
         self._dirty = False
 
 
+def _ts_entrada(entry: Any) -> float | None:
+    ts = entry.get(TS_KEY) if isinstance(entry, dict) else entry
+    if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+        return float(ts)
+    return None
+
+
+def _normalizar(entry: Any) -> Any:
+    """ts como float (los JSON antiguos traen int o cadenas numéricas)."""
+    if isinstance(entry, dict):
+        ts = entry.get(TS_KEY)
+        if isinstance(ts, (int, str)) and not isinstance(ts, bool):
+            try:
+                entry[TS_KEY] = float(ts)
+            except ValueError:
+                pass
+        return entry
+    if isinstance(entry, int) and not isinstance(entry, bool):
+        return float(entry)
+    return entry
+
+
+class _Entradas(dict):
+    """Caché en memoria: clave → entrada, más un montículo (ts, clave) para expirar.
+
+    Al sobrescribir una clave su par anterior queda en el montículo; al
+    sacarlo se descarta si ya no coincide con el ts actual de la entrada.
+    """
+
+    def __init__(self, data: dict[str, Any] | None = None):
+        super().__init__()
+        self.monticulo: list[tuple[float, str]] = []
+        for clave, entry in (data or {}).items():
+            entry = _normalizar(entry)
+            super().__setitem__(clave, entry)
+            ts = _ts_entrada(entry)
+            if ts is not None:
+                self.monticulo.append((ts, clave))
+        heapq.heapify(self.monticulo)
+
+    def __setitem__(self, clave: str, entry: Any):
+        entry = _normalizar(entry)
+        super().__setitem__(clave, entry)
+        ts = _ts_entrada(entry)
+        if ts is not None:
+            heapq.heappush(self.monticulo, (ts, clave))
+
+    def expirar(self, antes_de: float) -> int:
+        """Borra las entradas con ts anterior a ``antes_de``. O(k log n) para k caducadas."""
+        borradas = 0
+        while self.monticulo and self.monticulo[0][0] < antes_de:
+            ts, clave = heapq.heappop(self.monticulo)
+            if clave in self and _ts_entrada(self[clave]) == ts:
+                del self[clave]
+                borradas += 1
+        return borradas
+
+
+class SQLiteCache(ICacheBackend):
+    """Backend SQLite: clave primaria para el acceso O(1) y índice sobre ts para expirar por rango."""
+
+    incremental = True
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS cache (
+            clave TEXT PRIMARY KEY,
+            ts REAL,
+            datos TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_ts ON cache(ts) WHERE ts IS NOT NULL;
+    """
+    LOTE = 500
+
+    def __init__(self, path: str, json_legacy: str | None = None):
+        self.path = path
+        nuevo = not os.path.exists(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._con = sqlite3.connect(path)
+        self._con.executescript(self.ESQUEMA)
+        if nuevo and json_legacy and os.path.exists(json_legacy):
+            self.importar_json(json_legacy)
+
+    @staticmethod
+    def _fila(clave: str, entry: Any) -> tuple:
+        return clave, _ts_entrada(entry), json.dumps(entry, ensure_ascii=False)
+
+    def importar_json(self, path: str):
+        """Importa un caché de FileCache (claves migradas a la forma canónica)."""
+        migrado: dict[str, Any] = {}
+        for clave, entry in FileCache(path).load().items():
+            migrado.setdefault(_clave_texto(clave), entry)
+        self.save(migrado)
+        logger.info("📥 Caché migrada desde %s (%d claves)", path, len(migrado))
+
+    def load(self) -> dict[str, Any]:
+        return {clave: json.loads(datos) for clave, datos in self._con.execute("SELECT clave, datos FROM cache")}
+
+    def save(self, data: dict[str, Any]):
+        with self._con:
+            self._con.execute("DELETE FROM cache")
+            self._con.executemany("INSERT INTO cache (clave, ts, datos) VALUES (?, ?, ?)",
+                                  [self._fila(k, v) for k, v in data.items()])
+
+    def obtener(self, clave: str) -> Any | None:
+        fila = self._con.execute("SELECT datos FROM cache WHERE clave = ?", (clave,)).fetchone()
+        return json.loads(fila[0]) if fila else None
+
+    def obtener_muchos(self, claves: Iterable[str]) -> dict[str, Any]:
+        encontradas: dict[str, Any] = {}
+        unicas = list(dict.fromkeys(claves))
+        # Por lotes: SQLite limita el nº de parámetros por consulta
+        for i in range(0, len(unicas), self.LOTE):
+            lote = unicas[i:i + self.LOTE]
+            sql = f"SELECT clave, datos FROM cache WHERE clave IN ({','.join('?' * len(lote))})"
+            for clave, datos in self._con.execute(sql, lote):
+                encontradas[clave] = json.loads(datos)
+        return encontradas
+
+    def poner(self, clave: str, entry: Any):
+        with self._con:
+            self._con.execute("INSERT OR REPLACE INTO cache (clave, ts, datos) VALUES (?, ?, ?)",
+                              self._fila(clave, entry))
+
+    def poner_muchos(self, entradas: dict[str, Any]):
+        with self._con:
+            self._con.executemany("INSERT OR REPLACE INTO cache (clave, ts, datos) VALUES (?, ?, ?)",
+                                  [self._fila(k, v) for k, v in entradas.items()])
+
+    def expirar(self, antes_de: float) -> int:
+        """Borra las entradas con ts anterior a ``antes_de`` (las que no tienen ts se conservan)."""
+        with self._con:
+            return self._con.execute("DELETE FROM cache WHERE ts < ?", (antes_de,)).rowcount
+
+    def contar(self) -> int:
+        return self._con.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def vaciar(self):
+        with self._con:
+            self._con.execute("DELETE FROM cache")
+
+    def cerrar(self):
+        self._con.close()
+
+
 class N8nCache(ICacheBackend):
     """
-    Backend para n8n — delega persistencia a un webhook.
+    Backend para n8n — delega persistencia a un webhook (protocolo en cache_server.py).
+
+      GET   {webhook_url}  con If-None-Match → estado completo + ETag, o 304
+      PATCH {webhook_url}  ← {"poner": {...}, "borrar": [...]} solo con lo que cambió,
+                           en lotes de ``lote`` claves
 
-    Esqueleto listo para migración. Cuando se active, hará:
-      GET  {webhook_url}   → carga el estado
-      POST {webhook_url}   → persiste el estado
+    La sesión HTTP reutiliza la conexión. GET y PATCH (idempotente: pone o
+    borra claves) se reintentan con backoff exponencial ante errores de red,
+    429 y 5xx, respetando Retry-After. ``copia_local`` guarda el último
+    estado con su ETag: la siguiente ejecución lo valida con un GET
+    condicional y, si el webhook no responde, lo usa como respaldo.
     """
 
-    def __init__(self, webhook_url: str):
+    LOTE = 500
+
+    def __init__(self, webhook_url: str, copia_local: str | None = None, timeout: float = 10.0,
+                 reintentos: int = 3, backoff: float = 0.5, lote: int = LOTE):
         self.webhook_url = webhook_url
-        self._data: dict[str, Any] = {}
+        self.copia_local = copia_local
+        self.timeout = timeout
+        self.lote = lote
+        self._data: dict[str, Any] | None = None
+        # Copia de las entradas tal como están en el servidor: save() envía la diferencia
+        self._base: dict[str, Any] = {}
+        self._etag: str | None = None
+        self.bytes_enviados = 0
+        reintento = Retry(
+            total=reintentos, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset({"GET", "PATCH"}), respect_retry_after_header=True, raise_on_status=False,
+        )
+        self.session = requests.Session()
+        adaptador = HTTPAdapter(max_retries=reintento)
+        self.session.mount("http://", adaptador)
+        self.session.mount("https://", adaptador)
+
+    @staticmethod
+    def _copia(entry: Any) -> Any:
+        # CacheManager modifica las entradas en su sitio (normaliza ts): no compartir el objeto
+        return dict(entry) if isinstance(entry, dict) else entry
+
+    def _leer_copia_local(self) -> tuple[str | None, dict[str, Any] | None]:
+        if not self.copia_local or not os.path.exists(self.copia_local):
+            return None, None
+        try:
+            with open(self.copia_local, "r", encoding="utf-8") as f:
+                copia = json.load(f)
+            datos = copia.get("datos")
+            return copia.get("etag"), datos if isinstance(datos, dict) else None
+        except (json.JSONDecodeError, OSError, AttributeError) as e:
+            logger.warning("⚠️ Error leyendo copia local %s: %s", self.copia_local, e)
+            return None, None
+
+    def _guardar_copia_local(self, datos: dict[str, Any]):
+        if not self.copia_local:
+            return
+        os.makedirs(os.path.dirname(self.copia_local) or ".", exist_ok=True)
+        tmp = self.copia_local + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            # json.dump codifica por trozos en Python; dumps usa el codificador en C
+            f.write(json.dumps({"etag": self._etag, "datos": datos}, ensure_ascii=False))
+        os.replace(tmp, self.copia_local)
 
     def load(self) -> dict[str, Any]:
-        # TODO: requests.get(self.webhook_url) → response.json()
-        return self._data
+        if self._data is not None:
+            return self._data
+        etag, local = self._leer_copia_local()
+        cabeceras = {"If-None-Match": etag} if etag and local is not None else {}
+        try:
+            r = self.session.get(self.webhook_url, headers=cabeceras, timeout=self.timeout)
+            if r.status_code == 304:
+                datos = local
+                logger.info("🗄️ Caché %s sin cambios (304)", self.webhook_url)
+            else:
+                r.raise_for_status()
+                datos = r.json()
+                if not isinstance(datos, dict):
+                    raise ValueError("el webhook no devolvió un objeto JSON")
+                etag = r.headers.get("ETag")
+            self._etag = etag
+            if r.status_code != 304:
+                self._guardar_copia_local(datos)
+        except (requests.RequestException, ValueError) as e:
+            logger.warning("⚠️ Error cargando caché de %s: %s", self.webhook_url, e)
+            datos, self._etag = local or {}, None
+        self._base = {k: self._copia(v) for k, v in datos.items()}
+        self._data = datos
+        return datos
+
+    def _enviar(self, poner: dict[str, Any], borrar: list[str]):
+        cuerpo = json.dumps({"poner": poner, "borrar": borrar}, ensure_ascii=False).encode("utf-8")
+        try:
+            r = self.session.patch(self.webhook_url, data=cuerpo, timeout=self.timeout,
+                                   headers={"Content-Type": "application/json"})
+            r.raise_for_status()
+        except requests.RequestException as e:
+            logger.error("❌ Error enviando caché a %s: %s", self.webhook_url, e)
+            raise
+        self.bytes_enviados += len(cuerpo)
+        try:
+            respuesta = r.json()
+        except ValueError:
+            respuesta = {}
+        # La copia local solo sigue al día si nadie más escribió entre medias
+        previa = respuesta.get("previa") if isinstance(respuesta, dict) else None
+        self._etag = respuesta.get("etag") if self._etag and previa == self._etag else None
 
     def save(self, data: dict[str, Any]):
-        # TODO: requests.post(self.webhook_url, json=data)
+        base = self._base
+        cambios = [(k, True) for k, v in data.items() if k not in base or base[k] != v]
+        cambios += [(k, False) for k in base if k not in data]
+        for i in range(0, len(cambios), self.lote):
+            lote = cambios[i:i + self.lote]
+            self._enviar({k: data[k] for k, poner in lote if poner}, [k for k, poner in lote if not poner])
+            for k, poner in lote:
+                if poner:
+                    base[k] = self._copia(data[k])
+                else:
+                    base.pop(k, None)
+        if cambios:
+            logger.info("📤 %d cambios enviados a %s", len(cambios), self.webhook_url)
+            self._guardar_copia_local(data)
         self._data = data
 
 
 def _default_key(item: dict) -> str:
-    """Estrategia de clave por defecto: enlace normalizado."""
-    return (item.get(ENLACE_KEY) or "").strip().rstrip("/").lower()
+    """Estrategia de clave por defecto: enlace canónico (ver canonical_url.py)."""
+    return canonicalizar_url((item.get(ENLACE_KEY) or "").strip())
+
+
+def _clave_texto(key: str) -> str:
+    """Las claves que son URLs se canonicalizan; el resto solo se normaliza."""
+    key = key.strip()
+    if key.lower().startswith(("http://", "https://")):
+        return canonicalizar_url(key)
+    return key.lower()
 
 
 class CacheManager:
@@ -140,59 +427,127 @@ class CacheManager:
     ):
         self.backend = backend
         self.ttl = timedelta(hours=ttl_hours) if ttl_hours else None
+        self._ttl_s = self.ttl.total_seconds() if self.ttl else 0.0
         self.key_fn = key_fn
         self._data: dict[str, Any] | None = None
 
     def _ensure_loaded(self):
         if self._data is None:
-            self._data = self.backend.load()
+            data = self.backend.load()
+            # Cachés guardadas con claves antiguas (URL en minúsculas con query):
+            # se migran a la clave canónica para no reenviar lo ya procesado
+            if any(_clave_texto(k) != k for k in data):
+                migrado: dict[str, Any] = {}
+                for k, v in data.items():
+                    migrado.setdefault(_clave_texto(k), v)
+                data = migrado
+            self._data = _Entradas(data)
 
     def _get_key(self, item_or_key: dict | str) -> str:
         if isinstance(item_or_key, dict):
             return self.key_fn(item_or_key)
-        return item_or_key.strip().lower()
+        return _clave_texto(item_or_key)
+
+    def _expirada(self, entry: Any, ahora: float) -> bool:
+        if not self.ttl:
+            return False
+        ts = _ts_entrada(entry)
+        return ts is not None and ahora - ts > self._ttl_s
 
     def is_new(self, item_or_key: dict | str) -> bool:
         """True si el item/clave no está en caché o ha expirado."""
-        self._ensure_loaded()
         key = self._get_key(item_or_key)
-        entry = self._data.get(key)
+        if self.backend.incremental:
+            entry = self.backend.obtener(key)
+        else:
+            self._ensure_loaded()
+            entry = self._data.get(key)
         if entry is None:
             return True
-        if self.ttl:
-            ts = entry.get(TS_KEY) if isinstance(entry, dict) else entry
-            if isinstance(ts, (int, float)):
-                if datetime.now() - datetime.fromtimestamp(ts) > self.ttl:
-                    return True
-        return False
+        return self._expirada(entry, time.time())
+
+    def _entradas(self, keys: list[str]) -> dict[str, Any]:
+        if self.backend.incremental:
+            return self.backend.obtener_muchos(keys)
+        self._ensure_loaded()
+        return {k: self._data[k] for k in keys if k in self._data}
+
+    def is_new_many(self, items_or_keys: Iterable[dict | str]) -> list[bool]:
+        """is_new para un lote, con una sola consulta al backend."""
+        keys = [self._get_key(x) for x in items_or_keys]
+        entradas = self._entradas(keys)
+        ahora = time.time()
+        return [k not in entradas or self._expirada(entradas[k], ahora) for k in keys]
+
+    def filter_new(self, items: Iterable[dict | str]) -> list:
+        """Los items/claves que no están en caché o han expirado, en el mismo orden."""
+        items = list(items)
+        return [x for x, nuevo in zip(items, self.is_new_many(items)) if nuevo]
 
     def mark_sent(self, item_or_key: dict | str):
         """Marca un item/clave como ya procesado."""
-        self._ensure_loaded()
         key = self._get_key(item_or_key)
-        self._data[key] = {"ts": datetime.now().timestamp()}
+        entry = {"ts": time.time()}
+        if self.backend.incremental:
+            self.backend.poner(key, entry)
+            return
+        self._ensure_loaded()
+        self._data[key] = entry
+
+    def mark_sent_many(self, items_or_keys: Iterable[dict | str]):
+        """mark_sent para un lote (una sola transacción en backends incrementales)."""
+        ahora = time.time()
+        entradas = {self._get_key(x): {"ts": ahora} for x in items_or_keys}
+        if self.backend.incremental:
+            self.backend.poner_muchos(entradas)
+            return
+        self._ensure_loaded()
+        for key, entry in entradas.items():
+            self._data[key] = entry
 
     def flush(self):
         """Persiste el estado actual en el backend, limpiando entradas expiradas."""
+        if self.backend.incremental:
+            # Las escrituras ya están en disco: solo queda expirar por rango de ts
+            if self.ttl:
+                borradas = self.backend.expirar(time.time() - self._ttl_s)
+                if borradas:
+                    logger.info("🧹 %d entradas expiradas en caché", borradas)
+            return
         if self._data is not None:
             if self.ttl:
-                now = datetime.now()
-                cleaned = {}
-                for key, entry in self._data.items():
-                    ts = entry.get(TS_KEY) if isinstance(entry, dict) else entry
-                    if isinstance(ts, (int, float)):
-                        if now - datetime.fromtimestamp(ts) <= self.ttl:
-                            cleaned[key] = entry
-                    else:
-                        cleaned[key] = entry
-                self._data = cleaned
+                self._data.expirar(time.time() - self._ttl_s)
             self.backend.save(self._data)
 
     def size(self) -> int:
         """Cantidad de entradas en caché."""
+        if self.backend.incremental:
+            return self.backend.contar()
         self._ensure_loaded()
         return len(self._data)
 
     def clear(self):
-        """Limpia todo el caché en memoria (no persiste hasta flush)."""
-        self._data = {}
+        """Limpia todo el caché en memoria (no persiste hasta flush; en backends incrementales, al momento)."""
+        if self.backend.incremental:
+            self.backend.vaciar()
+        self._data = _Entradas()
+
+
+def abrir_cache(path_json: str, ttl_hours: int | None = None, backend: str | None = None) -> CacheManager:
+    """CacheManager sobre el backend configurado (CONFIG["CACHE_BACKEND"]).
+
+    "sqlite" guarda en <path_json sin extensión>.db e importa path_json la primera vez; "json" usa FileCache;
+    "n8n" usa el webhook CONFIG["N8N_CACHE_URL"]/<nombre> con copia local en <path_json sin extensión>.n8n.json.
+    """
+    backend = backend or CONFIG.get("CACHE_BACKEND") or "sqlite"
+    base = os.path.splitext(path_json)[0]
+    if backend == "n8n":
+        if not CONFIG.get("N8N_CACHE_URL"):
+            raise ValueError("CACHE_BACKEND=n8n requiere N8N_CACHE_URL")
+        url = f"{CONFIG['N8N_CACHE_URL'].rstrip('/')}/{os.path.basename(base)}"
+        return CacheManager(N8nCache(url, copia_local=base + ".n8n.json"), ttl_hours)
+    if backend == "sqlite":
+        return CacheManager(SQLiteCache(base + ".db", json_legacy=path_json), ttl_hours)
+    if backend == "json":
+        return CacheManager(FileCache(path_json), ttl_hours)
+    raise ValueError(f"Backend de caché desconocido: {backend}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+cache_server.py — Servidor local que imita el webhook de caché de n8n.
+
+Sirve el protocolo que usa N8nCache (cache.py), para probarlo y medirlo sin
+una instancia de n8n. Cada ruta es un caché independiente (/telegram_sent,
+/telegram_voice_sent...):
+
+  GET   <ruta>   → 200 {clave: entrada} con ETag: "<época>-v<versión>"
+                   304 si If-None-Match coincide con la versión actual
+  PATCH <ruta>   ← {"poner": {clave: entrada}, "borrar": [clave, ...]}
+                 → 200 {"etag": <nueva>, "previa": <la que había>} con ETag
+
+Los cambios se aplican clave a clave, así que varios clientes pueden
+escribir a la vez sin pisarse. "previa" permite al cliente saber si su
+copia local sigue al día tras el PATCH (si no, el siguiente GET es completo).
+La época es aleatoria en cada arranque: con --datos los cachés sobreviven a
+un reinicio pero las versiones vuelven a 0, y sin ella un ETag de antes del
+reinicio podría coincidir con otro contenido y dar un 304 falso.
+
+Uso:
+  with ServidorCacheLocal() as servidor:
+      backend = N8nCache(servidor.url("telegram_sent"))
+
+  python -m scripts.utils.cache_server --puerto 8765 --datos cache_n8n.json
+"""
+import argparse
+import json
+import logging
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Servidor"
+
+    def log_message(self, format: str, *args):
+        logger.debug("cache_server: " + format, *args)
+
+    def _responder(self, estado: int, cuerpo: Any = None, etag: str | None = None):
+        datos = b"" if cuerpo is None else json.dumps(cuerpo, ensure_ascii=False).encode("utf-8")
+        self.send_response(estado)
+        if etag:
+            self.send_header("ETag", etag)
+        if cuerpo is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(datos)))
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _fallo_simulado(self) -> bool:
+        with self.server.lock:
+            if self.server.fallos_pendientes <= 0:
+                return False
+            self.server.fallos_pendientes -= 1
+        self._responder(503, {"error": "fallo simulado"})
+        return True
+
+    def do_GET(self):
+        self.server.contar("GET")
+        if self._fallo_simulado():
+            return
+        ruta = self.path.split("?", 1)[0]
+        with self.server.lock:
+            etag = self.server.etag(ruta)
+            if self.headers.get("If-None-Match") == etag:
+                self._responder(304, etag=etag)
+                return
+            datos = dict(self.server.caches.get(ruta, {}))
+        self._responder(200, datos, etag)
+
+    def do_PATCH(self):
+        self.server.contar("PATCH")
+        if self._fallo_simulado():
+            return
+        ruta = self.path.split("?", 1)[0]
+        try:
+            cambios = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            poner, borrar = cambios.get("poner") or {}, cambios.get("borrar") or []
+            if not isinstance(poner, dict) or not isinstance(borrar, list):
+                raise ValueError("formato de cambios no válido")
+        except (ValueError, AttributeError) as e:
+            self._responder(400, {"error": str(e)})
+            return
+        with self.server.lock:
+            previa = self.server.etag(ruta)
+            cache = self.server.caches.setdefault(ruta, {})
+            cache.update(poner)
+            for clave in borrar:
+                cache.pop(clave, None)
+            self.server.versiones[ruta] = self.server.versiones.get(ruta, 0) + 1
+            etag = self.server.etag(ruta)
+            self.server.guardar()
+        self._responder(200, {"etag": etag, "previa": previa}, etag)
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, direccion: tuple[str, int], path_datos: str | None = None):
+        super().__init__(direccion, _Handler)
+        self.lock = threading.Lock()
+        self.path_datos = path_datos
+        self.caches: dict[str, dict[str, Any]] = {}
+        self.versiones: dict[str, int] = {}
+        self.peticiones: dict[str, int] = {}
+        self.fallos_pendientes = 0
+        self.epoca = secrets.token_hex(4)
+        if path_datos:
+            try:
+                with open(path_datos, "r", encoding="utf-8") as f:
+                    self.caches = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.caches = {}
+
+    def etag(self, ruta: str) -> str:
+        return f'"{self.epoca}-v{self.versiones.get(ruta, 0)}"'
+
+    def contar(self, metodo: str):
+        with self.lock:
+            self.peticiones[metodo] = self.peticiones.get(metodo, 0) + 1
+
+    def guardar(self):
+        if self.path_datos:
+            with open(self.path_datos, "w", encoding="utf-8") as f:
+                json.dump(self.caches, f, ensure_ascii=False)
+
+
+class ServidorCacheLocal:
+    """Servidor en un hilo del propio proceso. ``puerto=0`` elige uno libre."""
+
+    def __init__(self, host: str = "127.0.0.1", puerto: int = 0, path_datos: str | None = None):
+        self._servidor = _Servidor((host, puerto), path_datos)
+        self._hilo: threading.Thread | None = None
+
+    @property
+    def base(self) -> str:
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}"
+
+    def url(self, nombre: str) -> str:
+        return f"{self.base}/{nombre}"
+
+    def etag(self, nombre: str) -> str:
+        with self._servidor.lock:
+            return self._servidor.etag(f"/{nombre}")
+
+    def datos(self, nombre: str) -> dict[str, Any]:
+        with self._servidor.lock:
+            return dict(self._servidor.caches.get(f"/{nombre}", {}))
+
+    @property
+    def peticiones(self) -> dict[str, int]:
+        return self._servidor.peticiones
+
+    def fallar(self, veces: int):
+        """Las próximas ``veces`` peticiones responden 503 (para probar reintentos)."""
+        with self._servidor.lock:
+            self._servidor.fallos_pendientes = veces
+
+    def iniciar(self) -> "ServidorCacheLocal":
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def __enter__(self) -> "ServidorCacheLocal":
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Servidor local de caché (protocolo de N8nCache)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--datos", help="JSON donde persistir los cachés entre arranques")
+    args = parser.parse_args()
+    servidor = ServidorCacheLocal(args.host, args.puerto, args.datos)
+    logger.info("🗄️ Caché local en %s (Ctrl+C para salir)", servidor.base)
+    try:
+        servidor._servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor._servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+canonical_url.py — URL canónica para deduplicar y como clave de cachés.
+
+Dos URLs que llevan al mismo contenido deben dar la misma cadena:
+
+  - Esquema y host: http/https → https; sin www., m., mobile., amp.;
+    youtu.be y los hosts móviles de YouTube → youtube.com.
+  - Query: solo se conservan los parámetros que identifican el contenido
+    (v en YouTube, id en Hacker News, id/p/page_id genéricos). Los de
+    seguimiento (utm_*, ref, si, fbclid...) y el resto se descartan, igual
+    que el fragmento.
+  - Reglas por host: /shorts/<id>, /embed/<id> y /live/<id> → watch?v=<id>;
+    GitHub sin .git ni /tree/main; MSN reducido al slug del artículo (sin
+    región ni categoría); redirecciones de Bing/Google → URL destino.
+  - Minúsculas y sin "/" final (salvo el id de vídeo de YouTube, que
+    distingue mayúsculas).
+
+Es una clave, no un enlace para mostrar. El resultado se memoiza en una
+caché LRU acotada: el mismo histórico se canonicaliza en cada ejecución.
+
+Uso:
+  from scripts.utils.canonical_url import canonicalizar_url
+  canonicalizar_url("http://m.youtube.com/watch?v=dQw4w9WgXcQ&si=abc")
+  # → "https://youtube.com/watch?v=dQw4w9WgXcQ"
+"""
+import re
+from functools import lru_cache
+from urllib.parse import parse_qsl, urlsplit
+
+TAM_CACHE = 65536
+
+PREFIJOS_HOST = ("www.", "m.", "mobile.", "amp.")
+ALIAS_HOST = {
+    "youtu.be": "youtube.com",
+    "youtube-nocookie.com": "youtube.com",
+    "music.youtube.com": "youtube.com",
+}
+
+# Parámetros que identifican el contenido (el resto de la query se descarta)
+PARAMS_ID_GENERICOS = ("id", "p", "page_id")
+PARAMS_POR_HOST = {
+    "youtube.com": ("v",),
+    "news.ycombinator.com": ("id",),
+}
+
+# Servidores de redirección: host → parámetro con la URL destino
+REDIRECCIONES = {
+    "bing.com": ("url",),
+    "google.com": ("url", "q"),
+    "news.google.com": ("url",),
+}
+
+_RE_YT_RUTA_ID = re.compile(r"^/(?:shorts|embed|live|v)/([A-Za-z0-9_-]{11})")
+_RE_MSN_LOCALE = re.compile(r"^/[a-z]{2}-[a-z]{2}/")
+_RE_MSN_SLUG = re.compile(r"/(?:vi-|id-?|AA)[A-Za-z0-9_-]+")
+_RE_GITHUB_SUFIJO = re.compile(r"^(/[^/]+/[^/]+?)(?:\.git|/tree/(?:main|master))?/?$")
+
+
+def _host(netloc: str) -> str:
+    host = netloc.rsplit("@", 1)[-1].split(":", 1)[0].lower()
+    for prefijo in PREFIJOS_HOST:
+        if host.startswith(prefijo) and host.count(".") > 1:
+            host = host[len(prefijo):]
+            break
+    return ALIAS_HOST.get(host, host)
+
+
+def url_destino(url: str) -> str:
+    """Desenvuelve redirecciones conocidas (Bing apiclick, google.com/url?q=...)."""
+    partes = urlsplit(url.strip())
+    params = REDIRECCIONES.get(_host(partes.netloc))
+    if params:
+        for clave, valor in parse_qsl(partes.query):
+            if clave in params and valor.startswith(("http://", "https://")):
+                return valor
+    return url
+
+
+def url_msn(url: str) -> str:
+    """Artículo de MSN sin región (es-us/es-mx...) ni categoría: https://www.msn.com/<slug>.
+
+    A diferencia de canonicalizar_url, el resultado sigue siendo un enlace válido.
+    """
+    partes = urlsplit(url)
+    if _host(partes.netloc) != "msn.com":
+        return url
+    ruta = _RE_MSN_LOCALE.sub("/", partes.path)
+    slug = _RE_MSN_SLUG.search(ruta)
+    return "https://www.msn.com" + (slug.group(0) if slug else ruta)
+
+
+@lru_cache(maxsize=TAM_CACHE)
+def canonicalizar_url(url: str) -> str:
+    if not url:
+        return ""
+    url = url_destino(url)
+    partes = urlsplit(url.strip())
+    host = _host(partes.netloc)
+    if not host:
+        return url.strip().rstrip("/").lower()
+    ruta = partes.path
+    query = dict(parse_qsl(partes.query))
+
+    if host == "youtube.com":
+        m = _RE_YT_RUTA_ID.match(ruta)
+        if m:
+            ruta, query = "/watch", {"v": m.group(1)}
+        elif partes.netloc.lower().endswith("youtu.be") and len(ruta) > 1:
+            ruta, query = "/watch", {"v": ruta.strip("/")}
+        if "v" in query:
+            # El id de vídeo distingue mayúsculas: no pasa por lower()
+            return f"https://youtube.com/watch?v={query['v']}"
+    elif host == "github.com":
+        m = _RE_GITHUB_SUFIJO.match(ruta)
+        if m:
+            ruta = m.group(1)
+    elif host == "msn.com":
+        ruta = urlsplit(url_msn(url)).path
+    if ruta.endswith("/amp"):
+        ruta = ruta[:-4]
+
+    conservar = PARAMS_POR_HOST.get(host, PARAMS_ID_GENERICOS)
+    query_canonica = "&".join(f"{k}={query[k]}" for k in sorted(query) if k in conservar)
+    canonica = f"https://{host}{ruta}".rstrip("/")
+    if query_canonica:
+        canonica += "?" + query_canonica
+    return canonica.lower()
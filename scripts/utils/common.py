@@ -1,15 +1,23 @@
 import os
 import json
 import re
-import random
 import asyncio
 import logging
+import time
 from pathlib import Path
+import aiohttp
 from slugify import slugify
 from bs4 import BeautifulSoup
 import requests
 from PIL import Image
 from scripts.utils.constants_downloadfile import CONFIG, PROMPT_IMAGEN_TEMPLATE, PROMPT_RESUMIR_NOTICIA, PROMPT_RESUMIR_LOTE, PROMPT_RECAP_SEMANAL, PROMPT_TRADUCIR_TITULOS, FALLBACK_IMAGE_URL, FALLBACK_RECAP_INTRO, ORIGEN_KEY, VAL_RSS, ENLACE_KEY, TITULO_KEY, CATEGORIA_KEY, FUENTE_KEY, BADGE_KEY
+from scripts.utils.ai_client import (
+    CLAVE_INVALIDA, CUOTA, ESPERA_MAX_REINTENTO, OTRO, clasificar_error, generar_contenido, generar_imagenes,
+    router_modelos,
+)
+from scripts.utils.canonical_url import canonicalizar_url
+from scripts.utils.title_dedup import MODO_PREFIJO, TitleDeduplicator
+from scripts.utils.translation_memory import MemoriaTraducciones, abrir_memoria, normalizar_texto
 
 logger = logging.getLogger("scraper")
 
@@ -39,24 +47,29 @@ HEADERS_ARTICLE = {
 }
 
 
+def extraer_texto_html(html: str, max_chars: int = 4000) -> str:
+    """Readable text of an article page via BeautifulSoup, first max_chars chars."""
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "noscript"]):
+        tag.decompose()
+    for selector in ["article", "main", ".post-content", ".entry-content", ".article-body",
+                     '[role="main"]', ".content", "#content", ".story-body"]:
+        main = soup.select_one(selector)
+        if main:
+            text = main.get_text(separator=" ", strip=True)
+            break
+    else:
+        text = soup.get_text(separator=" ", strip=True)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text[:max_chars]
+
+
 def extraer_texto_articulo(url: str, max_chars: int = 4000) -> str:
     """Fetch a URL, extract readable text content via BeautifulSoup, return first max_chars chars."""
     try:
         r = requests.get(url, timeout=15, headers=HEADERS_ARTICLE)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        for tag in soup(["script", "style", "nav", "header", "footer", "aside", "noscript"]):
-            tag.decompose()
-        for selector in ["article", "main", ".post-content", ".entry-content", ".article-body",
-                         '[role="main"]', ".content", "#content", ".story-body"]:
-            main = soup.select_one(selector)
-            if main:
-                text = main.get_text(separator=" ", strip=True)
-                break
-        else:
-            text = soup.get_text(separator=" ", strip=True)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text[:max_chars]
+        return extraer_texto_html(r.text, max_chars)
     except Exception as e:
         logger.debug(f"⚠️ No se pudo extraer texto de {url}: {e}")
         return ""
@@ -69,9 +82,9 @@ async def resumir_lote_noticias(noticias: list, client) -> str | None:
     modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
     texto = "\n".join(f"- [{n.get('fuente','?')}] {n.get('titulo','?')}" for n in noticias[:8])
     prompt = PROMPT_RESUMIR_LOTE.format(texto=texto)
-    for modelo in modelos:
+    for modelo in router_modelos().orden(modelos):
         try:
-            response = client.models.generate_content(model=modelo, contents=prompt)
+            response = await generar_contenido(client, modelo, prompt)
             if response and response.text:
                 return response.text.strip()[:300]
         except Exception:
@@ -79,18 +92,12 @@ async def resumir_lote_noticias(noticias: list, client) -> str | None:
     return None
 
 
-async def resumir_noticia(item: dict, client, max_prompt_chars: int = 3000) -> str | None:
-    """Fetch article text + Gemini summary (3-4 lines) for a single news item."""
-    modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
-
-    texto = extraer_texto_articulo(item[ENLACE_KEY], max_chars=max_prompt_chars)
-    if not texto:
-        texto = item.get(TITULO_KEY, "")
-
+async def _resumir_texto(item: dict, texto: str, client, modelos: list, max_prompt_chars: int = 3000) -> str | None:
+    """Prompt PROMPT_RESUMIR_NOTICIA con fallback de modelos."""
     prompt = PROMPT_RESUMIR_NOTICIA.format(titulo=item['titulo'], fuente=item['fuente'], texto=texto[:max_prompt_chars])
-    for modelo in modelos:
+    for modelo in router_modelos().orden(modelos):
         try:
-            response = client.models.generate_content(model=modelo, contents=prompt)
+            response = await generar_contenido(client, modelo, prompt)
             if response and response.text:
                 resumen = response.text.strip()
                 if len(resumen) > 500:
@@ -101,6 +108,74 @@ async def resumir_noticia(item: dict, client, max_prompt_chars: int = 3000) -> s
             continue
     return None
 
+
+async def resumir_noticia(item: dict, client, max_prompt_chars: int = 3000) -> str | None:
+    """Fetch article text + Gemini summary (3-4 lines) for a single news item."""
+    modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
+
+    texto = extraer_texto_articulo(item[ENLACE_KEY], max_chars=max_prompt_chars)
+    if not texto:
+        texto = item.get(TITULO_KEY, "")
+    return await _resumir_texto(item, texto, client, modelos, max_prompt_chars)
+
+
+RESUMEN_DESCARGAS = 8        # conexiones simultáneas del pool de aiohttp
+RESUMEN_CONCURRENCIA = 4     # llamadas a Gemini a la vez
+RESUMEN_INTERVALO = 0.25     # segundos entre arranques de llamadas
+RESUMEN_TIMEOUT = 15
+
+
+async def _descargar_articulo(session, url: str) -> str:
+    """HTML del artículo o "" si falla (mismo criterio que extraer_texto_articulo)."""
+    try:
+        async with session.get(url, headers=HEADERS_ARTICLE) as r:
+            r.raise_for_status()
+            return await r.text(errors="replace")
+    except Exception as e:
+        logger.debug(f"⚠️ No se pudo descargar {url}: {e}")
+        return ""
+
+
+async def resumir_noticias(items: list, client, max_prompt_chars: int = 3000, session=None) -> int:
+    """Resume a la vez los items sin ``resumen`` y lo guarda en cada uno.
+
+    Por item: descarga (sesión aiohttp compartida), extracción del texto en un
+    hilo del pool (BeautifulSoup no bloquea el loop) y resumen con Gemini bajo
+    un límite de concurrencia y ritmo. El tiempo total lo marca el artículo más
+    lento, no la suma. Los items que ya traen ``resumen`` (de un intento
+    anterior guardado en el histórico) no se tocan. Devuelve cuántos se resumieron.
+    """
+    pendientes = [n for n in items if not n.get('resumen')]
+    if not pendientes:
+        return 0
+    modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
+    limite = _LimiteLlamadas(RESUMEN_CONCURRENCIA, RESUMEN_INTERVALO)
+
+    async def resumir(session, n: dict) -> bool:
+        html = await _descargar_articulo(session, n[ENLACE_KEY])
+        texto = await asyncio.to_thread(extraer_texto_html, html, max_prompt_chars) if html else ""
+        if not texto:
+            texto = n.get(TITULO_KEY, "")
+        async with limite:
+            resumen = await _resumir_texto(n, texto, client, modelos, max_prompt_chars)
+        if resumen:
+            n['resumen'] = resumen
+        return bool(resumen)
+
+    async def con_sesion(session) -> list:
+        return await asyncio.gather(*(resumir(session, n) for n in pendientes))
+
+    logger.info(f"🤖 Resumiendo {len(pendientes)} noticias ({len(items) - len(pendientes)} ya tenían resumen)...")
+    if session is not None:
+        hechos = await con_sesion(session)
+    else:
+        connector = aiohttp.TCPConnector(ssl=False, limit=RESUMEN_DESCARGAS)
+        timeout = aiohttp.ClientTimeout(total=RESUMEN_TIMEOUT)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            hechos = await con_sesion(session)
+    return sum(hechos)
+
+
 async def obtener_recap_semanal_ia(
     noticias: list,
     client,
@@ -145,10 +220,10 @@ async def obtener_recap_semanal_ia(
         semana_info=semana_info,
     )
 
-    for modelo in modelos:
+    for modelo in router_modelos().orden(modelos):
         logger.info(f"🗞️ Generando Recap con modelo: {modelo}")
         try:
-            response = client.models.generate_content(model=modelo, contents=prompt)
+            response = await generar_contenido(client, modelo, prompt)
             raw_text = response.text if response.text else "{}"
             # Extracción robusta de JSON con Regex
             match = re.search(r'(\{.*\})', raw_text.strip(), re.DOTALL)
@@ -159,17 +234,12 @@ async def obtener_recap_semanal_ia(
             clean_json = re.sub(r'```json|```', '', raw_text).strip()
             return json.loads(clean_json)
         except Exception as e:
-            error_str = str(e).upper()
-            if "API_KEY_INVALID" in error_str or ("INVALID_ARGUMENT" in error_str and "API KEY" in error_str):
-                logger.error(f"🔑 API KEY INVÁLIDA. Configura GEMINI_API_KEY correctamente.")
+            # Cuota, 404 y API key ya los anota (y registra) el router
+            tipo = clasificar_error(e)
+            if tipo == CLAVE_INVALIDA:
                 return None
-            elif "429" in error_str or "QUOTA" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                logger.warning(f"⏳ Cuota excedida en {modelo}. Probando siguiente...")
-                continue
-            elif "404" in error_str or "NOT_FOUND" in error_str:
-                logger.warning(f"⚠️ Modelo {modelo} no encontrado (404). Saltando...")
-                continue
-            logger.error(f"❌ Error Recap ({modelo}): {e}")
+            if tipo == OTRO:
+                logger.error(f"❌ Error Recap ({modelo}): {e}")
     logger.error("❌ Fallo total en Recap IA. Generando fallback básico.")
     # Fallback básico si falla la IA: usamos los títulos originales
     recap_fallback = "\n".join([f"### {n['titulo']}\n---" for n in noticias[:5]])
@@ -205,12 +275,13 @@ async def _generar_imagen_noticia(
 
     prompt_completo = prompt_template.format(titulo_post=titulo_noticia)
 
-    for modelo in modelos:
+    router = router_modelos()
+    for modelo in router.orden(modelos):
         for intento in range(3):
             try:
                 logger.info(f"🎨 Generando imagen con {modelo} para: '{titulo_noticia}'...")
-                response = client.models.generate_images(
-                    model=modelo, prompt=prompt_completo,
+                response = await generar_imagenes(
+                    client, modelo, prompt_completo,
                     config=dict(number_of_images=1)
                 )
                 filepath.parent.mkdir(parents=True, exist_ok=True)
@@ -248,14 +319,14 @@ async def _generar_imagen_noticia(
                 return f"{images_prefix}/{filename}"
 
             except Exception as e:
-                error_str = str(e).upper()
-                if "429" in error_str or "RATE_LIMIT" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    wait = 2 ** intento + random.random() * 0.5
-                    logger.warning(f"⏳ Rate limit en {modelo}, esperando {wait:.1f}s...")
-                    await asyncio.sleep(wait)
-                elif "API_KEY_INVALID" in error_str:
-                    logger.error("🔑 API KEY INVÁLIDA.")
+                tipo = clasificar_error(e)
+                if tipo == CLAVE_INVALIDA:
                     return fallback_url
+                # Un límite corto (el error pide esperar unos segundos) se espera en el mismo modelo
+                espera = router.enfriamiento(modelo)
+                if tipo == CUOTA and espera <= ESPERA_MAX_REINTENTO:
+                    logger.warning(f"⏳ Rate limit en {modelo}, esperando {espera:.1f}s...")
+                    await asyncio.sleep(espera)
                 else:
                     logger.warning(f"⚠️ Fallo imagen con {modelo}: {e}. Intentando siguiente...")
                     break
@@ -272,64 +343,136 @@ async def generar_imagen_noticia(titulo_noticia: str, client, prompt_template: s
         fallback_url=fallback_url or FALLBACK_IMAGE_URL,
     )
 
-async def traducir_titulos_ia(noticias: list, client) -> list:
-    """Traduce una lista de títulos al español en un solo bloque usando Gemini.
-    Solo traduce items que NO tengan 'traducido=True'."""
+# Traducción por lotes: títulos por prompt, llamadas simultáneas y separación mínima entre ellas
+TRADUCCION_LOTE = 40
+TRADUCCION_CONCURRENCIA = 3
+TRADUCCION_INTERVALO = 0.5
+
+
+class _LimiteLlamadas:
+    """Como mucho ``concurrencia`` llamadas a la vez y ``intervalo`` segundos entre arranques."""
+
+    def __init__(self, concurrencia: int, intervalo: float):
+        self._semaforo = asyncio.Semaphore(concurrencia)
+        self._ritmo = asyncio.Lock()
+        self._intervalo = intervalo
+        self._ultima = 0.0
+
+    async def __aenter__(self):
+        await self._semaforo.acquire()
+        async with self._ritmo:
+            espera = self._ultima + self._intervalo - time.monotonic()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            self._ultima = time.monotonic()
+
+    async def __aexit__(self, *exc):
+        self._semaforo.release()
+
+
+async def _traducir_lote_gemini(indices: list, originales: dict, client, modelos: list,
+                                limite: _LimiteLlamadas) -> tuple[dict, str]:
+    """Un prompt "id|título" (PROMPT_TRADUCIR_TITULOS) con fallback de modelos.
+    Devuelve ({id: traducción}, modelo) o ({}, "") si fallaron todos."""
+    lineas = [f"{i}|{originales[i]}" for i in indices]
+    prompt = PROMPT_TRADUCIR_TITULOS.format(texto_a_traducir="\n".join(lineas))
+    async with limite:
+        for modelo in router_modelos().orden(modelos):
+            try:
+                logger.info(f"🌐 Traduciendo {len(lineas)} títulos con {modelo}...")
+                response = await generar_contenido(client, modelo, prompt)
+                raw_text = response.text if response.text else "{}"
+
+                clean = re.sub(r'```(?:json)?\s*|\s*```', '', raw_text.strip())
+                match = re.search(r'\{.*\}', clean, re.DOTALL)
+                if match:
+                    data = json.loads(match.group(0))
+                else:
+                    data = json.loads(clean)
+
+                traducciones = {}
+                for item in data.get('traducciones', []):
+                    try:
+                        traducciones[int(item['id'])] = item['tr']
+                    except (KeyError, TypeError, ValueError):
+                        continue
+                return traducciones, modelo
+            except Exception as e:
+                if clasificar_error(e) == OTRO:
+                    logger.error(f"❌ Error traducción batch ({modelo}): {e}")
+                continue
+    return {}, ""
+
+
+async def traducir_titulos_ia(noticias: list, client, memoria: MemoriaTraducciones | None = None) -> list:
+    """Traduce una lista de títulos al español usando Gemini, en lotes concurrentes.
+    Solo traduce items que NO tengan 'traducido=True'. Antes consulta la memoria de
+    traducciones (translation_memory.py): a la IA solo van los títulos nunca vistos,
+    una vez cada uno aunque se repitan en la lista."""
     if not noticias: return noticias
-    
+    if memoria is None:
+        memoria = abrir_memoria()
+
     modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
-    
-    # Preparamos el texto a traducir (solo los que no están traducidos)
-    indices_traducir = []
-    lineas = []
+
+    # Preparamos el texto a traducir (solo los que no están traducidos ni en memoria)
+    grupos: dict[str, list[int]] = {}
     for i, n in enumerate(noticias):
         if n.get('traducido'):
             continue
         titulo = n.get('titulo', '').strip()
-        if titulo:
-            indices_traducir.append(i)
-            lineas.append(f"{i}|{titulo}")
-    
-    if not lineas:
-        return noticias
-    
-    texto_a_traducir = "\n".join(lineas)
-    
-    prompt = PROMPT_TRADUCIR_TITULOS.format(texto_a_traducir=texto_a_traducir)
-    
-    for modelo in modelos:
-        try:
-            logger.info(f"🌐 Traduciendo {len(lineas)} títulos con {modelo}...")
-            response = client.models.generate_content(model=modelo, contents=prompt)
-            raw_text = response.text if response.text else "{}"
-
-            clean = re.sub(r'```(?:json)?\s*|\s*```', '', raw_text.strip())
-            match = re.search(r'\{.*\}', clean, re.DOTALL)
-            if match:
-                data = json.loads(match.group(0))
-            else:
-                data = json.loads(clean)
-
-            traducciones = {item['id']: item['tr'] for item in data.get('traducciones', [])}
+        if not titulo:
+            continue
+        tr = memoria.buscar(titulo)
+        if tr:
+            n['titulo'] = tr
+            n['traducido'] = True
+        else:
+            grupos.setdefault(normalizar_texto(titulo), []).append(i)
 
-            for i, n in enumerate(noticias):
-                if i in traducciones and traducciones[i] and len(traducciones[i].strip()) > 5:
-                    n['titulo'] = traducciones[i]
-                    n['traducido'] = True
+    if not grupos:
+        return noticias
 
-            return noticias
-        except Exception as e:
-            error_str = str(e).upper()
-            if "429" in error_str or "QUOTA" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                logger.warning(f"⏳ Cuota excedida en {modelo} (traducción). Probando siguiente...")
-            elif "404" in error_str or "NOT_FOUND" in error_str:
-                logger.warning(f"⚠️ Modelo {modelo} no disponible (404) para traducción. Saltando...")
-            else:
-                logger.error(f"❌ Error traducción batch ({modelo}): {e}")
+    # Un representante por título: su índice es el id de la línea
+    indices_traducir = [indices[0] for indices in grupos.values()]
+    originales = {i: noticias[i]['titulo'].strip() for i in indices_traducir}
+
+    # Lotes de TRADUCCION_LOTE títulos, a la vez bajo el límite de concurrencia y ritmo
+    limite = _LimiteLlamadas(TRADUCCION_CONCURRENCIA, TRADUCCION_INTERVALO)
+    lotes = [indices_traducir[k:k + TRADUCCION_LOTE] for k in range(0, len(indices_traducir), TRADUCCION_LOTE)]
+    resultados = await asyncio.gather(*(
+        _traducir_lote_gemini(lote, originales, client, modelos, limite) for lote in lotes
+    ))
+
+    origenes: dict[int, str] = {}
+    fallidos: list[int] = []
+    for lote, (traducciones, modelo) in zip(lotes, resultados):
+        if not modelo:
+            fallidos.extend(lote)
             continue
-
-    # Gemini falló en todos los modelos → fallback con IA local (Ollama)
-    _traducir_con_ollama(noticias, indices_traducir, lineas)
+        for i in lote:
+            tr = traducciones.get(i)
+            if tr and len(tr.strip()) > 5:
+                noticias[i]['titulo'] = tr
+                noticias[i]['traducido'] = True
+                origenes[i] = modelo
+
+    if fallidos:
+        # Gemini falló en todos los modelos → fallback con IA local (Ollama)
+        _traducir_con_ollama(noticias, fallidos, [f"{i}|{originales[i]}" for i in fallidos])
+        for i in fallidos:
+            origenes[i] = "ollama:" + os.environ.get("OLLAMA_MODEL", "qwen2.5:1.5b")
+
+    # Lo traducido pasa a la memoria y a las repeticiones del mismo título
+    for indices in grupos.values():
+        representante = noticias[indices[0]]
+        if not representante.get('traducido'):
+            continue
+        memoria.guardar(originales[indices[0]], representante['titulo'], origen=origenes.get(indices[0], ""))
+        for i in indices[1:]:
+            noticias[i]['titulo'] = representante['titulo']
+            noticias[i]['traducido'] = True
+    memoria.guardar_si_cambio()
 
     return noticias
 
@@ -390,24 +533,18 @@ def _traducir_con_ollama(noticias: list, indices: list, lineas: list):
 
 
 def normalizar_url(url: str) -> str:
-    if not url:
-        return ""
-    # Preserve YouTube video IDs (v= param) and other query-based IDs
-    from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-    parsed = urlparse(url)
-    params = parse_qs(parsed.query)
-    # For YouTube, keep the v= parameter in the normalized URL
-    if "youtube.com" in (parsed.hostname or "") and "v" in params:
-        normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?v={params['v'][0]}"
-    else:
-        normalized = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
-    normalized = normalized.rstrip("/")
-    return normalized.lower()
+    """URL canónica (memoizada) para deduplicar: ver scripts/utils/canonical_url.py."""
+    return canonicalizar_url(url)
+
 
+def deduplicar_items(items: list, umbral_similitud: float = 0.85, modo: str = MODO_PREFIJO) -> list:
+    """Quita duplicados por URL normalizada y títulos casi iguales (ver title_dedup.py).
 
-def deduplicar_items(items: list, umbral_similitud: float = 0.85) -> list:
+    modo="prefijo" conserva el criterio histórico (prefijo común del 85 %);
+    modo="fuzzy" usa Jaccard de trigramas con el mismo umbral.
+    """
     urls_vistas: set = set()
-    titulos_vistos: list[str] = []
+    titulos = TitleDeduplicator(umbral_similitud, modo)
     resultado: list = []
 
     for item in items:
@@ -417,19 +554,9 @@ def deduplicar_items(items: list, umbral_similitud: float = 0.85) -> list:
         if url:
             urls_vistas.add(url)
 
-        titulo = (item.get(TITULO_KEY) or "").lower().strip()
-        if titulo:
-            duplicado = False
-            for t in titulos_vistos:
-                min_len = min(len(titulo), len(t))
-                if min_len > 10:
-                    prefijo = int(min_len * umbral_similitud)
-                    if titulo[:prefijo] == t[:prefijo]:
-                        duplicado = True
-                        break
-            if duplicado:
-                continue
-            titulos_vistos.append(titulo)
+        titulo = item.get(TITULO_KEY) or ""
+        if titulo.strip() and not titulos.registrar(titulo):
+            continue
 
         resultado.append(item)
 
@@ -1,4 +1,7 @@
 import os
+
+from scripts.utils.keyword_matcher import KeywordMatcher
+
 CONFIG = {
     "TELEGRAM_TOKEN": os.getenv("TELEGRAM_BOT_TOKEN"),
     "TELEGRAM_CHAT_ID": os.getenv("TOKEN_API_ID"),
@@ -12,13 +15,29 @@ CONFIG = {
     "IMAGES_PATH_PREFIX": "public/optimizado",
     "AI_MODELS": ["gemini-2.5-flash", "gemini-2.5-pro"],
     "IMAGE_MODELS": ["imagen-3.0-generate-002"], # Fallback para imagen
-    "NEWS_DIR": "auto-news"
+    "AI_TIMEOUT": float(os.getenv("AI_TIMEOUT", "90")),  # segundos por llamada a Gemini
+    # Peticiones por minuto de cada modelo (cubo de tokens en scripts/utils/ai_client.py)
+    "AI_RPM": {"gemini-2.5-flash": 10, "gemini-2.5-pro": 5, "gemini-2.0-flash-lite": 30},
+    "AI_ROUTER_ESTADO": os.getenv("AI_ROUTER_ESTADO"),  # JSON con los modelos enfriados entre ejecuciones
+    "NEWS_DIR": "auto-news",
+    "HISTORY_BACKEND": os.getenv("HISTORY_BACKEND", "segmentos"),
+    "CACHE_BACKEND": os.getenv("CACHE_BACKEND", "sqlite"),
+    "N8N_CACHE_URL": os.getenv("N8N_CACHE_URL"),
 }
 
 # ── File paths (centralized) ──
 NOTICIAS_FILENAME = "noticias_historico.json"
+NOTICIAS_DB_FILENAME = "noticias.db"
+NOTICIAS_SEGMENTOS_DIRNAME = "historico"
+VISTOS_DIRNAME = "vistos"
+TRADUCCIONES_FILENAME = "traducciones.jsonl"
 HERRAMIENTAS_FILENAME = "herramientas.json"
 AVATARS_CACHE_FILENAME = "avatars_cache.json"
+AVATARS_META_FILENAME = "avatars_meta.json"
+FETCH_CACHE_FILENAME = "fetch_cache.json"
+YT_CHANNEL_IDS_FILENAME = "yt_channel_ids.json"
+SOURCE_HEALTH_FILENAME = "source_health.json"
+PIPELINE_ESTADO_FILENAME = "pipeline_estado.json"
 TELEGRAM_SENT_FILENAME = "telegram_sent.json"
 TELEGRAM_VOICE_SENT_FILENAME = "telegram_voice_sent.json"
 OPTIMIZED_CACHE_FILENAME = "optimized_cache.json"
@@ -120,13 +139,14 @@ LIBRERIAS = {
 }
 
 
+CATEGORIA_GENERAL = "💡 General"
+
+# Autómata único (una pasada por título) para clasificar_noticia y ContentFilter
+KEYWORD_MATCHER = KeywordMatcher(ALL_KEYWORDS, CATEGORIAS)
+
+
 def clasificar_noticia(titulo: str) -> str:
-    t_padded = " " + titulo.lower() + " "
-    for cat, keywords in CATEGORIAS.items():
-        for k in keywords:
-            if " " + k.lower() + " " in t_padded:
-                return cat
-    return "💡 General"
+    return KEYWORD_MATCHER.categoria(titulo) or CATEGORIA_GENERAL
 
 # ── JS config (inyectado en HTML pre-renderizado) ──
 JS_CONFIG = {
@@ -232,6 +252,7 @@ FECHA_PUB_KEY = "fecha_publicacion"
 ID_VIDEO_KEY = "id_video"
 IMAGEN_URL_KEY = "imagen_url_original"
 ULTIMA_VERIF_KEY = "ultima_verificacion"
+TRADUCIDO_KEY = "traducido"
 
 # ── Fuentes inglesas para traducción automática ──
 FUENTES_INGLES = [
@@ -0,0 +1,535 @@
+#!/usr/bin/env python3
+"""
+history_store.py — Almacén del histórico de noticias con consultas indexadas.
+
+Sustituye al ciclo load_json → filtrar → save_json sobre noticias_historico.json
+completo: cada script pide solo lo que necesita (items desde T, sin traducir,
+¿existe esta URL?) y escribe solo las filas que cambia.
+
+Interfaces:
+  IHistoryStore          — API común de consulta y escritura
+  SegmentedHistoryStore  — (por defecto) un JSONL por día + manifest.json con el
+                           rango de ts de cada segmento. Se escribe añadiendo
+                           líneas al segmento del día y se leen solo los
+                           segmentos que solapan la ventana pedida; ``compactar``
+                           junta los días antiguos en un segmento por mes.
+  SQLiteHistoryStore     — SQLite con columnas indexadas (enlace, id_video, ts,
+                           fuente, categoria, traducido) y el item completo en JSON
+
+Orden: los items se devuelven del más nuevo al más antiguo, igual que la lista
+del JSON (los nuevos se insertaban delante). ``exportar_json`` sigue generando
+noticias_historico.json bajo demanda. Si el almacén no existe se importa el
+anterior (noticias.db o el JSON) al abrirlo.
+
+Uso:
+  from scripts.utils.history_store import abrir_historico
+  with abrir_historico() as store:
+      if not store.existe(enlace=url): store.insertar([item])
+      pendientes = store.sin_traducir()
+      store.actualizar(pendientes)
+
+  python -m scripts.utils.history_store            # estadísticas
+  python -m scripts.utils.history_store exportar   # regenera noticias_historico.json
+  python -m scripts.utils.history_store compactar  # une en meses los días con más de DIAS_SIN_COMPACTAR
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator
+
+from scripts.utils.constants_downloadfile import (
+    CATEGORIA_KEY, CONFIG, ENLACE_KEY, FUENTE_KEY, ID_VIDEO_KEY, NOTICIAS_DB_FILENAME, NOTICIAS_FILENAME,
+    NOTICIAS_SEGMENTOS_DIRNAME, TRADUCIDO_KEY, TS_KEY,
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "manifest.json"
+DIAS_SIN_COMPACTAR = 14
+_RE_DIA = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _ts_columna(ts) -> str:
+    """ISO sin zona horaria, comparable como texto ("" si no hay fecha)."""
+    if isinstance(ts, datetime):
+        ts = ts.isoformat()
+    return (ts or "").replace("Z", "").replace("+00:00", "")
+
+
+class IHistoryStore(ABC):
+    """Histórico de noticias/vídeos ordenado del más nuevo al más antiguo."""
+
+    @abstractmethod
+    def insertar(self, items: list[dict]):
+        """Añade items nuevos delante del histórico (items[0] queda el primero)."""
+
+    @abstractmethod
+    def existe(self, enlace: str = "", id_video: str = "") -> bool:
+        """True si ya hay un item con ese enlace o ese id de vídeo."""
+
+    @abstractmethod
+    def ultimos(self, limite: int | None = None, videos: bool | None = None) -> list[dict]:
+        """Los ``limite`` items más nuevos; ``videos`` filtra por tener (o no) id_video."""
+
+    @abstractmethod
+    def desde(self, ts: datetime | str, incluir_sin_fecha: bool = False) -> list[dict]:
+        """Items con ts >= ``ts``."""
+
+    @abstractmethod
+    def sin_traducir(self, limite: int | None = None) -> list[dict]:
+        """Items con traducido falso."""
+
+    @abstractmethod
+    def actualizar(self, items: list[dict]):
+        """Reescribe los items indicados (por enlace) tras modificarlos."""
+
+    @abstractmethod
+    def eliminar(self, enlaces: Iterable[str]):
+        """Borra los items con esos enlaces."""
+
+    @abstractmethod
+    def recortar(self, max_items: int):
+        """Conserva solo los ``max_items`` más nuevos."""
+
+    @abstractmethod
+    def contar(self) -> int:
+        """Número de items."""
+
+    def todos(self) -> list[dict]:
+        return self.ultimos()
+
+    def compactar(self, dias: int = DIAS_SIN_COMPACTAR, ahora: datetime | None = None) -> int:
+        """Mantenimiento del almacenamiento; solo lo necesitan los backends segmentados."""
+        return 0
+
+    def importar_json(self, path: str) -> int:
+        """Carga un noticias_historico.json (lista, más nuevo primero) en un almacén vacío."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                items = json.load(f)
+        except (json.JSONDecodeError, OSError) as e:
+            logger.warning("⚠️ No se pudo importar %s: %s", path, e)
+            return 0
+        items = [i for i in items if isinstance(i, dict)] if isinstance(items, list) else []
+        self.insertar(items)
+        logger.info("📥 Importados %d items desde %s", len(items), path)
+        return len(items)
+
+    def exportar_json(self, path: str):
+        """Vuelca el histórico completo al formato de noticias_historico.json."""
+        basedir = os.path.dirname(path) or "."
+        os.makedirs(basedir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.todos(), f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+        logger.info("💾 Histórico exportado a %s", path)
+
+    def cerrar(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+
+class SQLiteHistoryStore(IHistoryStore):
+    """Histórico en SQLite: una fila por item, columnas indexadas + JSON completo."""
+
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS noticias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            enlace TEXT NOT NULL DEFAULT '',
+            id_video TEXT NOT NULL DEFAULT '',
+            ts TEXT NOT NULL DEFAULT '',
+            fuente TEXT NOT NULL DEFAULT '',
+            categoria TEXT NOT NULL DEFAULT '',
+            traducido INTEGER NOT NULL DEFAULT 0,
+            datos TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_enlace ON noticias(enlace);
+        CREATE INDEX IF NOT EXISTS idx_id_video ON noticias(id_video) WHERE id_video != '';
+        CREATE INDEX IF NOT EXISTS idx_ts ON noticias(ts);
+        CREATE INDEX IF NOT EXISTS idx_fuente ON noticias(fuente);
+        CREATE INDEX IF NOT EXISTS idx_categoria ON noticias(categoria);
+        CREATE INDEX IF NOT EXISTS idx_sin_traducir ON noticias(id) WHERE traducido = 0;
+    """
+
+    def __init__(self, path: str, json_legacy: str | None = None):
+        self.path = path
+        nuevo = not os.path.exists(path)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._con = sqlite3.connect(path)
+        self._con.executescript(self.ESQUEMA)
+        if nuevo and json_legacy and os.path.exists(json_legacy):
+            self.importar_json(json_legacy)
+
+    @staticmethod
+    def _columnas(item: dict) -> tuple:
+        return (
+            item.get(ENLACE_KEY) or "",
+            item.get(ID_VIDEO_KEY) or "",
+            _ts_columna(item.get(TS_KEY)),
+            item.get(FUENTE_KEY) or "",
+            item.get(CATEGORIA_KEY) or "",
+            1 if item.get(TRADUCIDO_KEY) else 0,
+            json.dumps(item, ensure_ascii=False),
+        )
+
+    def _items(self, sql: str, params: tuple = ()) -> list[dict]:
+        return [json.loads(datos) for (datos,) in self._con.execute(sql, params)]
+
+    def insertar(self, items: list[dict]):
+        if not items:
+            return
+        with self._con:
+            self._con.executemany(
+                "INSERT INTO noticias (enlace, id_video, ts, fuente, categoria, traducido, datos) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._columnas(i) for i in reversed(items)],
+            )
+
+    def existe(self, enlace: str = "", id_video: str = "") -> bool:
+        if enlace and self._con.execute("SELECT 1 FROM noticias WHERE enlace = ? LIMIT 1", (enlace,)).fetchone():
+            return True
+        return bool(id_video) and self._con.execute(
+            "SELECT 1 FROM noticias WHERE id_video = ? LIMIT 1", (id_video,)
+        ).fetchone() is not None
+
+    def ultimos(self, limite: int | None = None, videos: bool | None = None) -> list[dict]:
+        filtro = "" if videos is None else ("WHERE id_video != ''" if videos else "WHERE id_video = ''")
+        return self._items(f"SELECT datos FROM noticias {filtro} ORDER BY id DESC LIMIT ?", (-1 if limite is None else limite,))
+
+    def desde(self, ts: datetime | str, incluir_sin_fecha: bool = False) -> list[dict]:
+        extra = " OR ts = ''" if incluir_sin_fecha else ""
+        return self._items(f"SELECT datos FROM noticias WHERE ts >= ?{extra} ORDER BY id DESC", (_ts_columna(ts),))
+
+    def sin_traducir(self, limite: int | None = None) -> list[dict]:
+        return self._items(
+            "SELECT datos FROM noticias WHERE traducido = 0 ORDER BY id DESC LIMIT ?", (-1 if limite is None else limite,)
+        )
+
+    def actualizar(self, items: list[dict]):
+        filas = [self._columnas(i)[1:] + (i[ENLACE_KEY],) for i in items if i.get(ENLACE_KEY)]
+        if not filas:
+            return
+        with self._con:
+            self._con.executemany(
+                "UPDATE noticias SET id_video = ?, ts = ?, fuente = ?, categoria = ?, traducido = ?, datos = ? "
+                "WHERE enlace = ?",
+                filas,
+            )
+
+    def eliminar(self, enlaces: Iterable[str]):
+        with self._con:
+            self._con.executemany("DELETE FROM noticias WHERE enlace = ?", [(e,) for e in enlaces if e])
+
+    def recortar(self, max_items: int):
+        with self._con:
+            self._con.execute(
+                "DELETE FROM noticias WHERE id NOT IN (SELECT id FROM noticias ORDER BY id DESC LIMIT ?)", (max_items,)
+            )
+
+    def contar(self) -> int:
+        return self._con.execute("SELECT COUNT(*) FROM noticias").fetchone()[0]
+
+    def cerrar(self):
+        self._con.close()
+
+
+class SegmentedHistoryStore(IHistoryStore):
+    """Histórico en segmentos JSONL (uno por día, o por mes tras compactar).
+
+    Cada línea es un item; dentro de un segmento van del más antiguo al más
+    nuevo, así que insertar es añadir al final. Los nombres (``2026-06-01``,
+    ``2026-05``) ordenan cronológicamente como texto: un mes compactado va
+    antes que los días sueltos de ese mismo mes. El manifest guarda por
+    segmento el nº de items, el rango de ts y cuántos están sin traducir o
+    sin fecha, para saltarse los que no interesan sin abrirlos.
+    """
+
+    def __init__(self, directorio: str, en_memoria: bool = False):
+        """
+        Args:
+            directorio: Carpeta con los segmentos y el manifest.
+            en_memoria: Conserva los segmentos ya leídos (varias etapas en un mismo
+                        proceso, ver scripts/tools/downloadFile.py). Se devuelven copias.
+        """
+        self.directorio = directorio
+        self._memoria: dict[str, list[dict]] | None = {} if en_memoria else None
+        self.manifest_path = os.path.join(directorio, MANIFEST_FILENAME)
+        self.segmentos: dict[str, dict] = self._cargar_manifest() if os.path.isdir(directorio) else {}
+        self.nuevo = not self.segmentos
+        # enlace → segmento e ids de vídeo; se construye al primer existe()/actualizar()
+        self._enlaces: dict[str, str] | None = None
+        self._videos: set[str] = set()
+
+    def _cargar_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    return json.load(f).get("segmentos", {})
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning("⚠️ Manifest del histórico ilegible (%s), se reconstruye: %s", self.manifest_path, e)
+        segmentos = {}
+        for fichero in sorted(os.listdir(self.directorio)):
+            if fichero.endswith(".jsonl"):
+                segmentos[fichero[:-6]] = self._resumen(self._leer(fichero[:-6]))
+        return segmentos
+
+    def _guardar_manifest(self):
+        os.makedirs(self.directorio, exist_ok=True)
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segmentos": dict(sorted(self.segmentos.items()))}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.manifest_path)
+        self.nuevo = False
+
+    # ── Segmentos ──
+
+    def _ruta(self, segmento: str) -> str:
+        return os.path.join(self.directorio, segmento + ".jsonl")
+
+    @staticmethod
+    def _segmento_de(item: dict) -> str:
+        ts = _ts_columna(item.get(TS_KEY))
+        return ts[:10] if _RE_DIA.match(ts) else datetime.now().strftime("%Y-%m-%d")
+
+    @staticmethod
+    def _resumen(items: list[dict], previo: dict | None = None) -> dict:
+        r = dict(previo or {"items": 0, "desde": "", "hasta": "", "sin_fecha": 0, "sin_traducir": 0})
+        for item in items:
+            ts = _ts_columna(item.get(TS_KEY))
+            r["items"] += 1
+            r["sin_traducir"] += 0 if item.get(TRADUCIDO_KEY) else 1
+            if not ts:
+                r["sin_fecha"] += 1
+                continue
+            r["desde"] = min(r["desde"], ts) if r["desde"] else ts
+            r["hasta"] = max(r["hasta"], ts)
+        return r
+
+    def _leer(self, segmento: str) -> list[dict]:
+        if self._memoria is not None and segmento in self._memoria:
+            return [dict(i) for i in self._memoria[segmento]]
+        try:
+            with open(self._ruta(segmento), "r", encoding="utf-8") as f:
+                items = [json.loads(linea) for linea in f if linea.strip()]
+        except OSError:
+            return []
+        if self._memoria is not None:
+            self._memoria[segmento] = items
+            return [dict(i) for i in items]
+        return items
+
+    def _anexar(self, segmento: str, items: list[dict]):
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self._ruta(segmento), "a", encoding="utf-8") as f:
+            f.writelines(json.dumps(i, ensure_ascii=False) + "\n" for i in items)
+        if self._memoria is not None and segmento in self._memoria:
+            self._memoria[segmento].extend(dict(i) for i in items)
+        self.segmentos[segmento] = self._resumen(items, self.segmentos.get(segmento))
+        self._indexar(segmento, items)
+
+    def _reescribir(self, segmento: str, items: list[dict]):
+        if self._memoria is not None:
+            self._memoria.pop(segmento, None)
+        if not items:
+            if os.path.exists(self._ruta(segmento)):
+                os.remove(self._ruta(segmento))
+            self.segmentos.pop(segmento, None)
+            return
+        tmp = self._ruta(segmento) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(i, ensure_ascii=False) + "\n" for i in items)
+        os.replace(tmp, self._ruta(segmento))
+        if self._memoria is not None:
+            self._memoria[segmento] = [dict(i) for i in items]
+        self.segmentos[segmento] = self._resumen(items)
+        self._indexar(segmento, items)
+
+    def _orden(self, recientes_primero: bool = True) -> list[str]:
+        return sorted(self.segmentos, reverse=recientes_primero)
+
+    def _iterar(self, segmentos: Iterable[str]) -> Iterator[dict]:
+        """Items de los segmentos dados (en ese orden), del más nuevo al más antiguo."""
+        for segmento in segmentos:
+            yield from reversed(self._leer(segmento))
+
+    # ── Índice de claves ──
+
+    def _indexar(self, segmento: str, items: list[dict]):
+        if self._enlaces is None:
+            return
+        for item in items:
+            if item.get(ENLACE_KEY):
+                self._enlaces[item[ENLACE_KEY]] = segmento
+            if item.get(ID_VIDEO_KEY):
+                self._videos.add(item[ID_VIDEO_KEY])
+
+    def _indice(self) -> dict[str, str]:
+        if self._enlaces is None:
+            self._enlaces, self._videos = {}, set()
+            for segmento in self._orden(recientes_primero=False):
+                self._indexar(segmento, self._leer(segmento))
+        return self._enlaces
+
+    # ── API ──
+
+    def insertar(self, items: list[dict]):
+        if not items:
+            return
+        por_segmento: dict[str, list[dict]] = {}
+        for item in reversed(items):
+            por_segmento.setdefault(self._segmento_de(item), []).append(item)
+        for segmento, nuevos in por_segmento.items():
+            self._anexar(segmento, nuevos)
+        self._guardar_manifest()
+
+    def existe(self, enlace: str = "", id_video: str = "") -> bool:
+        indice = self._indice()
+        return bool(enlace and enlace in indice) or bool(id_video and id_video in self._videos)
+
+    def ultimos(self, limite: int | None = None, videos: bool | None = None) -> list[dict]:
+        resultado = []
+        for item in self._iterar(self._orden()):
+            if limite is not None and len(resultado) >= limite:
+                break
+            if videos is None or bool(item.get(ID_VIDEO_KEY)) == videos:
+                resultado.append(item)
+        return resultado
+
+    def desde(self, ts: datetime | str, incluir_sin_fecha: bool = False) -> list[dict]:
+        corte = _ts_columna(ts)
+        segmentos = [
+            s for s in self._orden()
+            if self.segmentos[s]["hasta"] >= corte or (incluir_sin_fecha and self.segmentos[s]["sin_fecha"])
+        ]
+        return [
+            i for i in self._iterar(segmentos)
+            if _ts_columna(i.get(TS_KEY)) >= corte or (incluir_sin_fecha and not i.get(TS_KEY))
+        ]
+
+    def sin_traducir(self, limite: int | None = None) -> list[dict]:
+        segmentos = [s for s in self._orden() if self.segmentos[s]["sin_traducir"]]
+        pendientes = [i for i in self._iterar(segmentos) if not i.get(TRADUCIDO_KEY)]
+        return pendientes if limite is None else pendientes[:limite]
+
+    def _reescribir_afectados(self, enlaces: set[str], transformar):
+        indice = self._indice()
+        afectados = {indice[e] for e in enlaces if e in indice}
+        for segmento in afectados:
+            self._reescribir(segmento, transformar(self._leer(segmento)))
+        if afectados:
+            self._guardar_manifest()
+
+    def actualizar(self, items: list[dict]):
+        cambios = {i[ENLACE_KEY]: i for i in items if i.get(ENLACE_KEY)}
+        self._reescribir_afectados(
+            set(cambios), lambda actuales: [cambios.get(i.get(ENLACE_KEY), i) for i in actuales]
+        )
+
+    def eliminar(self, enlaces: Iterable[str]):
+        borrar = {e for e in enlaces if e}
+        self._reescribir_afectados(borrar, lambda actuales: [i for i in actuales if i.get(ENLACE_KEY) not in borrar])
+        self._enlaces = None
+
+    def recortar(self, max_items: int):
+        sobran = self.contar() - max_items
+        for segmento in self._orden(recientes_primero=False):
+            if sobran <= 0:
+                break
+            n = self.segmentos[segmento]["items"]
+            self._reescribir(segmento, self._leer(segmento)[sobran:] if n > sobran else [])
+            sobran -= min(n, sobran)
+        self._enlaces = None
+        self._guardar_manifest()
+
+    def contar(self) -> int:
+        return sum(s["items"] for s in self.segmentos.values())
+
+    def compactar(self, dias: int = DIAS_SIN_COMPACTAR, ahora: datetime | None = None) -> int:
+        """Une los segmentos diarios con más de ``dias`` días en uno por mes. Devuelve cuántos unió."""
+        limite = ((ahora or datetime.now()) - timedelta(days=dias)).strftime("%Y-%m-%d")
+        viejos = [s for s in self._orden(recientes_primero=False) if len(s) == 10 and s < limite]
+        por_mes: dict[str, list[str]] = {}
+        for segmento in viejos:
+            por_mes.setdefault(segmento[:7], []).append(segmento)
+        for mes, dias_mes in por_mes.items():
+            items = self._leer(mes) if mes in self.segmentos else []
+            for segmento in dias_mes:
+                items += self._leer(segmento)
+            self._reescribir(mes, items)
+            for segmento in dias_mes:
+                self._reescribir(segmento, [])
+        if viejos:
+            self._enlaces = None
+            self._guardar_manifest()
+            logger.info("🗜️ Histórico compactado: %d segmentos diarios → %d mensuales.", len(viejos), len(por_mes))
+        return len(viejos)
+
+
+def abrir_historico(folder: str | None = None, backend: str | None = None, en_memoria: bool = False) -> IHistoryStore:
+    """Abre el histórico configurado (CONFIG["HISTORY_BACKEND"]), importando el anterior la primera vez.
+
+    ``en_memoria`` mantiene los segmentos leídos para las siguientes consultas (solo "segmentos").
+    """
+    folder = folder or CONFIG["FOLDER"]
+    backend = backend or CONFIG.get("HISTORY_BACKEND") or "segmentos"
+    json_legacy = os.path.join(folder, NOTICIAS_FILENAME)
+    db_path = os.path.join(folder, NOTICIAS_DB_FILENAME)
+    if backend == "sqlite":
+        return SQLiteHistoryStore(db_path, json_legacy=json_legacy)
+    if backend == "segmentos":
+        store = SegmentedHistoryStore(os.path.join(folder, NOTICIAS_SEGMENTOS_DIRNAME), en_memoria=en_memoria)
+        if store.nuevo and os.path.exists(db_path):
+            with SQLiteHistoryStore(db_path) as previo:
+                store.insertar(previo.todos())
+            logger.info("📥 Histórico migrado desde %s (%d items)", db_path, store.contar())
+        elif store.nuevo and os.path.exists(json_legacy):
+            store.importar_json(json_legacy)
+        return store
+    raise ValueError(f"Backend de histórico desconocido: {backend}")
+
+
+@contextmanager
+def usar_historico(store: IHistoryStore | None = None) -> Iterator[IHistoryStore]:
+    """El histórico compartido que se recibe (sin cerrarlo) o uno propio que se cierra al salir."""
+    if store is not None:
+        yield store
+        return
+    with abrir_historico() as propio:
+        yield propio
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Histórico de noticias")
+    parser.add_argument("accion", nargs="?", choices=["stats", "exportar", "compactar"], default="stats")
+    parser.add_argument("--salida", default=os.path.join(CONFIG["FOLDER"], NOTICIAS_FILENAME),
+                        help="Ruta del JSON exportado")
+    args = parser.parse_args()
+    with abrir_historico() as store:
+        if args.accion == "exportar":
+            store.exportar_json(args.salida)
+        elif args.accion == "compactar":
+            store.compactar()
+        else:
+            print(json.dumps({
+                "items": store.contar(),
+                "sin_traducir": len(store.sin_traducir()),
+                "videos": len(store.ultimos(videos=True)),
+            }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+keyword_matcher.py — Clasificador de titulares por keywords en una sola pasada.
+
+Autómata Aho-Corasick construido una vez con todas las keywords (en minúsculas)
+de ``ALL_KEYWORDS`` y ``CATEGORIAS``. Un único recorrido del título responde a
+las dos preguntas que antes hacían bucles de ``in`` por keyword:
+
+  - ¿contiene alguna keyword tech? → subcadena, como ContentFilter.coincide_con_keywords
+  - ¿primera categoría que aplica? → keyword delimitada por espacios (o inicio/fin),
+    ganando la categoría que aparece antes en CATEGORIAS, como clasificar_noticia
+
+Uso:
+  matcher = KeywordMatcher(ALL_KEYWORDS, CATEGORIAS)
+  coincide, categoria = matcher.analizar("OpenAI lanza GPT-5")
+"""
+
+
+class KeywordMatcher:
+    """Autómata Aho-Corasick sobre keywords tech y keywords por categoría."""
+
+    def __init__(self, keywords: list[str], categorias: dict[str, list[str]]):
+        self.categorias = list(categorias)
+        # Por patrón: (es keyword tech, índice de la mejor categoría o None)
+        info: dict[str, list] = {}
+        for k in keywords:
+            info.setdefault(k.lower(), [False, None])[0] = True
+        for idx, cat in enumerate(self.categorias):
+            for k in categorias[cat]:
+                entrada = info.setdefault(k.lower(), [False, None])
+                if entrada[1] is None:
+                    entrada[1] = idx
+        self._construir(info)
+
+    def _construir(self, info: dict[str, list]):
+        # Trie: transiciones por estado, y salidas (longitud, tech, categoría) por estado
+        goto: list[dict[str, int]] = [{}]
+        salidas: list[list[tuple]] = [[]]
+        for patron, (tech, cat) in info.items():
+            if not patron:
+                continue
+            estado = 0
+            for c in patron:
+                siguiente = goto[estado].get(c)
+                if siguiente is None:
+                    siguiente = len(goto)
+                    goto[estado][c] = siguiente
+                    goto.append({})
+                    salidas.append([])
+                estado = siguiente
+            salidas[estado].append((len(patron), tech, cat))
+
+        # Enlaces de fallo en BFS; se precalcula el autómata determinista completo
+        # solo para los caracteres que aparecen en algún patrón
+        fallo = [0] * len(goto)
+        cola = list(goto[0].values())
+        i = 0
+        while i < len(cola):
+            estado = cola[i]
+            i += 1
+            for c, hijo in goto[estado].items():
+                cola.append(hijo)
+                if estado:
+                    f = fallo[estado]
+                    while f and c not in goto[f]:
+                        f = fallo[f]
+                    fallo[hijo] = goto[f].get(c, 0)
+                salidas[hijo] = salidas[hijo] + salidas[fallo[hijo]]
+
+        alfabeto = {c for t in goto for c in t}
+        delta: list[dict[str, int]] = []
+        for estado in range(len(goto)):
+            fila = {}
+            for c in alfabeto:
+                s = estado
+                while s and c not in goto[s]:
+                    s = fallo[s]
+                fila[c] = goto[s].get(c, 0)
+            delta.append({c: s for c, s in fila.items() if s})
+        self._delta = delta
+        self._salidas = [tuple(s) for s in salidas]
+
+    def analizar(self, titulo: str) -> tuple[bool, str | None]:
+        """(contiene alguna keyword tech, primera categoría por keyword delimitada)."""
+        t = titulo.lower()
+        n = len(t)
+        delta = self._delta
+        salidas = self._salidas
+        estado = 0
+        tech = False
+        mejor = None
+        for pos, c in enumerate(t):
+            estado = delta[estado].get(c, 0)
+            if not estado:
+                continue
+            for longitud, es_tech, cat in salidas[estado]:
+                if es_tech:
+                    tech = True
+                if cat is not None and (mejor is None or cat < mejor):
+                    inicio = pos + 1 - longitud
+                    if (inicio == 0 or t[inicio - 1] == " ") and (pos + 1 == n or t[pos + 1] == " "):
+                        mejor = cat
+            if tech and mejor == 0:
+                break
+        return tech, (self.categorias[mejor] if mejor is not None else None)
+
+    def coincide(self, titulo: str) -> bool:
+        return self.analizar(titulo)[0]
+
+    def categoria(self, titulo: str) -> str | None:
+        return self.analizar(titulo)[1]
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+pipeline.py — Ejecutor de etapas en un solo proceso (DAG sobre un event loop).
+
+Cada Etapa declara de qué etapas depende y qué ficheros lee (entradas). El
+Pipeline arranca cada etapa en cuanto terminan sus dependencias, así que las
+independientes (news ‖ tools) corren a la vez en el mismo event loop y
+comparten el estado que se les pase en el contexto (histórico, scraper...).
+
+Salto por entradas: al terminar se guarda en PIPELINE_ESTADO_FILENAME la
+huella (hash del contenido) de las entradas de cada etapa que terminó bien.
+En la siguiente ejecución, una etapa con entradas declaradas y las mismas
+huellas se salta. Las etapas sin entradas (scrapers: leen de la red) se
+ejecutan siempre. Una etapa que falla no detiene a las demás (igual que el
+antiguo bucle de subprocesos) y no guarda huella, así que se repite.
+
+Uso:
+  pipeline = Pipeline([
+      Etapa("news", scrape),
+      Etapa("weekly", generar, depende=("news",), entradas=("files/historico",)),
+  ], estado_path="files/pipeline_estado.json")
+  resultados = await pipeline.ejecutar(contexto)   # {"news": "ok", "weekly": "saltada"}
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+SALTADA = "saltada"
+ERROR = "error"
+
+
+def huella(path: str) -> str:
+    """Hash del contenido de un fichero o de todos los de un directorio ("" si no existe)."""
+    h = hashlib.sha1()
+    if os.path.isdir(path):
+        for raiz, dirs, ficheros in os.walk(path):
+            dirs.sort()
+            for fichero in sorted(ficheros):
+                if fichero.endswith(".tmp"):
+                    continue
+                ruta = os.path.join(raiz, fichero)
+                h.update(os.path.relpath(ruta, path).encode("utf-8") + b"\0")
+                with open(ruta, "rb") as f:
+                    for bloque in iter(lambda: f.read(1 << 16), b""):
+                        h.update(bloque)
+    elif os.path.isfile(path):
+        with open(path, "rb") as f:
+            for bloque in iter(lambda: f.read(1 << 16), b""):
+                h.update(bloque)
+    else:
+        return ""
+    return h.hexdigest()
+
+
+class Etapa:
+    """Paso del pipeline: ``ejecutar(contexto)`` es una corrutina."""
+
+    def __init__(self, nombre: str, ejecutar: Callable[[Any], Awaitable], depende: Iterable[str] = (),
+                 entradas: Iterable[str] = ()):
+        self.nombre = nombre
+        self.ejecutar = ejecutar
+        self.depende = tuple(depende)
+        self.entradas = tuple(entradas)
+
+    def huellas(self) -> dict[str, str]:
+        return {path: huella(path) for path in self.entradas}
+
+
+class Pipeline:
+    def __init__(self, etapas: list[Etapa], estado_path: str | None = None):
+        self.etapas = {e.nombre: e for e in etapas}
+        for etapa in etapas:
+            desconocidas = set(etapa.depende) - set(self.etapas)
+            if desconocidas:
+                raise ValueError(f"Etapa {etapa.nombre}: dependencias desconocidas {sorted(desconocidas)}")
+        self._comprobar_ciclos()
+        self.estado_path = estado_path
+        self.estado: dict[str, dict] = self._cargar_estado()
+
+    def _comprobar_ciclos(self):
+        visitadas: set[str] = set()
+
+        def visitar(nombre: str, camino: tuple[str, ...]):
+            if nombre in camino:
+                raise ValueError(f"Ciclo en el pipeline: {' → '.join(camino + (nombre,))}")
+            if nombre in visitadas:
+                return
+            for dep in self.etapas[nombre].depende:
+                visitar(dep, camino + (nombre,))
+            visitadas.add(nombre)
+
+        for nombre in self.etapas:
+            visitar(nombre, ())
+
+    def _cargar_estado(self) -> dict:
+        if self.estado_path and os.path.exists(self.estado_path):
+            try:
+                with open(self.estado_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except (json.JSONDecodeError, OSError) as e:
+                logger.warning("⚠️ Error leyendo estado del pipeline %s: %s", self.estado_path, e)
+        return {}
+
+    def _guardar_estado(self):
+        if not self.estado_path:
+            return
+        os.makedirs(os.path.dirname(self.estado_path) or ".", exist_ok=True)
+        tmp = self.estado_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.estado, f, indent=2, ensure_ascii=False)
+        os.replace(tmp, self.estado_path)
+
+    def _validar(self, nombres: Iterable[str]) -> set[str]:
+        """Las etapas pedidas. Sus dependencias no se añaden: solo ordenan si también se piden."""
+        pedidas = set(nombres)
+        desconocidas = pedidas - set(self.etapas)
+        if desconocidas:
+            raise ValueError(f"Etapas desconocidas: {sorted(desconocidas)}")
+        return pedidas
+
+    def sin_cambios(self, etapa: Etapa) -> bool:
+        previas = self.estado.get(etapa.nombre, {}).get("huellas")
+        return bool(etapa.entradas) and previas == etapa.huellas()
+
+    async def ejecutar(self, contexto: Any = None, solo: Iterable[str] | None = None,
+                       forzar: bool = False) -> dict[str, str]:
+        """Ejecuta las etapas (todas o ``solo``) respetando dependencias. Devuelve el resultado de cada una."""
+        activas = self._validar(solo) if solo is not None else set(self.etapas)
+        terminadas = {nombre: asyncio.Event() for nombre in self.etapas}
+        resultados: dict[str, str] = {}
+
+        async def correr(etapa: Etapa):
+            for dep in etapa.depende:
+                if dep in activas:
+                    await terminadas[dep].wait()
+            try:
+                if not forzar and self.sin_cambios(etapa):
+                    logger.info("⏭️ %s: entradas sin cambios, se salta", etapa.nombre)
+                    resultados[etapa.nombre] = SALTADA
+                    return
+                logger.info("🚀 Etapa %s", etapa.nombre)
+                inicio = time.monotonic()
+                try:
+                    await etapa.ejecutar(contexto)
+                except Exception as e:
+                    logger.error("❌ Etapa %s falló: %s", etapa.nombre, e, exc_info=True)
+                    resultados[etapa.nombre] = ERROR
+                    return
+                resultados[etapa.nombre] = OK
+                logger.info("✅ Etapa %s completada (%.1fs)", etapa.nombre, time.monotonic() - inicio)
+            finally:
+                terminadas[etapa.nombre].set()
+
+        await asyncio.gather(*(correr(self.etapas[n]) for n in self.etapas if n in activas))
+
+        # Huellas al final: incluyen lo que escribieron las etapas posteriores de esta pasada
+        for nombre, resultado in resultados.items():
+            etapa = self.etapas[nombre]
+            if resultado == OK and etapa.entradas:
+                self.estado[nombre] = {"huellas": etapa.huellas(), "ts": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        self._guardar_estado()
+        return resultados
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+seen_index.py — Índice persistente de URLs e ids de vídeo ya vistos.
+
+El histórico se recorta (clean_news.py deja MAX_HISTORICO items), así que no
+sirve para saber si un item ya se publicó hace meses: al reaparecer en un feed
+volvía a entrar como nuevo, se traducía otra vez y se duplicaba. Este índice
+no se recorta nunca y su coste no depende de la retención del histórico.
+
+Ficheros (en files/vistos/):
+  <nombre>.txt    — claves exactas, una por línea, solo se añaden al final
+                    ("url:<url normalizada>" o "yt:<id de vídeo>")
+  <nombre>.bloom  — filtro de Bloom sobre esas claves (cabecera + bits)
+
+Consulta: si el Bloom dice que no, la clave es nueva sin tocar el .txt (el
+caso de los items realmente nuevos). Si dice que quizá, se confirma contra el
+conjunto exacto, que se carga del .txt la primera vez que hace falta. El Bloom
+se reconstruye desde el .txt si falta, no cuadra con él o se llena.
+
+Uso:
+  vistos = SeenIndex("files/vistos", "noticias")
+  if not vistos.visto(enlace=url, id_video=vid):
+      vistos.marcar(enlace=url, id_video=vid)
+  vistos.guardar_si_cambio()
+
+  python -m scripts.utils.seen_index                 # estadísticas
+  python -m scripts.utils.seen_index --nombre herramientas
+"""
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import struct
+from typing import Iterable
+
+from scripts.utils.canonical_url import canonicalizar_url
+from scripts.utils.constants_downloadfile import CONFIG, ENLACE_KEY, ID_VIDEO_KEY, VISTOS_DIRNAME
+
+logger = logging.getLogger(__name__)
+
+CAPACIDAD_INICIAL = 50_000
+TASA_FP = 0.01
+
+# magia, nº de hashes, nº de bits, capacidad, nº de claves, tamaño del .txt al guardar
+_CABECERA = struct.Struct("<4sIQQQQ")
+_MAGIA = b"BLM1"
+
+
+class BloomFilter:
+    """Filtro de Bloom con doble hashing sobre blake2b (estable entre ejecuciones)."""
+
+    def __init__(self, capacidad: int = CAPACIDAD_INICIAL, tasa_fp: float = TASA_FP):
+        self.capacidad = max(capacidad, 1)
+        self.n_bits = max(int(-self.capacidad * math.log(tasa_fp) / math.log(2) ** 2), 8)
+        self.n_hashes = max(round(self.n_bits / self.capacidad * math.log(2)), 1)
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.n = 0
+
+    def _posiciones(self, clave: str) -> Iterable[int]:
+        digest = hashlib.blake2b(clave.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.n_bits for i in range(self.n_hashes))
+
+    def anadir(self, clave: str):
+        for p in self._posiciones(clave):
+            self.bits[p >> 3] |= 1 << (p & 7)
+        self.n += 1
+
+    def __contains__(self, clave: str) -> bool:
+        return all(self.bits[p >> 3] & (1 << (p & 7)) for p in self._posiciones(clave))
+
+    @property
+    def lleno(self) -> bool:
+        return self.n > self.capacidad
+
+    def a_bytes(self, tam_claves: int) -> bytes:
+        return _CABECERA.pack(_MAGIA, self.n_hashes, self.n_bits, self.capacidad, self.n, tam_claves) + bytes(self.bits)
+
+    @classmethod
+    def desde_bytes(cls, data: bytes) -> tuple["BloomFilter", int]:
+        """Filtro y tamaño del .txt con el que se guardó. ValueError si el formato no cuadra."""
+        if len(data) < _CABECERA.size:
+            raise ValueError("cabecera incompleta")
+        magia, n_hashes, n_bits, capacidad, n, tam_claves = _CABECERA.unpack_from(data)
+        if magia != _MAGIA or len(data) - _CABECERA.size != (n_bits + 7) // 8:
+            raise ValueError("formato desconocido")
+        bloom = cls.__new__(cls)
+        bloom.n_hashes, bloom.n_bits, bloom.capacidad, bloom.n = n_hashes, n_bits, capacidad, n
+        bloom.bits = bytearray(data[_CABECERA.size:])
+        return bloom, tam_claves
+
+
+def clave_url(enlace: str) -> str:
+    url = canonicalizar_url(enlace or "")
+    return f"url:{url}" if url else ""
+
+
+def clave_video(id_video: str) -> str:
+    return f"yt:{id_video}" if id_video else ""
+
+
+class SeenIndex:
+    """Claves vistas en ejecuciones anteriores (Bloom delante, conjunto exacto detrás)."""
+
+    def __init__(self, directorio: str, nombre: str = "noticias", tasa_fp: float = TASA_FP):
+        self.directorio = directorio
+        self.path_claves = os.path.join(directorio, f"{nombre}.txt")
+        self.path_bloom = os.path.join(directorio, f"{nombre}.bloom")
+        self.tasa_fp = tasa_fp
+        self.nuevo = not os.path.exists(self.path_claves)
+        self._exactas: set[str] | None = None
+        self._pendientes: dict[str, None] = {}
+        self._bloom_cambiado = False
+        self.descartes_bloom = 0
+        self.confirmados = 0
+        self.falsos_positivos = 0
+        self.bloom = self._cargar_bloom()
+
+    # ── Carga ──
+
+    def _tam_claves(self) -> int:
+        return os.path.getsize(self.path_claves) if os.path.exists(self.path_claves) else 0
+
+    def _leer_claves(self) -> set[str]:
+        if not os.path.exists(self.path_claves):
+            return set()
+        with open(self.path_claves, "r", encoding="utf-8") as f:
+            return {linea.rstrip("\n") for linea in f if linea.strip()}
+
+    def _cargar_bloom(self) -> BloomFilter:
+        if os.path.exists(self.path_bloom):
+            try:
+                with open(self.path_bloom, "rb") as f:
+                    bloom, tam_claves = BloomFilter.desde_bytes(f.read())
+                if tam_claves == self._tam_claves():
+                    return bloom
+                logger.info("🔁 %s no cuadra con %s, se reconstruye", self.path_bloom, self.path_claves)
+            except (ValueError, OSError) as e:
+                logger.warning("⚠️ Error leyendo filtro de Bloom %s: %s", self.path_bloom, e)
+        return self._reconstruir_bloom(self._exactas_cargadas())
+
+    def _exactas_cargadas(self) -> set[str]:
+        if self._exactas is None:
+            self._exactas = self._leer_claves()
+        return self._exactas
+
+    def _reconstruir_bloom(self, claves: set[str]) -> BloomFilter:
+        capacidad = CAPACIDAD_INICIAL
+        while capacidad < len(claves) * 2:
+            capacidad *= 2
+        bloom = BloomFilter(capacidad, self.tasa_fp)
+        for clave in claves:
+            bloom.anadir(clave)
+        self._bloom_cambiado = bool(claves)
+        return bloom
+
+    # ── Consulta ──
+
+    def contiene(self, clave: str) -> bool:
+        if not clave:
+            return False
+        if clave in self._pendientes:
+            return True
+        if clave not in self.bloom:
+            self.descartes_bloom += 1
+            return False
+        if clave in self._exactas_cargadas():
+            self.confirmados += 1
+            return True
+        self.falsos_positivos += 1
+        return False
+
+    def visto(self, enlace: str = "", id_video: str = "") -> bool:
+        """True si la URL (normalizada) o el id de vídeo ya se vieron."""
+        return self.contiene(clave_url(enlace)) or self.contiene(clave_video(id_video))
+
+    # ── Escritura ──
+
+    def marcar(self, enlace: str = "", id_video: str = ""):
+        for clave in (clave_url(enlace), clave_video(id_video)):
+            if clave and not self.contiene(clave):
+                self._pendientes[clave] = None
+                self.bloom.anadir(clave)
+
+    def marcar_items(self, items: Iterable[dict]):
+        for item in items:
+            self.marcar(item.get(ENLACE_KEY) or "", item.get(ID_VIDEO_KEY) or "")
+
+    def __len__(self) -> int:
+        return self.bloom.n
+
+    def guardar_si_cambio(self):
+        if not self._pendientes and not self._bloom_cambiado:
+            return
+        os.makedirs(self.directorio, exist_ok=True)
+        if self._pendientes:
+            with open(self.path_claves, "a", encoding="utf-8") as f:
+                f.write("".join(f"{clave}\n" for clave in self._pendientes))
+            if self._exactas is not None:
+                self._exactas.update(self._pendientes)
+            logger.info("👁️ %d claves nuevas en %s", len(self._pendientes), self.path_claves)
+            self._pendientes = {}
+        if self.bloom.lleno:
+            self.bloom = self._reconstruir_bloom(self._exactas_cargadas())
+        tmp = f"{self.path_bloom}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.bloom.a_bytes(self._tam_claves()))
+        os.replace(tmp, self.path_bloom)
+        self._bloom_cambiado = False
+        self.nuevo = False
+
+    def resumen(self) -> str:
+        return (f"{len(self)} claves, {self.descartes_bloom} descartes del Bloom, "
+                f"{self.confirmados} confirmadas, {self.falsos_positivos} falsos positivos")
+
+
+def abrir_vistos(nombre: str = "noticias", folder: str | None = None) -> SeenIndex:
+    return SeenIndex(os.path.join(folder or CONFIG["FOLDER"], VISTOS_DIRNAME), nombre)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Índice de URLs vistas")
+    parser.add_argument("--nombre", default="noticias", help="Índice a consultar (noticias, herramientas)")
+    args = parser.parse_args()
+    vistos = abrir_vistos(args.nombre)
+    bloom = vistos.bloom
+    print(json.dumps({
+        "claves": len(vistos),
+        "capacidad": bloom.capacidad,
+        "bits": bloom.n_bits,
+        "hashes": bloom.n_hashes,
+        "kb_bloom": round(len(bloom.bits) / 1024, 1),
+        "kb_claves": round(vistos._tam_claves() / 1024, 1),
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
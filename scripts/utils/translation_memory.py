@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+translation_memory.py — Memoria de traducciones compartida por todas las llamadas a la IA.
+
+Los mismos titulares se traducían varias veces: en scrape_news, otra vez en
+generate_weekly, uno a uno en send_telegram/send_email, y en hunt_challenges
+y manage_resources con sus propios lotes. La memoria guarda cada traducción
+aceptada (de Gemini o del fallback de Ollama) con una clave que depende solo
+del texto original normalizado y del idioma destino; antes de construir un
+prompt se consulta y solo se envía a la IA lo que nunca se ha visto.
+
+Fichero (files/traducciones.jsonl): una línea por traducción, solo se añaden
+al final; si una clave se repite, gana la última.
+  {"k": "<sha1 de idioma + texto normalizado>", "src": "...", "tr": "...", "o": "gemini-2.5-flash"}
+
+Uso:
+  memoria = abrir_memoria()
+  tr = memoria.buscar("New release of Python")    # None si nunca se tradujo
+  memoria.guardar("New release of Python", "Nueva versión de Python", origen="gemini-2.5-flash")
+  memoria.guardar_si_cambio()
+
+  python -m scripts.utils.translation_memory      # estadísticas
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+
+from scripts.utils.constants_downloadfile import CONFIG, TRADUCCIONES_FILENAME
+
+logger = logging.getLogger(__name__)
+
+IDIOMA_DEFECTO = "es"
+
+
+def normalizar_texto(texto: str) -> str:
+    """Forma canónica del texto original: NFC y espacios colapsados (mayúsculas intactas)."""
+    return " ".join(unicodedata.normalize("NFC", texto or "").split())
+
+
+def clave_traduccion(texto: str, idioma: str = IDIOMA_DEFECTO) -> str:
+    normalizado = normalizar_texto(texto)
+    if not normalizado:
+        return ""
+    return hashlib.sha1(f"{idioma}\n{normalizado}".encode("utf-8")).hexdigest()
+
+
+class MemoriaTraducciones:
+    """Traducciones ya hechas, direccionadas por contenido (texto original + idioma)."""
+
+    def __init__(self, path: str, idioma: str = IDIOMA_DEFECTO):
+        self.path = path
+        self.idioma = idioma
+        self._traducciones: dict[str, str] | None = None
+        self._pendientes: list[dict] = []
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _cargadas(self) -> dict[str, str]:
+        if self._traducciones is None:
+            self._traducciones = {}
+            if os.path.exists(self.path):
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for n, linea in enumerate(f, 1):
+                        if not linea.strip():
+                            continue
+                        try:
+                            entrada = json.loads(linea)
+                            self._traducciones[entrada["k"]] = entrada["tr"]
+                        except (json.JSONDecodeError, KeyError, TypeError):
+                            logger.warning("⚠️ Línea %d no válida en %s", n, self.path)
+        return self._traducciones
+
+    def buscar(self, texto: str) -> str | None:
+        clave = clave_traduccion(texto, self.idioma)
+        tr = self._cargadas().get(clave) if clave else None
+        if tr is None:
+            self.fallos += 1
+        else:
+            self.aciertos += 1
+        return tr
+
+    def guardar(self, texto: str, traduccion: str, origen: str = ""):
+        clave = clave_traduccion(texto, self.idioma)
+        traduccion = (traduccion or "").strip()
+        if not clave or not traduccion or self._cargadas().get(clave) == traduccion:
+            return
+        self._traducciones[clave] = traduccion
+        self._pendientes.append({"k": clave, "src": normalizar_texto(texto), "tr": traduccion, "o": origen})
+
+    def __len__(self) -> int:
+        return len(self._cargadas())
+
+    def guardar_si_cambio(self):
+        if not self._pendientes:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in self._pendientes))
+        logger.info("🧠 %d traducciones nuevas en %s", len(self._pendientes), self.path)
+        self._pendientes = []
+
+    def resumen(self) -> str:
+        return f"{len(self)} traducciones, {self.aciertos} aciertos, {self.fallos} sin traducir"
+
+
+# Una instancia por fichero e idioma: todas las llamadas del proceso comparten memoria
+_MEMORIAS: dict[tuple[str, str], MemoriaTraducciones] = {}
+
+
+def abrir_memoria(folder: str | None = None, idioma: str = IDIOMA_DEFECTO) -> MemoriaTraducciones:
+    path = os.path.join(folder or CONFIG["FOLDER"], TRADUCCIONES_FILENAME)
+    if (path, idioma) not in _MEMORIAS:
+        _MEMORIAS[(path, idioma)] = MemoriaTraducciones(path, idioma)
+    return _MEMORIAS[(path, idioma)]
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    parser = argparse.ArgumentParser(description="Memoria de traducciones")
+    parser.add_argument("--idioma", default=IDIOMA_DEFECTO)
+    args = parser.parse_args()
+    memoria = abrir_memoria(idioma=args.idioma)
+    print(json.dumps({
+        "traducciones": len(memoria),
+        "kb": round(os.path.getsize(memoria.path) / 1024, 1) if os.path.exists(memoria.path) else 0,
+    }, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
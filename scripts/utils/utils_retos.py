@@ -4,8 +4,10 @@ import re
 import asyncio
 import logging
 from slugify import slugify
+from scripts.utils.ai_client import CLAVE_INVALIDA, CUOTA, ESPERA_MAX_REINTENTO, OTRO, clasificar_error, generar_contenido, router_modelos
 from scripts.utils.common import _generar_imagen_noticia
 from scripts.utils.constants_retos import CONFIG, PROMPT_IMAGEN_TEMPLATE_RETO
+from scripts.utils.translation_memory import MemoriaTraducciones, abrir_memoria
 try:
     from scripts.solutions.solutions_db import lookup, generate_generic
 except ImportError:
@@ -52,26 +54,28 @@ async def obtener_solucion_ia(titulo: str, fuente: str, client, lang: str = "Pyt
     }}
     """
 
-    for modelo in modelos:
+    router = router_modelos()
+    for modelo in router.orden(modelos):
         logger.info(f"Intentando {titulo} con modelo: {modelo}")
         for intento in range(2):
             try:
-                response = client.models.generate_content(model=modelo, contents=prompt)
+                response = await generar_contenido(client, modelo, prompt)
                 match = re.search(r'(\{.*\})', response.text.strip(), re.DOTALL)
                 if match:
                     data = json.loads(match.group(1))
                     if data.get('codigo') and len(data['codigo']) > 80:
                         return data
             except Exception as e:
-                error_str = str(e).upper()
-                if "API_KEY_INVALID" in error_str or ("INVALID_ARGUMENT" in error_str and "API KEY" in error_str):
-                    logger.error(f"API KEY INVÁLIDA. Configura GEMINI_API_KEY correctamente.")
+                tipo = clasificar_error(e)
+                if tipo == CLAVE_INVALIDA:
                     return None
-                elif "429" in error_str or "QUOTA" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                    logger.warning(f"Cuota excedida en {modelo}. Reintentando/Cambiando...")
-                    await asyncio.sleep(5)
+                espera = router.enfriamiento(modelo)
+                if tipo == CUOTA and espera <= ESPERA_MAX_REINTENTO:
+                    logger.warning(f"Cuota excedida en {modelo}. Reintentando en {espera:.1f}s...")
+                    await asyncio.sleep(espera)
                 else:
-                    logger.error(f"Error en {modelo}: {e}")
+                    if tipo == OTRO:
+                        logger.error(f"Error en {modelo}: {e}")
                     break
     logger.error(f"Fallo total en IA para reto: {titulo}")
 
@@ -98,17 +102,25 @@ async def generar_imagen_noticia(titulo_noticia: str, client, prompt_template: s
     )
 
 
-async def traducir_titulos_ia(noticias: list, client) -> list:
+async def traducir_titulos_ia(noticias: list, client, memoria: MemoriaTraducciones | None = None) -> list:
     if not noticias: return noticias
+    if memoria is None:
+        memoria = abrir_memoria()
 
     modelos = CONFIG.get("AI_MODELS", ["gemini-2.5-flash", "gemini-2.5-pro"])
 
     indices_traducir = []
     lineas = []
+    originales = {}
     for i, n in enumerate(noticias):
         fuente = n.get('fuente', '').lower()
         if any(x in fuente for x in ["wired", "verge", "techcrunch", "github", "openai", "hacker news", "ars", "nvidia", "anthropic", "venturebeat", "mit", "hugging face", "google ai", "deepmind", "dev.to"]):
+            tr = memoria.buscar(n['titulo'])
+            if tr:
+                n['titulo'] = tr
+                continue
             indices_traducir.append(i)
+            originales[i] = n['titulo']
             lineas.append(f"{i}|{n['titulo']}")
 
     if not lineas:
@@ -129,10 +141,10 @@ async def traducir_titulos_ia(noticias: list, client) -> list:
     {{"traducciones": [{{"id": 0, "tr": "Título traducido 0"}}, {{"id": 1, "tr": "Título traducido 1"}}]}}
     """
 
-    for modelo in modelos:
+    for modelo in router_modelos().orden(modelos):
         try:
             logger.info(f"Traduciendo {len(lineas)} títulos con {modelo}...")
-            response = client.models.generate_content(model=modelo, contents=prompt)
+            response = await generar_contenido(client, modelo, prompt)
             raw_text = response.text if response.text else "{}"
 
             clean = re.sub(r'```(?:json)?\s*|\s*```', '', raw_text.strip())
@@ -147,15 +159,13 @@ async def traducir_titulos_ia(noticias: list, client) -> list:
             for i, n in enumerate(noticias):
                 if i in traducciones and traducciones[i] and len(traducciones[i].strip()) > 5:
                     n['titulo'] = traducciones[i]
+                    if i in originales:
+                        memoria.guardar(originales[i], traducciones[i], origen=modelo)
+            memoria.guardar_si_cambio()
 
             return noticias
         except Exception as e:
-            error_str = str(e).upper()
-            if "429" in error_str or "QUOTA" in error_str or "RESOURCE_EXHAUSTED" in error_str:
-                logger.warning(f"Cuota excedida en {modelo} (traducción). Probando siguiente...")
-            elif "404" in error_str or "NOT_FOUND" in error_str:
-                logger.warning(f"Modelo {modelo} no disponible (404) para traducción. Saltando...")
-            else:
+            if clasificar_error(e) == OTRO:
                 logger.error(f"Error traducción batch ({modelo}): {e}")
             continue
 
@@ -0,0 +1,9 @@
+import pytest
+
+from scripts.utils import ai_client
+
+
+@pytest.fixture(autouse=True)
+def _router_limpio(monkeypatch):
+    """Cada test con un router nuevo, sin límites por minuto: los enfriamientos no se arrastran."""
+    monkeypatch.setattr(ai_client, "_router", ai_client.RouterModelos())
@@ -0,0 +1,256 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from scripts.utils import ai_client
+from scripts.utils.ai_client import (
+    CLAVE_INVALIDA, CUOTA, NO_DISPONIBLE, OTRO, CuboTokens, RouterModelos, clasificar_error, generar_contenido,
+    generar_imagenes, router_modelos,
+)
+from scripts.utils.common import resumir_lote_noticias
+from scripts.utils.constants_downloadfile import CONFIG
+
+
+class _Respuesta:
+    def __init__(self, text):
+        self.text = text
+
+
+class _ClienteSincrono:
+    """Como el SDK: ``client.models.generate_content`` bloquea. ``esperas`` y ``errores`` por modelo."""
+
+    def __init__(self, esperas: dict | None = None, errores: dict | None = None):
+        self.models = self
+        self.esperas = esperas or {}
+        self.errores = errores or {}
+        self.hilos: list[str] = []
+        self.llamadas: list[str] = []
+
+    def generate_content(self, model, contents):
+        self.hilos.append(threading.current_thread().name)
+        self.llamadas.append(model)
+        if model in self.errores:
+            raise RuntimeError(self.errores[model])
+        time.sleep(self.esperas.get(model, 0.0))
+        return _Respuesta(f"{model}: {contents}")
+
+    def generate_images(self, model, prompt, config=None):
+        return _Respuesta(f"{model}: {prompt} {config}")
+
+
+class _ModelosAsync:
+    def __init__(self, espera: float):
+        self.espera = espera
+        self.canceladas = 0
+
+    async def generate_content(self, model, contents):
+        try:
+            await asyncio.sleep(self.espera)
+        except asyncio.CancelledError:
+            self.canceladas += 1
+            raise
+        return _Respuesta(f"aio {model}: {contents}")
+
+
+class _ClienteAsync(_ClienteSincrono):
+    """Con interfaz async (``client.aio.models``), como genai.Client."""
+
+    def __init__(self, espera: float = 0.0):
+        super().__init__()
+        self.aio = type("Aio", (), {})()
+        self.aio.models = _ModelosAsync(espera)
+
+
+async def _con_latido(corrutina, periodo: float = 0.01):
+    """Ejecuta la corrutina mientras otra tarea cuenta latidos del loop."""
+    latidos = 0
+
+    async def latir():
+        nonlocal latidos
+        while True:
+            await asyncio.sleep(periodo)
+            latidos += 1
+
+    tarea = asyncio.create_task(latir())
+    try:
+        resultado = await corrutina
+    finally:
+        tarea.cancel()
+    return resultado, latidos
+
+
+class TestGenerarContenido:
+    def test_cliente_sincrono_no_bloquea_el_loop(self):
+        cliente = _ClienteSincrono({"lento": 0.2})
+        respuesta, latidos = asyncio.run(_con_latido(generar_contenido(cliente, "lento", "hola")))
+        assert respuesta.text == "lento: hola"
+        assert latidos >= 10
+        assert cliente.hilos[0].startswith("gemini")
+
+    def test_prefiere_la_interfaz_async(self):
+        cliente = _ClienteAsync()
+        respuesta = asyncio.run(generar_contenido(cliente, "m", "hola"))
+        assert respuesta.text == "aio m: hola"
+        assert cliente.hilos == []
+
+    def test_timeout_cancela_la_llamada_async(self):
+        cliente = _ClienteAsync(espera=5.0)
+        inicio = time.monotonic()
+        with pytest.raises(TimeoutError):
+            asyncio.run(generar_contenido(cliente, "m", "hola", timeout=0.05))
+        assert time.monotonic() - inicio < 1.0
+        assert cliente.aio.models.canceladas == 1
+
+    def test_timeout_en_el_pool(self):
+        with pytest.raises(TimeoutError):
+            asyncio.run(generar_contenido(_ClienteSincrono({"m": 0.3}), "m", "hola", timeout=0.05))
+
+    def test_timeout_por_defecto_de_config(self, monkeypatch):
+        monkeypatch.setitem(CONFIG, "AI_TIMEOUT", 0.05)
+        with pytest.raises(TimeoutError):
+            asyncio.run(generar_contenido(_ClienteAsync(espera=5.0), "m", "hola"))
+
+    def test_cancelar_la_tarea(self):
+        cliente = _ClienteAsync(espera=5.0)
+
+        async def cancelar():
+            tarea = asyncio.create_task(generar_contenido(cliente, "m", "hola"))
+            await asyncio.sleep(0.02)
+            tarea.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await tarea
+
+        asyncio.run(cancelar())
+        assert cliente.aio.models.canceladas == 1
+
+    def test_generar_imagenes(self):
+        respuesta = asyncio.run(generar_imagenes(_ClienteSincrono(), "img", "gato", config={"n": 1}))
+        assert respuesta.text == "img: gato {'n': 1}"
+
+
+class TestHelpers:
+    def test_modelo_que_no_responde_pasa_al_siguiente(self, monkeypatch):
+        monkeypatch.setitem(CONFIG, "AI_TIMEOUT", 0.05)
+        monkeypatch.setitem(CONFIG, "AI_MODELS", ["colgado", "rapido"])
+        cliente = _ClienteSincrono({"colgado": 0.3})
+        intro = asyncio.run(resumir_lote_noticias([{"fuente": "F", "titulo": "T"}], cliente))
+        assert intro.startswith("rapido:")
+
+
+class _Reloj:
+    def __init__(self, ahora: float = 1000.0):
+        self.ahora = ahora
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+class TestClasificarError:
+    @pytest.mark.parametrize("texto, tipo", [
+        ("429 RESOURCE_EXHAUSTED. Quota exceeded", CUOTA),
+        ("400 INVALID_ARGUMENT. API key not valid. [API_KEY_INVALID]", CLAVE_INVALIDA),
+        ("404 NOT_FOUND. models/gemini-9 is not found", NO_DISPONIBLE),
+        ("503 UNAVAILABLE", OTRO),
+    ])
+    def test_tipos(self, texto, tipo):
+        assert clasificar_error(RuntimeError(texto)) == tipo
+
+
+class TestCuboTokens:
+    def test_rafaga_y_ritmo(self):
+        cubo = CuboTokens(2, ahora=0.0)
+        cubo.tomar(0.0)
+        cubo.tomar(0.0)
+        assert cubo.espera(0.0) == pytest.approx(30.0)
+        assert cubo.espera(15.0) == pytest.approx(15.0)
+        assert cubo.espera(30.0) == 0.0
+
+    def test_no_pasa_de_la_capacidad(self):
+        cubo = CuboTokens(2, ahora=0.0)
+        cubo.espera(3600.0)
+        assert cubo.tokens == 2
+
+
+class TestRouter:
+    def test_cuota_enfria_con_la_espera_sugerida(self):
+        reloj = _Reloj()
+        router = RouterModelos(reloj=reloj)
+        assert router.fallo("flash", RuntimeError("429 RESOURCE_EXHAUSTED. Please retry in 12.5s.")) == CUOTA
+        assert router.enfriamiento("flash") == pytest.approx(12.5)
+        assert router.orden(["flash", "pro"]) == ["pro"]
+        reloj.ahora += 13
+        assert router.orden(["flash", "pro"]) == ["flash", "pro"]
+
+    def test_cuota_sin_sugerencia_y_diaria(self):
+        router = RouterModelos(reloj=_Reloj())
+        router.fallo("flash", RuntimeError("429 RESOURCE_EXHAUSTED"))
+        router.fallo("pro", RuntimeError("429 RESOURCE_EXHAUSTED quotaId: GenerateRequestsPerDayPerProjectPerModel"))
+        assert router.enfriamiento("flash") == ai_client.ENFRIAMIENTO_CUOTA
+        assert router.enfriamiento("pro") == ai_client.ENFRIAMIENTO_CUOTA_DIARIA
+
+    def test_otros_errores_no_enfrian(self):
+        router = RouterModelos(reloj=_Reloj())
+        router.fallo("flash", TimeoutError("sin respuesta"))
+        assert router.orden(["flash"]) == ["flash"]
+
+    def test_clave_invalida_para_todos(self):
+        router = RouterModelos(reloj=_Reloj())
+        router.fallo("flash", RuntimeError("API_KEY_INVALID"))
+        assert router.orden(["flash", "pro"]) == []
+
+    def test_primero_los_que_tienen_turno(self):
+        router = RouterModelos(rpm={"flash": 1, "pro": 2}, reloj=_Reloj())
+        assert router.orden(["flash", "pro", "lite"]) == ["flash", "pro", "lite"]
+        asyncio.run(router.turno("flash"))
+        assert router.orden(["flash", "pro", "lite"]) == ["pro", "lite", "flash"]
+
+    def test_turno_espera_al_cubo(self):
+        router = RouterModelos(rpm={"m": 600})
+        router._cubo("m").tokens = 0
+        inicio = time.monotonic()
+        asyncio.run(router.turno("m"))
+        assert 0.08 <= time.monotonic() - inicio < 0.5
+
+    def test_persistencia(self, tmp_path):
+        path = str(tmp_path / "modelos.json")
+        reloj = _Reloj()
+        router = RouterModelos(path=path, reloj=reloj)
+        router.fallo("flash", RuntimeError("429 retry in 30s"))
+        router.fallo("viejo", RuntimeError("404 NOT_FOUND"))
+        reloj.ahora += 10
+        siguiente = RouterModelos(path=path, reloj=reloj)
+        assert siguiente.orden(["flash", "viejo", "pro"]) == ["pro"]
+        assert siguiente.enfriamiento("flash") == pytest.approx(20.0)
+        reloj.ahora += 25
+        assert RouterModelos(path=path, reloj=reloj).orden(["flash", "viejo"]) == ["flash"]
+
+
+class TestRouterEnHelpers:
+    def test_tras_un_429_no_se_vuelve_a_intentar(self, monkeypatch):
+        monkeypatch.setitem(CONFIG, "AI_MODELS", ["flash", "pro"])
+        cliente = _ClienteSincrono(errores={"flash": "429 RESOURCE_EXHAUSTED"})
+        for _ in range(3):
+            intro = asyncio.run(resumir_lote_noticias([{"fuente": "F", "titulo": "T"}], cliente))
+            assert intro.startswith("pro:")
+        assert cliente.llamadas == ["flash", "pro", "pro", "pro"]
+        assert router_modelos().resumen().startswith("4 llamadas, 1 fallidas, 2 saltos")
+
+    def test_clave_invalida_no_llama_mas(self, monkeypatch):
+        monkeypatch.setitem(CONFIG, "AI_MODELS", ["flash", "pro"])
+        cliente = _ClienteSincrono(errores={"flash": "400 INVALID_ARGUMENT. API key not valid. [API_KEY_INVALID]"})
+        with pytest.raises(RuntimeError):
+            asyncio.run(generar_contenido(cliente, "flash", "hola"))
+        with pytest.raises(RuntimeError) as error:
+            asyncio.run(generar_contenido(cliente, "pro", "hola"))
+        assert clasificar_error(error.value) == CLAVE_INVALIDA
+        assert cliente.llamadas == ["flash"]
+
+    def test_llamadas_cuentan_exitos_y_fallos(self):
+        cliente = _ClienteSincrono(errores={"malo": "503 UNAVAILABLE"})
+        asyncio.run(generar_contenido(cliente, "bueno", "hola"))
+        with pytest.raises(RuntimeError):
+            asyncio.run(generar_contenido(cliente, "malo", "hola"))
+        assert router_modelos().exitos == {"bueno": 1}
+        assert router_modelos().fallos == {"malo": 1}
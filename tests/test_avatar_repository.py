@@ -0,0 +1,148 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+from scripts.scrapers.scraper_base import TTL_AVATAR_DIAS, TTL_NEGATIVO_H, AvatarRepository, og_image
+
+HEAD = b'<html><head><meta property="og:image" content="https://yt3.ggpht.com/{n}"></head><body>'
+
+
+class _Contenido:
+    def __init__(self, cuerpo, leidos):
+        self.cuerpo = cuerpo
+        self.leidos = leidos
+
+    async def iter_chunked(self, n):
+        for i in range(0, len(self.cuerpo), n):
+            self.leidos.append(n)
+            await asyncio.sleep(0.01)
+            yield self.cuerpo[i:i + n]
+
+
+class _Respuesta:
+    charset = "utf-8"
+
+    def __init__(self, status, cuerpo, leidos):
+        self.status = status
+        self.content = _Contenido(cuerpo, leidos)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class _Sesion:
+    """Sirve un perfil por canal con un <body> enorme detrás del <head>."""
+
+    def __init__(self, fallan=()):
+        self.urls = []
+        self.leidos = []
+        self.fallan = set(fallan)
+
+    def get(self, url, **kwargs):
+        self.urls.append(url)
+        nombre = url.rstrip("/").rsplit("@", 1)[-1]
+        if nombre in self.fallan:
+            return _Respuesta(404, b"", self.leidos)
+        cuerpo = HEAD.replace(b"{n}", nombre.encode()) + b"x" * 2 * 1024 * 1024
+        return _Respuesta(200, cuerpo, self.leidos)
+
+
+def _repo(tmp_path, avatars=None, meta=None) -> AvatarRepository:
+    cache = tmp_path / "avatars_cache.json"
+    if avatars is not None:
+        cache.write_text(json.dumps(avatars))
+    if meta is not None:
+        (tmp_path / "avatars_meta.json").write_text(json.dumps(meta))
+    return AvatarRepository(str(cache))
+
+
+def _hace(**delta) -> str:
+    return (datetime.now() - timedelta(**delta)).isoformat()
+
+
+class TestOgImage:
+    def test_extrae_meta(self):
+        assert og_image(HEAD.decode().replace("{n}", "a")) == "https://yt3.ggpht.com/a"
+
+    def test_sin_meta(self):
+        assert og_image("<html><head></head></html>") is None
+
+
+class TestEstado:
+    def test_estados(self, tmp_path):
+        repo = _repo(
+            tmp_path,
+            avatars={"Fresco": "u1", "Viejo": "u2", "SinMeta": "u3", "RefrescoFallido": "u4"},
+            meta={
+                "Fresco": {"ts": _hace(days=1), "ok": True},
+                "Viejo": {"ts": _hace(days=TTL_AVATAR_DIAS + 1), "ok": True},
+                "RefrescoFallido": {"ts": _hace(hours=1), "ok": False},
+                "Roto": {"ts": _hace(hours=1), "ok": False},
+                "RotoAntiguo": {"ts": _hace(hours=TTL_NEGATIVO_H + 1), "ok": False},
+            },
+        )
+        ahora = datetime.now()
+        assert repo._estado("Fresco", ahora) == "fresco"
+        assert repo._estado("Viejo", ahora) == "caducado"
+        assert repo._estado("SinMeta", ahora) == "caducado"
+        assert repo._estado("RefrescoFallido", ahora) == "fresco"
+        assert repo._estado("Roto", ahora) == "negativo"
+        assert repo._estado("RotoAntiguo", ahora) == "falta"
+        assert repo._estado("Nuevo", ahora) == "falta"
+
+    def test_negativo_no_repite_peticion(self, tmp_path, monkeypatch):
+        llamadas = []
+        monkeypatch.setattr("scripts.scrapers.scraper_base.requests.get", lambda *a, **k: llamadas.append(a))
+        repo = _repo(tmp_path, meta={"Roto": {"ts": _hace(hours=1), "ok": False}})
+        assert "ui-avatars.com" in repo.obtener_avatar("Roto", "https://www.youtube.com/@Roto/videos")
+        assert llamadas == []
+
+
+class TestPrefetch:
+    def test_descarga_los_que_faltan_leyendo_solo_el_head(self, tmp_path):
+        repo = _repo(tmp_path)
+        sesion = _Sesion(fallan={"roto"})
+        canales = {n: f"https://www.youtube.com/@{n}/videos" for n in ("a", "b", "roto")}
+        asyncio.run(repo.prefetch(sesion, canales))
+        assert repo.avatars == {"a": "https://yt3.ggpht.com/a", "b": "https://yt3.ggpht.com/b"}
+        assert sesion.urls[0] == "https://www.youtube.com/@a"
+        assert len(sesion.leidos) == 2  # un trozo por canal: el <head> cabe en el primero
+        assert repo.meta["roto"]["ok"] is False
+
+        repo.guardar_si_cambio()
+        recargado = _repo(tmp_path)
+        assert recargado.avatars == repo.avatars
+        assert recargado._estado("roto", datetime.now()) == "negativo"
+
+    def test_caducados_se_refrescan_en_segundo_plano(self, tmp_path):
+        repo = _repo(
+            tmp_path,
+            avatars={"a": "viejo", "b": "bueno"},
+            meta={"a": {"ts": _hace(days=TTL_AVATAR_DIAS + 1), "ok": True}, "b": {"ts": _hace(days=1), "ok": True}},
+        )
+        sesion = _Sesion()
+
+        async def _run():
+            await repo.prefetch(sesion, {n: f"https://www.youtube.com/@{n}" for n in ("a", "b")})
+            antes = repo.avatars["a"]
+            await repo.esperar_refrescos()
+            return antes
+
+        assert asyncio.run(_run()) == "viejo"
+        assert repo.avatars["a"] == "https://yt3.ggpht.com/a"
+        assert sesion.urls == ["https://www.youtube.com/@a"]
+
+    def test_refresco_fallido_conserva_avatar(self, tmp_path):
+        repo = _repo(tmp_path, avatars={"roto": "viejo"}, meta={"roto": {"ts": _hace(days=TTL_AVATAR_DIAS + 1), "ok": True}})
+
+        async def _run():
+            await repo.prefetch(_Sesion(fallan={"roto"}), {"roto": "https://www.youtube.com/@roto"})
+            await repo.esperar_refrescos()
+
+        asyncio.run(_run())
+        assert repo.avatars["roto"] == "viejo"
+        assert repo._estado("roto", datetime.now()) == "fresco"
+        assert repo._estado("roto", datetime.now() + timedelta(hours=TTL_NEGATIVO_H + 1)) == "caducado"
@@ -0,0 +1,93 @@
+import asyncio
+
+from scripts.scrapers.browser_pool import BrowserPool, debe_bloquear
+
+
+class _Pagina:
+    def __init__(self, estado):
+        self.estado = estado
+
+    async def goto(self, url, **kwargs):
+        self.estado["activas"] += 1
+        self.estado["max_activas"] = max(self.estado["max_activas"], self.estado["activas"])
+        self.url = url
+        await asyncio.sleep(0.01)
+
+    async def wait_for_selector(self, selector, **kwargs):
+        pass
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def close(self):
+        self.estado["activas"] -= 1
+
+
+class _Contexto:
+    def __init__(self, estado):
+        self.estado = estado
+
+    async def route(self, patron, handler):
+        self.estado["rutas"].append(patron)
+
+    async def new_page(self):
+        return _Pagina(self.estado)
+
+    async def close(self):
+        self.estado["contextos_cerrados"] += 1
+
+
+class _Navegador:
+    def __init__(self, estado):
+        self.estado = estado
+
+    async def new_context(self, **kwargs):
+        self.estado["contextos"] += 1
+        return _Contexto(self.estado)
+
+    async def close(self):
+        pass
+
+
+class _PoolFalso(BrowserPool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estado = {"contextos": 0, "contextos_cerrados": 0, "activas": 0, "max_activas": 0, "rutas": [], "lanzamientos": 0}
+
+    async def _lanzar(self):
+        self.estado["lanzamientos"] += 1
+        return _Navegador(self.estado)
+
+
+class _PoolSinChromium(BrowserPool):
+    async def _lanzar(self):
+        raise RuntimeError("Executable doesn't exist")
+
+
+def test_bloquea_recursos_pesados():
+    assert debe_bloquear("image") and debe_bloquear("font") and debe_bloquear("media")
+    assert not debe_bloquear("document") and not debe_bloquear("script")
+
+
+def test_reutiliza_navegador_y_contextos():
+    async def main():
+        pool = _PoolFalso(contextos=2, paginas=3)
+        htmls = await asyncio.gather(*(pool.renderizar(f"https://spa.dev/{i}", "h2 a") for i in range(10)))
+        await pool.cerrar()
+        return pool, htmls
+
+    pool, htmls = asyncio.run(main())
+    assert htmls[3] == "<html>https://spa.dev/3</html>"
+    assert pool.estado["lanzamientos"] == 1
+    assert pool.estado["contextos"] == 2 and pool.estado["contextos_cerrados"] == 2
+    assert pool.estado["rutas"] == ["**/*", "**/*"]
+    assert 1 < pool.estado["max_activas"] <= 3
+    assert pool.renderizadas == 10
+
+
+def test_sin_chromium_devuelve_none():
+    async def main():
+        pool = _PoolSinChromium()
+        return await pool.renderizar("https://spa.dev/"), pool.disponible
+
+    assert asyncio.run(main()) == (None, False)
@@ -1,6 +1,10 @@
 import tempfile, os, json
 from datetime import datetime, timedelta
-from scripts.utils.cache import FileCache, CacheManager, _default_key
+import pytest
+import requests
+
+from scripts.utils.cache import FileCache, CacheManager, N8nCache, SQLiteCache, _default_key, abrir_cache
+from scripts.utils.cache_server import ServidorCacheLocal
 
 
 class TestDefaultKey:
@@ -141,3 +145,258 @@ class TestCacheManager:
             cm.flush()
             # Without TTL, all entries kept
             assert cm.size() == 2
+
+    def test_url_keys_are_canonical(self):
+        with tempfile.TemporaryDirectory() as d:
+            cm = CacheManager(FileCache(os.path.join(d, "cache.json")))
+            cm.mark_sent("https://www.blog.dev/post/?utm_source=rss")
+            assert not cm.is_new("http://blog.dev/post")
+            assert not cm.is_new({"enlace": "https://m.blog.dev/post#comentarios"})
+
+    def test_migrates_legacy_keys_on_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "cache.json")
+            with open(path, "w") as f:
+                json.dump({"https://www.blog.dev/post?utm_source=rss": {"ts": 1}, "k1": {"ts": 2}}, f)
+            cm = CacheManager(FileCache(path))
+            assert not cm.is_new("https://blog.dev/post")
+            assert not cm.is_new("k1")
+            cm.flush()
+            with open(path) as f:
+                assert set(json.load(f)) == {"https://blog.dev/post", "k1"}
+
+
+class TestSQLiteCache:
+    def test_mark_sent_is_written_immediately(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "cache.db")
+            cm = CacheManager(SQLiteCache(path))
+            cm.mark_sent("https://blog.dev/post")
+            # Sin flush: otra conexión ya lo ve
+            assert not CacheManager(SQLiteCache(path)).is_new("https://blog.dev/post?utm_source=rss")
+            assert cm.size() == 1
+            assert cm._data is None
+
+    def test_flush_expires_by_ts(self):
+        with tempfile.TemporaryDirectory() as d:
+            backend = SQLiteCache(os.path.join(d, "cache.db"))
+            cm = CacheManager(backend, ttl_hours=1)
+            cm.mark_sent("fresh_key")
+            backend.poner("old_key", {"ts": (datetime.now() - timedelta(hours=2)).timestamp()})
+            backend.poner("sin_ts", {"otro": 1})
+            assert cm.is_new("old_key")
+            assert cm.size() == 3
+            cm.flush()
+            assert cm.size() == 2
+            assert not cm.is_new("fresh_key")
+            assert not cm.is_new("sin_ts")
+
+    def test_without_ttl_keeps_all(self):
+        with tempfile.TemporaryDirectory() as d:
+            backend = SQLiteCache(os.path.join(d, "cache.db"))
+            cm = CacheManager(backend)
+            backend.poner("old_entry", {"ts": 0})
+            cm.flush()
+            assert not cm.is_new("old_entry")
+
+    def test_migrates_file_cache_once(self):
+        with tempfile.TemporaryDirectory() as d:
+            legacy = os.path.join(d, "cache.json")
+            with open(legacy, "w") as f:
+                json.dump({"https://www.blog.dev/post?utm_source=rss": {"ts": 1}, "k1": {"ts": 2}}, f)
+            cm = CacheManager(SQLiteCache(os.path.join(d, "cache.db"), json_legacy=legacy))
+            assert not cm.is_new("https://blog.dev/post")
+            assert not cm.is_new("k1")
+            cm.clear()
+            # Ya existe la base de datos: el JSON no se vuelve a importar
+            with open(legacy, "w") as f:
+                json.dump({"k2": {"ts": 3}}, f)
+            assert CacheManager(SQLiteCache(os.path.join(d, "cache.db"), json_legacy=legacy)).size() == 0
+
+    def test_abrir_cache_backends(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "sent.json")
+            cm = abrir_cache(path, ttl_hours=1, backend="sqlite")
+            assert isinstance(cm.backend, SQLiteCache)
+            assert cm.backend.path == os.path.join(d, "sent.db")
+            assert isinstance(abrir_cache(path, backend="json").backend, FileCache)
+
+
+class TestBulkApis:
+    def _managers(self, d):
+        yield CacheManager(FileCache(os.path.join(d, "cache.json")), ttl_hours=1)
+        yield CacheManager(SQLiteCache(os.path.join(d, "cache.db")), ttl_hours=1)
+
+    def test_filter_new_keeps_order(self):
+        with tempfile.TemporaryDirectory() as d:
+            for cm in self._managers(d):
+                cm.mark_sent_many(["https://blog.dev/2", {"enlace": "https://blog.dev/4"}])
+                items = [{"enlace": f"https://www.blog.dev/{i}?utm_source=rss"} for i in range(6)]
+                nuevos = cm.filter_new(items)
+                assert [n["enlace"] for n in nuevos] == [items[i]["enlace"] for i in (0, 1, 3, 5)]
+                assert cm.is_new_many(["https://blog.dev/2", "otra"]) == [False, True]
+
+    def test_bulk_respects_ttl(self):
+        with tempfile.TemporaryDirectory() as d:
+            for cm in self._managers(d):
+                viejo = {"ts": (datetime.now() - timedelta(hours=2)).timestamp()}
+                if cm.backend.incremental:
+                    cm.backend.poner("old_key", viejo)
+                else:
+                    cm.is_new("x")
+                    cm._data["old_key"] = viejo
+                cm.mark_sent("fresh_key")
+                assert cm.filter_new(["old_key", "fresh_key"]) == ["old_key"]
+
+    def test_sqlite_many_keys_in_batches(self):
+        with tempfile.TemporaryDirectory() as d:
+            cm = CacheManager(SQLiteCache(os.path.join(d, "cache.db")))
+            cm.mark_sent_many([f"k{i}" for i in range(1200)])
+            assert cm.size() == 1200
+            assert sum(cm.is_new_many([f"k{i}" for i in range(1500)])) == 300
+
+
+class TestExpiryHeap:
+    def test_timestamps_normalized_on_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "cache.json")
+            with open(path, "w") as f:
+                json.dump({"a": {"ts": 5}, "b": {"ts": "7.5"}, "c": {"otro": 1}}, f)
+            cm = CacheManager(FileCache(path), ttl_hours=1)
+            cm.size()
+            assert cm._data["a"]["ts"] == 5.0 and isinstance(cm._data["a"]["ts"], float)
+            assert cm._data["b"]["ts"] == 7.5
+            assert sorted(cm._data.monticulo) == [(5.0, "a"), (7.5, "b")]
+
+    def test_flush_pops_only_expired(self):
+        with tempfile.TemporaryDirectory() as d:
+            cm = CacheManager(FileCache(os.path.join(d, "cache.json")), ttl_hours=1)
+            ahora = datetime.now().timestamp()
+            cm.is_new("x")
+            for i in range(100):
+                cm._data[f"k{i}"] = {"ts": ahora - (7200 if i < 10 else 60)}
+            cm.flush()
+            assert cm.size() == 90
+            assert len(cm._data.monticulo) == 90
+
+    def test_overwritten_key_not_evicted_by_stale_heap_entry(self):
+        with tempfile.TemporaryDirectory() as d:
+            cm = CacheManager(FileCache(os.path.join(d, "cache.json")), ttl_hours=1)
+            cm.is_new("x")
+            cm._data["k"] = {"ts": (datetime.now() - timedelta(hours=2)).timestamp()}
+            cm.mark_sent("k")
+            cm.flush()
+            assert not cm.is_new("k")
+
+
+@pytest.fixture
+def servidor():
+    with ServidorCacheLocal() as s:
+        yield s
+
+
+def _n8n(servidor, d=None, **kw):
+    copia = os.path.join(d, "sent.n8n.json") if d else None
+    return N8nCache(servidor.url("sent"), copia_local=copia, backoff=0.01, **kw)
+
+
+class TestN8nCache:
+    def test_round_trip_sends_only_deltas(self, servidor):
+        cm = CacheManager(_n8n(servidor))
+        cm.mark_sent_many([f"k{i}" for i in range(50)])
+        cm.flush()
+        assert len(servidor.datos("sent")) == 50
+
+        backend = _n8n(servidor)
+        cm2 = CacheManager(backend)
+        assert not cm2.is_new("k7")
+        cm2.mark_sent("nuevo")
+        cm2.flush()
+        cuerpo = backend.bytes_enviados
+        assert cuerpo < 100  # solo "nuevo", no las 51 claves
+        cm2.flush()
+        assert backend.bytes_enviados == cuerpo  # sin cambios no hay PATCH
+        assert "nuevo" in servidor.datos("sent")
+
+    def test_batches_and_deletes(self, servidor):
+        cm = CacheManager(_n8n(servidor, lote=10), ttl_hours=1)
+        ahora = datetime.now().timestamp()
+        cm.is_new("x")
+        for i in range(25):
+            cm._data[f"k{i}"] = {"ts": ahora - (7200 if i < 5 else 0)}
+        cm.flush()
+        assert servidor.peticiones["PATCH"] == 2  # 20 claves vigentes en lotes de 10
+        assert len(servidor.datos("sent")) == 20
+        del cm._data["k10"]
+        cm.flush()
+        assert "k10" not in servidor.datos("sent")
+
+    def test_conditional_get_uses_local_copy(self, servidor):
+        with tempfile.TemporaryDirectory() as d:
+            cm = CacheManager(_n8n(servidor, d))
+            cm.mark_sent("k1")
+            cm.flush()
+            cm2 = CacheManager(_n8n(servidor, d))
+            assert not cm2.is_new("k1")
+            assert servidor.peticiones["GET"] == 2
+            # La 2ª carga fue un 304: la copia local tiene el ETag del último PATCH
+            with open(os.path.join(d, "sent.n8n.json")) as f:
+                assert json.load(f)["etag"] == servidor.etag("sent")
+
+    def test_concurrent_writer_invalidates_local_copy(self, servidor):
+        with tempfile.TemporaryDirectory() as d:
+            a = CacheManager(_n8n(servidor, d))
+            b = CacheManager(N8nCache(servidor.url("sent"), backoff=0.01))
+            a.is_new("x")
+            b.mark_sent("de_b")
+            b.flush()
+            a.mark_sent("de_a")
+            a.flush()
+            # La copia de "a" no incluye "de_b": la siguiente carga es completa
+            c = CacheManager(_n8n(servidor, d))
+            assert not c.is_new("de_b") and not c.is_new("de_a")
+
+    def test_restart_does_not_reuse_etags(self):
+        with tempfile.TemporaryDirectory() as d:
+            datos = os.path.join(d, "servidor.json")
+            with ServidorCacheLocal(path_datos=datos) as servidor:
+                a = CacheManager(_n8n(servidor, d))
+                a.mark_sent("de_a")
+                a.flush()
+            # Tras el reinicio las versiones vuelven a empezar: un PATCH de "b" deja la versión 1 otra vez
+            with ServidorCacheLocal(path_datos=datos) as servidor:
+                b = CacheManager(N8nCache(servidor.url("sent"), backoff=0.01))
+                b.mark_sent("de_b")
+                b.flush()
+                c = CacheManager(_n8n(servidor, d))
+                assert not c.is_new("de_b") and not c.is_new("de_a")
+
+    def test_retries_with_backoff(self, servidor):
+        servidor.fallar(2)
+        cm = CacheManager(_n8n(servidor))
+        cm.mark_sent("k1")
+        cm.flush()
+        assert servidor.peticiones["GET"] == 3
+        assert "k1" in servidor.datos("sent")
+
+    def test_unreachable_falls_back_to_local_copy(self, servidor):
+        with tempfile.TemporaryDirectory() as d:
+            cm = CacheManager(_n8n(servidor, d))
+            cm.mark_sent("k1")
+            cm.flush()
+            caido = N8nCache("http://127.0.0.1:9/sent", copia_local=os.path.join(d, "sent.n8n.json"),
+                             reintentos=0, timeout=1)
+            assert not CacheManager(caido).is_new("k1")
+            caido.load()["k2"] = {"ts": 1.0}
+            with pytest.raises(requests.RequestException):
+                caido.save(caido.load())
+
+    def test_abrir_cache_n8n(self, monkeypatch):
+        from scripts.utils import cache as cache_mod
+        with tempfile.TemporaryDirectory() as d:
+            monkeypatch.setitem(cache_mod.CONFIG, "N8N_CACHE_URL", "http://n8n.local/cache/")
+            cm = abrir_cache(os.path.join(d, "telegram_sent.json"), backend="n8n")
+            assert cm.backend.webhook_url == "http://n8n.local/cache/telegram_sent"
+            monkeypatch.setitem(cache_mod.CONFIG, "N8N_CACHE_URL", None)
+            with pytest.raises(ValueError):
+                abrir_cache(os.path.join(d, "telegram_sent.json"), backend="n8n")
@@ -0,0 +1,77 @@
+import pytest
+
+from scripts.scrapers.scrape_eixam import _url_real
+from scripts.utils.canonical_url import canonicalizar_url, url_destino
+
+VIDEO = "https://youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+class TestHosts:
+    @pytest.mark.parametrize("url", [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "http://m.youtube.com/watch?v=dQw4w9WgXcQ&si=abc123&feature=share",
+        "https://youtu.be/dQw4w9WgXcQ?t=42",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube.com/embed/dQw4w9WgXcQ",
+    ])
+    def test_youtube(self, url):
+        assert canonicalizar_url(url) == VIDEO
+
+    def test_youtube_conserva_mayusculas_del_id(self):
+        assert canonicalizar_url("https://youtu.be/AbCdEfGhIjK") != canonicalizar_url("https://youtu.be/abcdefghijk")
+
+    def test_canal_youtube(self):
+        assert canonicalizar_url("https://www.youtube.com/@Midudev/videos/") == "https://youtube.com/@midudev/videos"
+
+    @pytest.mark.parametrize("url", [
+        "https://github.com/Owner/Repo",
+        "https://github.com/owner/repo.git",
+        "https://github.com/owner/repo/tree/main/",
+        "http://www.github.com/owner/repo?tab=readme-ov-file#readme",
+    ])
+    def test_github_repo(self, url):
+        assert canonicalizar_url(url) == "https://github.com/owner/repo"
+
+    def test_github_subruta(self):
+        assert canonicalizar_url("https://github.com/owner/repo/blob/main/README.md").endswith("/blob/main/readme.md")
+
+    def test_msn_regional_y_categoria(self):
+        a = "https://www.msn.com/es-us/entretenimiento/cine/eixam/vi-AA1xYz9"
+        b = "https://www.msn.com/es-mx/noticias/otros/vi-AA1xYz9?ocid=BingNewsSerp"
+        assert canonicalizar_url(a) == canonicalizar_url(b) == "https://msn.com/vi-aa1xyz9"
+
+    def test_pliega_www_m_y_amp(self):
+        assert canonicalizar_url("https://m.elpais.com/tec/x.html") == canonicalizar_url("https://www.elpais.com/tec/x.html/amp")
+
+
+class TestQuery:
+    def test_quita_tracking(self):
+        url = "https://blog.dev/post?utm_source=rss&utm_medium=feed&ref=hn&fbclid=xyz"
+        assert canonicalizar_url(url) == "https://blog.dev/post"
+
+    def test_conserva_ids(self):
+        assert canonicalizar_url("https://news.ycombinator.com/item?id=123&utm_source=x") == "https://news.ycombinator.com/item?id=123"
+        assert canonicalizar_url("https://blog.dev/?p=42&ref=rss") == "https://blog.dev?p=42"
+        assert canonicalizar_url("https://blog.dev/?p=42") != canonicalizar_url("https://blog.dev/?p=43")
+
+
+class TestRedirecciones:
+    def test_bing_apiclick(self):
+        url = "https://www.bing.com/news/apiclick.aspx?ref=FexRss&url=https%3a%2f%2fwww.msn.com%2fes-us%2fcine%2fvi-AA1xYz9&c=1"
+        assert url_destino(url) == "https://www.msn.com/es-us/cine/vi-AA1xYz9"
+        assert canonicalizar_url(url) == "https://msn.com/vi-aa1xyz9"
+
+    def test_eixam_url_real_sigue_siendo_enlace(self):
+        url = "https://www.bing.com/news/apiclick.aspx?url=https%3a%2f%2fwww.msn.com%2fes-ve%2fnoticias%2fid-BB1abc&c=1"
+        assert _url_real(url) == "https://www.msn.com/id-BB1abc"
+
+    def test_sin_host(self):
+        assert canonicalizar_url("") == ""
+        assert canonicalizar_url("/Ruta/Relativa/") == "/ruta/relativa"
+
+
+def test_memoizada():
+    canonicalizar_url.cache_clear()
+    canonicalizar_url("https://blog.dev/memo")
+    canonicalizar_url("https://blog.dev/memo")
+    assert canonicalizar_url.cache_info().hits == 1
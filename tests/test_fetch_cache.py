@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+from scripts.scrapers.fetch_cache import FetchCache, hash_contenido
+
+
+class TestFetchCache:
+    def test_sin_validadores_no_hay_cabeceras(self):
+        with tempfile.TemporaryDirectory() as d:
+            c = FetchCache(os.path.join(d, "fetch.json"))
+            assert c.cabeceras("https://a.com/feed") == {}
+
+    def test_primera_respuesta_es_miss(self):
+        with tempfile.TemporaryDirectory() as d:
+            c = FetchCache(os.path.join(d, "fetch.json"))
+            assert c.registrar_respuesta("https://a.com", {"ETag": '"v1"'}, b"hola")
+            assert c.misses == 1
+            assert c.cabeceras("https://a.com") == {"If-None-Match": '"v1"'}
+
+    def test_mismo_hash_es_hit(self):
+        with tempfile.TemporaryDirectory() as d:
+            c = FetchCache(os.path.join(d, "fetch.json"))
+            c.registrar_respuesta("https://a.com", {}, b"hola")
+            assert not c.registrar_respuesta("https://a.com", {}, b"hola")
+            assert c.hits_hash == 1
+
+    def test_304_cuenta_como_hit(self):
+        with tempfile.TemporaryDirectory() as d:
+            c = FetchCache(os.path.join(d, "fetch.json"))
+            c.registrar_no_modificado("https://a.com")
+            assert c.hits == 1
+
+    def test_persistencia(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "fetch.json")
+            c = FetchCache(path)
+            c.registrar_respuesta("https://a.com", {"Last-Modified": "Sat, 01 Jan 2026 00:00:00 GMT"}, "x")
+            c.guardar_si_cambio()
+            c2 = FetchCache(path)
+            assert c2.cabeceras("https://a.com") == {"If-Modified-Since": "Sat, 01 Jan 2026 00:00:00 GMT"}
+            assert not c2.registrar_respuesta("https://a.com", {}, "x")
+
+    def test_hash_str_y_bytes_coinciden(self):
+        assert hash_contenido("ñ") == hash_contenido("ñ".encode("utf-8"))
@@ -1,10 +1,13 @@
+import asyncio
+import json
 from pathlib import Path
 from io import BytesIO
 from PIL import Image
 
+from scripts.tools import fix_images
 from scripts.tools.fix_images import (
     compute_ssim, _channel_stats, strip_metadata, constrain_size,
-    clean_query, slugify, build_srcset, generate_placeholder,
+    clean_query, slugify, build_srcset, generate_placeholder, ImageCache,
 )
 
 SIZES = [480, 768, 1200]
@@ -108,3 +111,92 @@ class TestGeneratePlaceholder:
         placeholder = generate_placeholder(img)
         assert isinstance(placeholder, str)
         assert len(placeholder) > 20
+
+
+class TestImageCache:
+    def test_buffers_until_flush(self, tmp_path):
+        path = tmp_path / "image_cache.json"
+        cache = ImageCache(path)
+        for i in range(10):
+            cache[f"query {i}"] = {"id": i}
+        assert not path.exists()
+        cache.flush()
+        cache.flush()
+        assert cache.writes == 1
+        assert len(json.loads(path.read_text(encoding="utf-8"))) == 10
+        assert not (tmp_path / "image_cache.json.tmp").exists()
+
+    def test_flushes_on_threshold(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fix_images, "FLUSH_EVERY", 5)
+        cache = ImageCache(tmp_path / "image_cache.json")
+        for i in range(12):
+            cache[f"query {i}"] = {"id": i}
+        assert cache.writes == 2 and cache.dirty == 2
+
+    def test_flushes_on_interval(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fix_images, "FLUSH_INTERVAL", 0.0)
+        cache = ImageCache(tmp_path / "image_cache.json")
+        cache["query"] = {"id": 1}
+        assert cache.writes == 1 and cache.dirty == 0
+
+    def test_concurrent_tasks_single_write(self, tmp_path):
+        cache = ImageCache(tmp_path / "image_cache.json")
+
+        async def lookup(i):
+            await asyncio.sleep(0)
+            cache[f"query {i}"] = None if i % 2 else {"id": i}
+
+        async def run():
+            await asyncio.gather(*(lookup(i) for i in range(40)))
+            cache.flush()
+
+        asyncio.run(run())
+        assert cache.writes == 1 and len(cache) == 40
+        # Las negativas se quedan en memoria; al disco solo llegan las válidas
+        assert len(json.loads((tmp_path / "image_cache.json").read_text(encoding="utf-8"))) == 20
+
+    def test_load_prunes(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(fix_images, "MAX_CACHE_ENTRIES", 3)
+        path = tmp_path / "image_cache.json"
+        data = {f"q{i}": {"updated_at": f"2026-01-0{i + 1}"} for i in range(5)}
+        data["old"] = {"created_at": "2000-01-01T00:00:00Z"}
+        path.write_text(json.dumps(data), encoding="utf-8")
+        cache = ImageCache.load(path)
+        assert sorted(cache) == ["q2", "q3", "q4"]
+
+
+class TestGeminiTechContext:
+    def test_no_bloquea_el_loop(self, tmp_path, monkeypatch):
+        import time
+        from google import genai
+
+        class _Cliente:
+            """Como el SDK: generate_content bloquea."""
+
+            def __init__(self, api_key):
+                self.models = self
+
+            def generate_content(self, model, contents):
+                time.sleep(0.2)
+                return type("R", (), {"text": '{"tech_stack": "PYTHON"}'})()
+
+        monkeypatch.setattr(fix_images, "GEMINI_KEY", "clave")
+        monkeypatch.setattr(fix_images, "cache", ImageCache(tmp_path / "image_cache.json"))
+        monkeypatch.setattr(genai, "Client", _Cliente)
+        latidos = 0
+
+        async def latir():
+            nonlocal latidos
+            while True:
+                await asyncio.sleep(0.01)
+                latidos += 1
+
+        async def run():
+            tarea = asyncio.create_task(latir())
+            try:
+                return await fix_images.get_gemini_tech_context("Python 3.14", "texto", ["python"])
+            finally:
+                tarea.cancel()
+
+        assert asyncio.run(run()) == {"tech_stack": "PYTHON"}
+        assert latidos >= 10
@@ -0,0 +1,185 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from scripts.utils.history_store import SegmentedHistoryStore, SQLiteHistoryStore, abrir_historico
+
+AHORA = datetime(2026, 6, 1, 12, 0)
+
+
+def _item(i: int, horas: int = 0, **extra) -> dict:
+    item = {
+        "titulo": f"Noticia {i}",
+        "enlace": f"https://blog.dev/{i}",
+        "fuente": "Blog",
+        "categoria": "💻 Programación",
+        "ts": (AHORA - timedelta(hours=horas)).isoformat(),
+    }
+    item.update(extra)
+    return item
+
+
+@pytest.fixture(params=["segmentos", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        s = SQLiteHistoryStore(str(tmp_path / "noticias.db"))
+    else:
+        s = SegmentedHistoryStore(str(tmp_path / "historico"))
+    yield s
+    s.cerrar()
+
+
+class TestConsultas:
+    def test_orden_como_la_lista_json(self, store):
+        store.insertar([_item(2), _item(1)])
+        store.insertar([_item(4), _item(3)])
+        assert [i["titulo"] for i in store.todos()] == ["Noticia 4", "Noticia 3", "Noticia 2", "Noticia 1"]
+        assert [i["titulo"] for i in store.ultimos(2)] == ["Noticia 4", "Noticia 3"]
+
+    def test_existe(self, store):
+        store.insertar([_item(1), _item(2, id_video="abcdefghijk", enlace="")])
+        assert store.existe(enlace="https://blog.dev/1")
+        assert store.existe(id_video="abcdefghijk")
+        assert not store.existe(enlace="https://blog.dev/9", id_video="zzzzzzzzzzz")
+        assert not store.existe()
+
+    def test_desde(self, store):
+        store.insertar([_item(1, horas=1), _item(2, horas=30), _item(3, ts="")])
+        corte = AHORA - timedelta(hours=24)
+        assert [i["titulo"] for i in store.desde(corte)] == ["Noticia 1"]
+        assert {i["titulo"] for i in store.desde(corte, incluir_sin_fecha=True)} == {"Noticia 1", "Noticia 3"}
+
+    def test_desde_ignora_zona_utc(self, store):
+        store.insertar([_item(1, ts="2026-06-01T11:00:00Z")])
+        assert len(store.desde(AHORA - timedelta(hours=2))) == 1
+
+    def test_videos(self, store):
+        store.insertar([_item(1, id_video="abcdefghijk"), _item(2)])
+        assert [i["titulo"] for i in store.ultimos(videos=True)] == ["Noticia 1"]
+        assert [i["titulo"] for i in store.ultimos(videos=False)] == ["Noticia 2"]
+
+
+class TestEscritura:
+    def test_actualizar_traducido(self, store):
+        store.insertar([_item(1), _item(2, traducido=True)])
+        pendientes = store.sin_traducir()
+        assert [i["titulo"] for i in pendientes] == ["Noticia 1"]
+        pendientes[0].update(titulo="Noticia uno", traducido=True)
+        store.actualizar(pendientes)
+        assert store.sin_traducir() == []
+        assert store.todos()[0]["titulo"] == "Noticia uno"
+
+    def test_eliminar_y_recortar(self, store):
+        store.insertar([_item(i) for i in range(5, 0, -1)])
+        store.eliminar(["https://blog.dev/5", ""])
+        assert store.contar() == 4
+        store.recortar(2)
+        assert [i["titulo"] for i in store.todos()] == ["Noticia 4", "Noticia 3"]
+
+
+class TestJson:
+    def test_importa_json_la_primera_vez(self, tmp_path):
+        (tmp_path / "noticias_historico.json").write_text(json.dumps([_item(2), _item(1)]), encoding="utf-8")
+        with abrir_historico(folder=str(tmp_path)) as store:
+            assert [i["titulo"] for i in store.todos()] == ["Noticia 2", "Noticia 1"]
+            store.insertar([_item(3)])
+        # Ya existe la base de datos: el JSON no se vuelve a importar
+        with abrir_historico(folder=str(tmp_path)) as store:
+            assert store.contar() == 3
+
+    def test_exportar_ida_y_vuelta(self, store, tmp_path):
+        items = [_item(2, traducido=True), _item(1, id_video="abcdefghijk")]
+        store.insertar(items)
+        salida = tmp_path / "export.json"
+        store.exportar_json(str(salida))
+        assert json.loads(salida.read_text(encoding="utf-8")) == items
+
+    def test_backend_desconocido(self, tmp_path):
+        with pytest.raises(ValueError):
+            abrir_historico(folder=str(tmp_path), backend="redis")
+
+
+class TestSegmentos:
+    def _store(self, tmp_path) -> SegmentedHistoryStore:
+        return SegmentedHistoryStore(str(tmp_path / "historico"))
+
+    def test_insertar_solo_anade_al_segmento_del_dia(self, tmp_path):
+        store = self._store(tmp_path)
+        store.insertar([_item(1, horas=48)])
+        antiguo = (tmp_path / "historico" / "2026-05-30.jsonl").read_text(encoding="utf-8")
+        store.insertar([_item(3), _item(2)])
+        hoy = tmp_path / "historico" / "2026-06-01.jsonl"
+        assert [json.loads(l)["titulo"] for l in hoy.read_text(encoding="utf-8").splitlines()] == ["Noticia 2", "Noticia 3"]
+        assert (tmp_path / "historico" / "2026-05-30.jsonl").read_text(encoding="utf-8") == antiguo
+        assert store.segmentos["2026-06-01"]["items"] == 2
+
+    def test_desde_abre_solo_segmentos_solapados(self, tmp_path, monkeypatch):
+        store = self._store(tmp_path)
+        store.insertar([_item(i, horas=24 * i) for i in range(5)])
+        leidos = []
+        original = store._leer
+        monkeypatch.setattr(store, "_leer", lambda seg: leidos.append(seg) or original(seg))
+        assert [i["titulo"] for i in store.desde(AHORA - timedelta(hours=30))] == ["Noticia 0", "Noticia 1"]
+        assert leidos == ["2026-06-01", "2026-05-31"]
+
+    def test_sin_traducir_salta_segmentos_traducidos(self, tmp_path, monkeypatch):
+        store = self._store(tmp_path)
+        store.insertar([_item(1), _item(2, horas=48, traducido=True)])
+        leidos = []
+        original = store._leer
+        monkeypatch.setattr(store, "_leer", lambda seg: leidos.append(seg) or original(seg))
+        assert [i["titulo"] for i in store.sin_traducir()] == ["Noticia 1"]
+        assert leidos == ["2026-06-01"]
+
+    def test_compactar_por_meses(self, tmp_path):
+        store = self._store(tmp_path)
+        items = [_item(i, horas=24 * i) for i in range(40)]
+        store.insertar(items)
+        unidos = store.compactar(dias=14, ahora=AHORA)
+        assert unidos == 25  # 2026-04-23 … 2026-05-17
+        assert {"2026-04", "2026-05"} <= set(store.segmentos)
+        assert "2026-05-10" not in store.segmentos and "2026-05-20" in store.segmentos
+        assert store.todos() == items
+        # Una segunda pasada añade al mes ya compactado sin desordenar
+        store.compactar(dias=2, ahora=AHORA)
+        assert store.todos() == items
+        assert store.existe(enlace="https://blog.dev/39")
+
+    def test_recortar_entre_segmentos(self, tmp_path):
+        store = self._store(tmp_path)
+        store.insertar([_item(i, horas=24 * i) for i in range(6)])
+        store.recortar(3)
+        assert sorted(store.segmentos) == ["2026-05-30", "2026-05-31", "2026-06-01"]
+        assert not store.existe(enlace="https://blog.dev/5")
+        assert not (tmp_path / "historico" / "2026-05-27.jsonl").exists()
+
+    def test_reconstruye_manifest_perdido(self, tmp_path):
+        store = self._store(tmp_path)
+        store.insertar([_item(1), _item(2, horas=48)])
+        (tmp_path / "historico" / "manifest.json").unlink()
+        recargado = self._store(tmp_path)
+        assert not recargado.nuevo
+        assert recargado.contar() == 2
+
+    def test_migra_desde_sqlite(self, tmp_path):
+        with SQLiteHistoryStore(str(tmp_path / "noticias.db")) as previo:
+            previo.insertar([_item(2), _item(1, horas=48)])
+        with abrir_historico(folder=str(tmp_path)) as store:
+            assert isinstance(store, SegmentedHistoryStore)
+            assert [i["titulo"] for i in store.todos()] == ["Noticia 2", "Noticia 1"]
+
+    def test_en_memoria_lee_cada_segmento_una_vez(self, tmp_path, monkeypatch):
+        SegmentedHistoryStore(str(tmp_path / "historico")).insertar([_item(1), _item(2, horas=48)])
+        store = SegmentedHistoryStore(str(tmp_path / "historico"), en_memoria=True)
+        abiertos = []
+        original = open
+        monkeypatch.setattr("builtins.open", lambda p, *a, **k: abiertos.append(str(p)) or original(p, *a, **k))
+        primero = store.todos()
+        primero[0]["titulo"] = "Mutado fuera del store"
+        assert [i["titulo"] for i in store.todos()] == ["Noticia 1", "Noticia 2"]
+        assert len([p for p in abiertos if p.endswith(".jsonl")]) == 2
+        store.actualizar([dict(primero[0], titulo="Noticia uno")])
+        store.insertar([_item(3)])
+        assert [i["titulo"] for i in store.todos()] == ["Noticia 3", "Noticia uno", "Noticia 2"]
+        assert SegmentedHistoryStore(str(tmp_path / "historico")).todos() == store.todos()
@@ -0,0 +1,65 @@
+import asyncio
+
+from scripts.scrapers.host_scheduler import HostScheduler, host_de, segundos_retry_after
+
+
+class TestHostDe:
+    def test_quita_www_y_m(self):
+        assert host_de("https://www.youtube.com/@x/videos") == "youtube.com"
+        assert host_de("https://m.youtube.com/watch?v=1") == "youtube.com"
+
+    def test_youtu_be(self):
+        assert host_de("https://youtu.be/abc") == "youtube.com"
+
+    def test_subdominio_distinto(self):
+        assert host_de("https://feeds.arstechnica.com/x") == "feeds.arstechnica.com"
+
+
+class TestRetryAfter:
+    def test_segundos(self):
+        assert segundos_retry_after("12") == 12.0
+
+    def test_invalido(self):
+        assert segundos_retry_after("mañana") is None
+        assert segundos_retry_after(None) is None
+
+    def test_fecha_pasada(self):
+        assert segundos_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class TestHostScheduler:
+    def test_carril_por_host(self):
+        async def main():
+            sch = HostScheduler(limite_global=10, limite_por_host=1)
+            activos = {"a.com": 0, "b.com": 0}
+            maximos = {"a.com": 0, "b.com": 0}
+
+            async def tarea(host):
+                async with sch.turno(f"https://{host}/x"):
+                    activos[host] += 1
+                    maximos[host] = max(maximos[host], activos[host])
+                    await asyncio.sleep(0.01)
+                    activos[host] -= 1
+
+            await asyncio.gather(*(tarea(h) for h in ["a.com", "b.com"] * 3))
+            return maximos
+
+        assert asyncio.run(main()) == {"a.com": 1, "b.com": 1}
+
+    def test_penalizar_respeta_retry_after(self):
+        async def main():
+            sch = HostScheduler()
+            return sch.penalizar("https://a.com/x", "3")
+
+        assert asyncio.run(main()) == 3.0
+
+    def test_backoff_exponencial_y_reset(self):
+        async def main():
+            sch = HostScheduler()
+            primera = sch.penalizar("https://a.com/x")
+            segunda = sch.penalizar("https://a.com/y")
+            sch.exito("https://a.com/z")
+            tercera = sch.penalizar("https://a.com/x")
+            return primera, segunda, tercera
+
+        assert asyncio.run(main()) == (2.0, 4.0, 2.0)
@@ -0,0 +1,54 @@
+from scripts.utils.constants_downloadfile import ALL_KEYWORDS, CATEGORIAS, KEYWORD_MATCHER
+from scripts.utils.keyword_matcher import KeywordMatcher
+
+
+def _clasificar_por_bucles(titulo: str) -> str | None:
+    t_padded = " " + titulo.lower() + " "
+    for cat, keywords in CATEGORIAS.items():
+        for k in keywords:
+            if " " + k.lower() + " " in t_padded:
+                return cat
+    return None
+
+
+def _coincide_por_bucles(titulo: str) -> bool:
+    t_low = titulo.lower()
+    return any(key.lower() in t_low for key in ALL_KEYWORDS)
+
+
+class TestSemantica:
+    def test_subcadena_para_keywords_tech(self):
+        # "ai" dentro de "said" cuenta como keyword tech pero no como categoría
+        assert KEYWORD_MATCHER.analizar("He said nothing") == (True, None)
+
+    def test_categoria_delimitada_por_espacios(self):
+        assert KEYWORD_MATCHER.categoria("Resultados de AMD") == "⚡ Hardware"
+        assert KEYWORD_MATCHER.analizar("Resultados de AMD.") == (True, None)
+
+    def test_gana_la_primera_categoria(self):
+        # "GPU" (Hardware) aparece después de "Python" (Programación) pero Hardware va antes en CATEGORIAS
+        assert KEYWORD_MATCHER.categoria("Python acelerado en GPU") == "⚡ Hardware"
+
+    def test_keyword_multipalabra(self):
+        assert KEYWORD_MATCHER.categoria("Curso de inteligencia artificial gratis") == "🤖 IA"
+
+    def test_sin_coincidencias(self):
+        assert KEYWORD_MATCHER.analizar("Receta de cocina") == (False, None)
+
+    def test_patrones_solapados(self):
+        m = KeywordMatcher(["he", "she", "hers"], {"A": ["hers"], "B": ["she"]})
+        assert m.analizar("ushers") == (True, None)
+        assert m.analizar("u she rs") == (True, "B")
+        assert m.analizar("hers she") == (True, "A")
+
+
+class TestEquivalencia:
+    def test_mismo_resultado_que_los_bucles(self):
+        titulos = [
+            "OpenAI lanza GPT-5", "Nueva vulnerabilidad en Linux", "Receta de cocina italiana",
+            "Docker y Kubernetes en producción", "Apple Silicon M4: análisis", "GitHub Actions para CI/CD",
+            "¿Es Rust el nuevo C#?", "Startups de IA levantan 100 millones", "  go  ", "AI",
+            "Hugging Face publica un Transformer", "El ARM de Qualcomm", "ransomware, phishing y más",
+        ]
+        for t in titulos:
+            assert KEYWORD_MATCHER.analizar(t) == (_coincide_por_bucles(t), _clasificar_por_bucles(t)), t
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from scripts.utils.pipeline import ERROR, OK, SALTADA, Etapa, Pipeline, huella
+
+
+def _etapa(nombre, traza, depende=(), entradas=(), espera=0.0, falla=False):
+    async def ejecutar(ctx):
+        traza.append(f"+{nombre}")
+        await asyncio.sleep(espera)
+        if falla:
+            raise RuntimeError("boom")
+        traza.append(f"-{nombre}")
+    return Etapa(nombre, ejecutar, depende=depende, entradas=entradas)
+
+
+class TestOrden:
+    def test_independientes_en_paralelo_y_dependientes_despues(self):
+        traza = []
+        pipeline = Pipeline([
+            _etapa("news", traza, espera=0.02),
+            _etapa("tools", traza, espera=0.01),
+            _etapa("weekly", traza, depende=("news", "tools")),
+        ])
+        resultados = asyncio.run(pipeline.ejecutar())
+        assert resultados == {"news": OK, "tools": OK, "weekly": OK}
+        assert traza[:2] == ["+news", "+tools"]  # tools empieza antes de que acabe news
+        assert traza.index("+weekly") > max(traza.index("-news"), traza.index("-tools"))
+
+    def test_fallo_no_detiene_las_demas(self):
+        traza = []
+        pipeline = Pipeline([_etapa("news", traza, falla=True), _etapa("weekly", traza, depende=("news",))])
+        assert asyncio.run(pipeline.ejecutar()) == {"news": ERROR, "weekly": OK}
+
+    def test_solo(self):
+        traza = []
+        pipeline = Pipeline([_etapa("news", traza), _etapa("weekly", traza, depende=("news",))])
+        assert asyncio.run(pipeline.ejecutar(solo=["weekly"])) == {"weekly": OK}
+        assert traza == ["+weekly", "-weekly"]
+        with pytest.raises(ValueError):
+            asyncio.run(pipeline.ejecutar(solo=["email"]))
+
+    def test_ciclos_y_dependencias_desconocidas(self):
+        with pytest.raises(ValueError, match="Ciclo"):
+            Pipeline([_etapa("a", [], depende=("b",)), _etapa("b", [], depende=("a",))])
+        with pytest.raises(ValueError, match="desconocidas"):
+            Pipeline([_etapa("a", [], depende=("x",))])
+
+
+class TestSaltos:
+    def _pipeline(self, tmp_path, traza):
+        entrada = tmp_path / "historico"
+        return Pipeline([
+            _etapa("news", traza),
+            _etapa("weekly", traza, depende=("news",), entradas=(str(entrada),)),
+        ], estado_path=str(tmp_path / "pipeline_estado.json"))
+
+    def test_salta_si_las_entradas_no_cambian(self, tmp_path):
+        (tmp_path / "historico").mkdir()
+        (tmp_path / "historico" / "2026-06-01.jsonl").write_text('{"a": 1}\n')
+        assert asyncio.run(self._pipeline(tmp_path, []).ejecutar()) == {"news": OK, "weekly": OK}
+        assert asyncio.run(self._pipeline(tmp_path, []).ejecutar()) == {"news": OK, "weekly": SALTADA}
+        assert asyncio.run(self._pipeline(tmp_path, []).ejecutar(forzar=True))["weekly"] == OK
+
+        with open(tmp_path / "historico" / "2026-06-01.jsonl", "a") as f:
+            f.write('{"b": 2}\n')
+        assert asyncio.run(self._pipeline(tmp_path, []).ejecutar())["weekly"] == OK
+
+    def test_fallida_no_guarda_huella(self, tmp_path):
+        (tmp_path / "historico").mkdir()
+        pipeline = Pipeline([_etapa("weekly", [], entradas=(str(tmp_path / "historico"),), falla=True)],
+                            estado_path=str(tmp_path / "pipeline_estado.json"))
+        asyncio.run(pipeline.ejecutar())
+        assert asyncio.run(pipeline.ejecutar()) == {"weekly": ERROR}
+
+    def test_huella(self, tmp_path):
+        assert huella(str(tmp_path / "no_existe")) == ""
+        (tmp_path / "a.json").write_text("[]")
+        antes = huella(str(tmp_path))
+        (tmp_path / "a.json.tmp").write_text("basura")
+        assert huella(str(tmp_path)) == antes
+        (tmp_path / "a.json").write_text("[1]")
+        assert huella(str(tmp_path)) != antes
+
+
+def test_etapas_de_downloadfile():
+    from scripts.tools.downloadFile import ETAPAS
+    pipeline = Pipeline(ETAPAS)
+    assert pipeline.etapas["weekly"].depende == ("news", "tools")
+    # email y telegram reescriben los mismos items del histórico: nunca a la vez
+    assert pipeline.etapas["telegram"].depende == ("email",)
+    # El resumen de voz de las 21:00 no depende de las entradas
+    assert pipeline.etapas["telegram"].entradas == ()
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts.utils import common
+from scripts.utils.common import extraer_texto_html, resumir_noticias
+
+ESPERA_ARTICULO = 0.2
+ESPERA_MODELO = 0.1
+
+
+class _Articulos(BaseHTTPRequestHandler):
+    """/articulo/<n> tarda ESPERA_ARTICULO y devuelve un <article>; /roto da 500.
+    El servidor cuenta cuántas descargas de artículos van a la vez."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/roto"):
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        with self.server.lock:
+            self.server.en_curso += 1
+            self.server.max_en_curso = max(self.server.max_en_curso, self.server.en_curso)
+        time.sleep(ESPERA_ARTICULO)
+        with self.server.lock:
+            self.server.en_curso -= 1
+        cuerpo = (f"<html><nav>menú</nav><article><p>Texto del artículo {self.path}</p></article>"
+                  "<script>x()</script></html>").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 64  # con el de serie (5), las conexiones simultáneas se reintentan al segundo
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.lock = threading.Lock()
+        self.en_curso = 0
+        self.max_en_curso = 0
+
+    @property
+    def base(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+@pytest.fixture
+def servidor():
+    srv = _Servidor(("127.0.0.1", 0), _Articulos)
+    hilo = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    hilo.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+class _Respuesta:
+    def __init__(self, text):
+        self.text = text
+
+
+class _ClienteFalso:
+    """Resume devolviendo el texto que recibió en el prompt y mide cuántas llamadas van a la vez."""
+
+    def __init__(self):
+        self.models = self
+        self.prompts: list[str] = []
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.max_en_curso = 0
+
+    def generate_content(self, model, contents):
+        with self._lock:
+            self.prompts.append(contents)
+            self.en_curso += 1
+            self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        time.sleep(ESPERA_MODELO)
+        with self._lock:
+            self.en_curso -= 1
+        texto = contents.split("TEXTO:\n", 1)[1].split("\n", 1)[0]
+        return _Respuesta(f"Resumen de: {texto}")
+
+
+def _noticias(base: str, n: int) -> list[dict]:
+    return [{"titulo": f"Titular {i}", "fuente": "Fuente", "enlace": f"{base}/articulo/{i}"} for i in range(n)]
+
+
+class TestExtraerTextoHtml:
+    def test_prefiere_article_y_quita_ruido(self):
+        html = "<html><nav>menú</nav><article>  Hola\n\n mundo </article><script>x()</script></html>"
+        assert extraer_texto_html(html) == "Hola mundo"
+
+    def test_recorta(self):
+        assert extraer_texto_html("<main>" + "a" * 50 + "</main>", max_chars=10) == "a" * 10
+
+
+class TestResumirNoticias:
+    @pytest.fixture(autouse=True)
+    def _sin_ritmo(self, monkeypatch):
+        monkeypatch.setattr(common, "RESUMEN_INTERVALO", 0.0)
+
+    def test_descargas_y_resumenes_a_la_vez(self, servidor, monkeypatch):
+        monkeypatch.setattr(common, "RESUMEN_CONCURRENCIA", 8)
+        noticias = _noticias(servidor.base, 8)
+        cliente = _ClienteFalso()
+        assert asyncio.run(resumir_noticias(noticias, cliente)) == 8
+        assert servidor.max_en_curso > 1
+        assert cliente.max_en_curso > 1
+        for i, n in enumerate(noticias):
+            assert n["resumen"].startswith("Resumen de:")
+            assert f"Texto del artículo /articulo/{i}" in n["resumen"]
+
+    def test_limite_de_llamadas_al_modelo(self, servidor, monkeypatch):
+        monkeypatch.setattr(common, "RESUMEN_CONCURRENCIA", 2)
+        cliente = _ClienteFalso()
+        asyncio.run(resumir_noticias(_noticias(servidor.base, 6), cliente))
+        assert len(cliente.prompts) == 6
+        assert cliente.max_en_curso == 2
+
+    def test_no_repite_los_ya_resumidos(self, servidor):
+        noticias = _noticias(servidor.base, 3)
+        noticias[1]["resumen"] = "Ya hecho"
+        cliente = _ClienteFalso()
+        assert asyncio.run(resumir_noticias(noticias, cliente)) == 2
+        assert noticias[1]["resumen"] == "Ya hecho"
+        assert asyncio.run(resumir_noticias(noticias, cliente)) == 0
+        assert len(cliente.prompts) == 2
+
+    def test_descarga_fallida_usa_el_titulo(self, servidor):
+        noticias = [{"titulo": "Solo el titular", "fuente": "Fuente", "enlace": f"{servidor.base}/roto"}]
+        asyncio.run(resumir_noticias(noticias, _ClienteFalso()))
+        assert noticias[0]["resumen"] == "Resumen de: Solo el titular"
@@ -0,0 +1,91 @@
+from scripts.scrapers.rss_stream import LectorRSS
+from scripts.scrapers.scraper_base import WebExtractor
+from scripts.utils.constants_downloadfile import ENLACE_KEY, FECHA_PUB_KEY, TITULO_KEY
+
+
+def _rss(n: int, cuerpo_kb: int = 1) -> bytes:
+    items = "".join(
+        f"<item><title>Noticia {i} sobre Python</title><link>https://blog.dev/{i}</link>"
+        f"<pubDate>Mon, 0{i % 9 + 1} Jun 2026 10:00:00 GMT</pubDate>"
+        f"<content:encoded><![CDATA[{'x' * 1024 * cuerpo_kb}]]></content:encoded></item>"
+        for i in range(n)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">'
+        f"<channel><title>Blog</title>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+ATOM = """<?xml version="1.0"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <entry><title>Rust 2.0</title><link rel="alternate" href="https://rust.dev/a"/><updated>2026-06-01T10:00:00Z</updated></entry>
+  <entry><title></title><link href="https://rust.dev/b"/></entry>
+  <entry><title>Sin enlace</title></entry>
+</feed>"""
+
+
+class TestLectorRSS:
+    def test_rss(self):
+        lector = LectorRSS()
+        lector.alimentar(_rss(3))
+        assert lector.entradas[0] == ("Noticia 0 sobre Python", "https://blog.dev/0", "Mon, 01 Jun 2026 10:00:00 GMT")
+        assert len(lector.entradas) == 3
+
+    def test_atom_cuenta_entradas_incompletas(self):
+        lector = LectorRSS(limite=2)
+        lector.alimentar(ATOM)
+        assert lector.entradas == [("Rust 2.0", "https://rust.dev/a", "2026-06-01T10:00:00Z"), ("", "https://rust.dev/b", "")]
+
+    def test_para_tras_el_limite(self):
+        cuerpo = _rss(50, cuerpo_kb=20)
+        lector = LectorRSS(limite=12)
+        buffer = bytearray()
+        for i in range(0, len(cuerpo), 4096):
+            buffer.extend(cuerpo[i:i + 4096])
+            if lector(buffer):
+                break
+        assert len(lector.entradas) == 12
+        assert len(buffer) < len(cuerpo) / 3
+
+    def test_digest_no_depende_del_corte(self):
+        cuerpo = _rss(30)
+        digests = set()
+        for trozo in (512, 4096, 65536):
+            lector = LectorRSS()
+            buffer = bytearray()
+            for i in range(0, len(cuerpo), trozo):
+                buffer.extend(cuerpo[i:i + trozo])
+                if lector(buffer):
+                    break
+            digests.add(lector.digest(bytes(buffer)))
+        assert len(digests) == 1
+
+    def test_digest_sin_entradas_usa_el_cuerpo(self):
+        digests = set()
+        for cuerpo in (b"<html><p>Portada</p></html>", b"<html><p>Otra portada</p></html>", _rss(0)):
+            lector = LectorRSS()
+            lector(cuerpo)
+            digests.add(lector.digest(cuerpo))
+        assert len(digests) == 3
+
+    def test_xml_mal_formado_conserva_lo_leido(self):
+        lector = LectorRSS()
+        assert lector.alimentar(_rss(2)[:-len(b"</channel></rss>")] + b"<<roto") is True
+        assert lector.error and len(lector.entradas) == 2
+
+
+class TestExtraerRss:
+    def test_items_de_noticia(self):
+        items = WebExtractor().extraer_rss(_rss(15).decode("utf-8"), "Blog")
+        assert len(items) == 12
+        assert items[0][TITULO_KEY] == "Noticia 0 sobre Python"
+        assert items[0][ENLACE_KEY] == "https://blog.dev/0"
+        assert items[0][FECHA_PUB_KEY] == "Mon, 01 Jun 2026 10:00:00 GMT"
+
+    def test_atom_descarta_sin_titulo_o_enlace(self):
+        items = WebExtractor().extraer_rss(ATOM, "Rust")
+        assert [i[TITULO_KEY] for i in items] == ["Rust 2.0"]
+
+    def test_html_no_es_feed(self):
+        assert WebExtractor().extraer_rss("<html><body><p>hola</body></html>", "X") == []
@@ -0,0 +1,199 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import aiohttp
+import pytest
+
+from scripts.scrapers import scraper_base
+from scripts.scrapers.scraper_base import ScraperPro
+from scripts.utils.constants_downloadfile import CONFIG
+
+PAGINA = """<html><body>
+<article><h2><a href="/python-314">Python 3.14 mejora el rendimiento del intérprete</a></h2></article>
+<article><h2><a href="/rust-kernel">Rust entra en el kernel de Linux con nuevos drivers</a></h2></article>
+</body></html>"""
+ETAG = '"pagina-v1"'
+VACIA = "<html><body><p>Sin novedades</p></body></html>"
+
+
+class _Pagina(BaseHTTPRequestHandler):
+    """Sirve ``server.pagina`` con ``server.etag`` y responde 304 si If-None-Match coincide;
+    /vacia, sin titulares; /feed, un HTML en lugar de un feed."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.peticiones.append({**self.headers, "path": self.path})
+        if self.path == "/feed":
+            cuerpo = VACIA.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+            return
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        cuerpo = (VACIA if self.path == "/vacia" else self.server.pagina).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+
+class _Servidor(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.peticiones: list[dict] = []
+        self.pagina = PAGINA
+        self.etag = ETAG
+
+
+@pytest.fixture
+def servidor():
+    srv = _Servidor(("127.0.0.1", 0), _Pagina)
+    hilo = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    hilo.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture(autouse=True)
+def _carpeta(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG, "FOLDER", str(tmp_path))
+
+
+def _url(servidor) -> str:
+    return f"http://127.0.0.1:{servidor.server_address[1]}/noticias"
+
+
+async def _extraer(scr: ScraperPro, nombre: str, info: dict) -> list:
+    try:
+        async with aiohttp.ClientSession() as session:
+            return await scr.extraer(session, nombre, info)
+    finally:
+        await scr.cerrar()
+
+
+class TestValidadoresTrasFallo:
+    def test_parseo_fallido_no_deja_validadores(self, servidor, monkeypatch):
+        info = {"url": _url(servidor)}
+        scr = ScraperPro(parse_workers=0)
+        parsear_web = scraper_base.parsear_web
+
+        def romper(*args):
+            raise ValueError("HTML inesperado")
+
+        monkeypatch.setattr(scraper_base, "parsear_web", romper)
+        assert asyncio.run(_extraer(scr, "Fuente", info)) == []
+        scr.guardar_cache_http()
+        monkeypatch.setattr(scraper_base, "parsear_web", parsear_web)
+
+        # Segunda ejecución: sin If-None-Match, la página se descarga y se parsea entera
+        siguiente = ScraperPro(parse_workers=0)
+        items = asyncio.run(_extraer(siguiente, "Fuente", info))
+        assert "If-None-Match" not in servidor.peticiones[-1]
+        assert len(items) == 2
+
+    def test_parseo_correcto_si_usa_304(self, servidor):
+        info = {"url": _url(servidor)}
+        scr = ScraperPro(parse_workers=0)
+        assert len(asyncio.run(_extraer(scr, "Fuente", info))) == 2
+        scr.guardar_cache_http()
+        assert asyncio.run(_extraer(ScraperPro(parse_workers=0), "Fuente", info)) == []
+        assert servidor.peticiones[-1].get("If-None-Match") == ETAG
+
+
+class TestRssConWeb:
+    def test_feed_sin_entradas_sigue_probando_la_web(self, servidor):
+        """Fuente rss+url cuyo "feed" es una página HTML: cada ejecución debe llegar a la web."""
+        base = f"http://127.0.0.1:{servidor.server_address[1]}"
+        info = {"rss": f"{base}/feed", "url": f"{base}/noticias"}
+        scr = ScraperPro(parse_workers=0)
+        assert len(asyncio.run(_extraer(scr, "Fuente", info))) == 2
+        scr.guardar_cache_http()
+
+        servidor.pagina = PAGINA.replace("</body>", '<article><h2><a href="/go-125">Go 1.25 llega con '
+                                         "un recolector de basura más rápido</a></h2></article></body>")
+        servidor.etag = '"pagina-v2"'
+        siguiente = ScraperPro(parse_workers=0)
+        items = asyncio.run(_extraer(siguiente, "Fuente", info))
+        assert [p["path"] for p in servidor.peticiones[-2:]] == ["/feed", "/noticias"]
+        assert len(items) == 3
+        assert siguiente.health.fuentes["Fuente"]["fallos_consecutivos"] == 0
+
+
+class TestSaludFuente:
+    def test_respuesta_sin_items_es_exito(self, servidor):
+        info = {"url": f"http://127.0.0.1:{servidor.server_address[1]}/vacia"}
+        scr = ScraperPro(parse_workers=0, cache_http=False)
+        for _ in range(4):
+            assert asyncio.run(_extraer(scr, "Tranquila", info)) == []
+        entrada = scr.health.fuentes["Tranquila"]
+        assert entrada["fallos_consecutivos"] == 0
+        assert entrada["sin_items_consecutivas"] == 4
+        assert scr.health.disponible("Tranquila")
+
+    def test_parseo_fallido_cuenta_como_fallo(self, servidor, monkeypatch):
+        def romper(*args):
+            raise ValueError("HTML inesperado")
+
+        monkeypatch.setattr(scraper_base, "parsear_web", romper)
+        scr = ScraperPro(parse_workers=0, cache_http=False)
+        asyncio.run(_extraer(scr, "Fuente", {"url": _url(servidor)}))
+        entrada = scr.health.fuentes["Fuente"]
+        assert entrada["fallos_consecutivos"] == 1
+        assert "HTML inesperado" in entrada["ultimo_error"]
+
+
+class TestPoolDeParseo:
+    URL = "https://ejemplo.com/noticias"
+
+    def test_pool_y_inline_dan_lo_mismo(self):
+        async def parsear(workers: int) -> list:
+            scr = ScraperPro(parse_workers=workers, cache_http=False, salud_fuentes=False)
+            try:
+                return await scr._parsear_web(PAGINA, "Fuente", self.URL, {"url": self.URL})
+            finally:
+                await scr.cerrar()
+
+        def sin_ts(items):
+            return [{k: v for k, v in item.items() if k != "ts"} for item in items]
+
+        en_pool = asyncio.run(parsear(1))
+        inline = asyncio.run(parsear(0))
+        assert len(inline) == 2
+        assert sin_ts(en_pool) == sin_ts(inline)
+
+    def test_cerrar_apaga_el_pool(self):
+        scr = ScraperPro(parse_workers=1, cache_http=False, salud_fuentes=False)
+
+        async def parsear_y_cerrar():
+            await scr._parsear_web(PAGINA, "Fuente", self.URL, {"url": self.URL})
+            pool = scr._parse_pool
+            assert pool is not None
+            await scr.cerrar()
+            return pool
+
+        pool = asyncio.run(parsear_y_cerrar())
+        assert scr._parse_pool is None
+        with pytest.raises(RuntimeError):
+            pool.submit(len, "")
+
+    def test_parseo_inline_por_entorno(self, monkeypatch):
+        monkeypatch.setenv("SCRAPER_INLINE_PARSE", "1")
+        scr = ScraperPro(parse_workers=4, cache_http=False, salud_fuentes=False)
+        assert scr.parse_workers == 0
+        items = asyncio.run(scr._parsear_web(PAGINA, "Fuente", self.URL, {"url": self.URL}))
+        assert len(items) == 2
+        assert scr._parse_pool is None
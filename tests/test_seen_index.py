@@ -0,0 +1,104 @@
+import pytest
+
+from scripts.utils import seen_index
+from scripts.utils.seen_index import BloomFilter, SeenIndex, clave_url
+
+
+def _index(tmp_path, nombre="noticias") -> SeenIndex:
+    return SeenIndex(str(tmp_path / "vistos"), nombre)
+
+
+class TestBloom:
+    def test_sin_falsos_negativos(self):
+        bloom = BloomFilter(1000)
+        claves = [f"url:https://blog.dev/{i}" for i in range(1000)]
+        for c in claves:
+            bloom.anadir(c)
+        assert all(c in bloom for c in claves)
+        falsos = sum(f"url:https://otro.dev/{i}" in bloom for i in range(10000))
+        assert falsos < 300  # ~1 % esperado
+
+    def test_ida_y_vuelta(self):
+        bloom = BloomFilter(100)
+        bloom.anadir("yt:abcdefghijk")
+        copia, tam = BloomFilter.desde_bytes(bloom.a_bytes(42))
+        assert tam == 42
+        assert "yt:abcdefghijk" in copia and copia.n == 1 and copia.capacidad == 100
+
+    def test_formato_desconocido(self):
+        with pytest.raises(ValueError):
+            BloomFilter.desde_bytes(b"XXXX" + b"\0" * 40)
+
+
+class TestSeenIndex:
+    def test_persiste_entre_ejecuciones(self, tmp_path):
+        vistos = _index(tmp_path)
+        assert vistos.nuevo
+        vistos.marcar(enlace="https://Blog.dev/post/", id_video="abcdefghijk")
+        assert vistos.visto(enlace="https://blog.dev/post")
+        vistos.guardar_si_cambio()
+
+        otra = _index(tmp_path)
+        assert not otra.nuevo
+        assert otra.visto(enlace="https://blog.dev/post?utm_source=rss")
+        assert otra.visto(id_video="abcdefghijk")
+        assert not otra.visto(enlace="https://blog.dev/otro", id_video="zzzzzzzzzzz")
+        assert not otra.visto()
+
+    def test_negativos_sin_leer_las_claves(self, tmp_path, monkeypatch):
+        vistos = _index(tmp_path)
+        vistos.marcar_items([{"enlace": f"https://blog.dev/{i}"} for i in range(100)])
+        vistos.guardar_si_cambio()
+
+        otra = _index(tmp_path)
+        lecturas = []
+        original = otra._leer_claves
+        monkeypatch.setattr(otra, "_leer_claves", lambda: lecturas.append(1) or original())
+        assert not otra.visto(enlace="https://blog.dev/nuevo")
+        assert lecturas == [] and otra.descartes_bloom == 1
+        assert otra.visto(enlace="https://blog.dev/7")
+        assert lecturas == [1] and otra.confirmados == 1
+
+    def test_solo_anade_claves_nuevas(self, tmp_path):
+        vistos = _index(tmp_path)
+        vistos.marcar(enlace="https://blog.dev/1")
+        vistos.guardar_si_cambio()
+        otra = _index(tmp_path)
+        otra.marcar(enlace="https://blog.dev/1")
+        otra.marcar(enlace="https://blog.dev/2")
+        otra.guardar_si_cambio()
+        lineas = (tmp_path / "vistos" / "noticias.txt").read_text(encoding="utf-8").splitlines()
+        assert lineas == [clave_url("https://blog.dev/1"), clave_url("https://blog.dev/2")]
+        assert len(_index(tmp_path)) == 2
+
+    def test_reconstruye_bloom_perdido_o_desfasado(self, tmp_path):
+        vistos = _index(tmp_path)
+        vistos.marcar(enlace="https://blog.dev/1")
+        vistos.guardar_si_cambio()
+        # Otro proceso añadió una clave sin actualizar el Bloom
+        with open(tmp_path / "vistos" / "noticias.txt", "a", encoding="utf-8") as f:
+            f.write(clave_url("https://blog.dev/2") + "\n")
+        assert _index(tmp_path).visto(enlace="https://blog.dev/2")
+        (tmp_path / "vistos" / "noticias.bloom").unlink()
+        assert _index(tmp_path).visto(enlace="https://blog.dev/1")
+
+    def test_crece_al_llenarse(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(seen_index, "CAPACIDAD_INICIAL", 16)
+        vistos = _index(tmp_path)
+        vistos.marcar_items([{"enlace": f"https://blog.dev/{i}"} for i in range(100)])
+        vistos.guardar_si_cambio()
+        assert vistos.bloom.capacidad >= 200
+        otra = _index(tmp_path)
+        assert all(otra.visto(enlace=f"https://blog.dev/{i}") for i in range(100))
+
+    def test_indices_separados(self, tmp_path):
+        noticias = _index(tmp_path)
+        noticias.marcar(enlace="https://github.com/a/b")
+        noticias.guardar_si_cambio()
+        assert not _index(tmp_path, "herramientas").visto(enlace="https://github.com/a/b")
+
+    def test_sin_cambios_no_escribe(self, tmp_path):
+        vistos = _index(tmp_path)
+        vistos.visto(enlace="https://blog.dev/1")
+        vistos.guardar_si_cambio()
+        assert not (tmp_path / "vistos").exists()
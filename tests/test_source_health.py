@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta
+
+from scripts.scrapers.source_health import (
+    ABIERTO_HASTA_KEY, FALLOS_KEY, MIN_EJECUCIONES, REPROBE_BASE_H, SIN_ITEMS_KEY, SourceHealth,
+)
+
+AHORA = datetime(2026, 6, 1, 12, 0)
+
+
+def _salud(tmp_path) -> SourceHealth:
+    return SourceHealth(str(tmp_path / "salud.json"))
+
+
+class TestCircuito:
+    def test_abre_tras_fallos_seguidos(self, tmp_path):
+        salud = _salud(tmp_path)
+        for _ in range(2):
+            salud.registrar("Blog", False, 20.0, "TimeoutError", ahora=AHORA)
+        assert salud.disponible("Blog", AHORA)
+        salud.registrar("Blog", False, 20.0, "TimeoutError", ahora=AHORA)
+        assert not salud.disponible("Blog", AHORA)
+        assert salud.disponible("Blog", AHORA + timedelta(hours=REPROBE_BASE_H))
+
+    def test_reprobe_exponencial(self, tmp_path):
+        salud = _salud(tmp_path)
+        for _ in range(4):
+            salud.registrar("Blog", False, 1.0, ahora=AHORA)
+        assert salud.fuentes["Blog"][ABIERTO_HASTA_KEY] == (AHORA + timedelta(hours=2 * REPROBE_BASE_H)).isoformat()
+
+    def test_exito_cierra(self, tmp_path):
+        salud = _salud(tmp_path)
+        for _ in range(3):
+            salud.registrar("Blog", False, 1.0, ahora=AHORA)
+        salud.registrar("Blog", True, 0.5, ahora=AHORA + timedelta(days=1))
+        assert salud.disponible("Blog", AHORA)
+        assert salud.fuentes["Blog"][FALLOS_KEY] == 0
+
+    def test_fuente_desconocida_disponible(self, tmp_path):
+        assert _salud(tmp_path).disponible("Nueva")
+
+    def test_respuesta_sin_items_no_abre(self, tmp_path):
+        salud = _salud(tmp_path)
+        for _ in range(MIN_EJECUCIONES):
+            salud.registrar("Canal tranquilo", True, 0.3, ahora=AHORA, items=0)
+        assert salud.disponible("Canal tranquilo", AHORA)
+        assert salud.fuentes["Canal tranquilo"][FALLOS_KEY] == 0
+        assert salud.fuentes["Canal tranquilo"][SIN_ITEMS_KEY] == MIN_EJECUCIONES
+
+
+class TestSondeoAdaptativo:
+    def _ejecuciones(self, salud, nombre, nuevos, ahora=AHORA):
+        for i in range(MIN_EJECUCIONES):
+            salud.registrar(nombre, True, 1.0, ahora=ahora)
+            salud.registrar_nuevos(nombre, nuevos, ahora=ahora)
+
+    def test_promociona_fuente_productiva(self, tmp_path):
+        salud = _salud(tmp_path)
+        self._ejecuciones(salud, "Productiva", 5)
+        self._ejecuciones(salud, "Tranquila", 0)
+        assert salud.en_tier_rapido("Productiva", quick=False, ahora=AHORA)
+        assert not salud.en_tier_rapido("Tranquila", quick=False, ahora=AHORA)
+
+    def test_degrada_quick_sin_novedades(self, tmp_path):
+        salud = _salud(tmp_path)
+        self._ejecuciones(salud, "Quick", 0)
+        assert not salud.en_tier_rapido("Quick", quick=True, ahora=AHORA + timedelta(hours=1))
+        # Degradada no es abandonada: vuelve a sondearse cada pocas horas
+        assert salud.en_tier_rapido("Quick", quick=True, ahora=AHORA + timedelta(hours=7))
+
+    def test_quick_con_novedades_recientes(self, tmp_path):
+        salud = _salud(tmp_path)
+        self._ejecuciones(salud, "Quick", 2)
+        assert salud.en_tier_rapido("Quick", quick=True, ahora=AHORA + timedelta(days=1))
+
+    def test_degrada_quick_sin_items(self, tmp_path):
+        salud = _salud(tmp_path)
+        for _ in range(MIN_EJECUCIONES):
+            salud.registrar("Quick", True, 1.0, ahora=AHORA, items=0)
+            salud.registrar_nuevos("Quick", 1, ahora=AHORA)
+        assert salud.obsoleta("Quick", AHORA)
+        salud.registrar("Quick", True, 1.0, ahora=AHORA, items=3)
+        assert not salud.obsoleta("Quick", AHORA)
+
+    def test_nuevos_solo_para_consultadas(self, tmp_path):
+        salud = _salud(tmp_path)
+        salud.registrar("A", True, 1.0)
+        salud.registrar_nuevos_items([{"fuente": "A"}, {"fuente": "A"}, {"fuente": "Z"}])
+        assert salud.fuentes["A"]["rendimiento_medio"] > 0
+        assert "Z" not in salud.fuentes
+
+
+class TestPersistencia:
+    def test_guarda_y_carga(self, tmp_path):
+        salud = _salud(tmp_path)
+        salud.registrar("Blog", False, 3.0, "HTTP 404")
+        salud.guardar_si_cambio()
+        cargada = _salud(tmp_path)
+        assert cargada.fuentes["Blog"][FALLOS_KEY] == 1
+        assert cargada.fuentes["Blog"]["ultimo_error"] == "HTTP 404"
+
+    def test_informe(self, tmp_path):
+        salud = _salud(tmp_path)
+        for _ in range(3):
+            salud.registrar("Rota", False, 20.0, "HTTP 500", ahora=AHORA)
+        salud.registrar("Sana", True, 0.2, ahora=AHORA)
+        for _ in range(MIN_EJECUCIONES):
+            salud.registrar("Vacia", True, 0.2, ahora=AHORA, items=0)
+        informe = salud.informe(AHORA)
+        assert informe["sin_items"] == ["Vacia"]
+        assert list(informe["circuito_abierto"]) == ["Rota"]
+        assert informe["mas_lentas"][0]["fuente"] == "Rota"
+        assert informe["fuentes"] == 3
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from scripts.tools.benchmarks import _deduplicar_por_bucles, _items_con_duplicados
+from scripts.utils.common import deduplicar_items
+from scripts.utils.title_dedup import (
+    MODO_FUZZY, MODO_PREFIJO, TitleDeduplicator, firma_minhash, jaccard, normalizar_titulo, shingles,
+)
+
+
+class TestModoPrefijo:
+    def test_identico_al_bucle_original(self):
+        items = _items_con_duplicados(1000, proporcion=0.3)
+        # Títulos cortos y prefijos compartidos de distinta longitud
+        items += [{"titulo": t, "enlace": f"https://x.dev/{i}"} for i, t in enumerate([
+            "Corto", "Corto", "Python 3.14 ya disponible", "python 3.14 ya disponible hoy mismo",
+            "Python 3.14", "  Python 3.14 ya disponible en beta  ", "", "Nueva versión de Rust",
+        ])]
+        random.Random(1).shuffle(items)
+        assert deduplicar_items(items) == _deduplicar_por_bucles(items)
+
+    @pytest.mark.parametrize("umbral", [0.05, 0.5, 0.95])
+    def test_otros_umbrales(self, umbral):
+        items = _items_con_duplicados(500, proporcion=0.5)
+        assert deduplicar_items(items, umbral) == _deduplicar_por_bucles(items, umbral)
+
+    def test_no_agrupa_titulos_cortos(self):
+        dedup = TitleDeduplicator()
+        assert dedup.registrar("Hola mundo")
+        assert dedup.registrar("Hola mundo")
+
+
+class TestModoFuzzy:
+    def test_variante_sin_prefijo_comun(self):
+        dedup = TitleDeduplicator(umbral=0.6, modo=MODO_FUZZY)
+        assert dedup.registrar("Apple presenta el nuevo chip M4 para los MacBook Pro")
+        assert not dedup.registrar("Apple anuncia el nuevo chip M4 para los MacBook Pro")
+        assert TitleDeduplicator().registrar("Apple anuncia el nuevo chip M4 para los MacBook Pro")
+
+    def test_prefijo_comun_no_basta(self):
+        prefijo = TitleDeduplicator()
+        fuzzy = TitleDeduplicator(modo=MODO_FUZZY)
+        a = "Guía completa de Kubernetes para principiantes (parte 1)"
+        b = "Guía completa de Kubernetes para principiantes (parte 2): redes, seguridad y despliegue en producción"
+        assert prefijo.registrar(a) and not prefijo.registrar(b)
+        assert fuzzy.registrar(a) and fuzzy.registrar(b)
+
+    def test_ignora_acentos_y_puntuacion(self):
+        dedup = TitleDeduplicator(modo=MODO_FUZZY)
+        assert dedup.registrar("¡Lanzamiento: la IA de Google, en España!")
+        assert not dedup.registrar("Lanzamiento la IA de Google en Espana")
+
+    def test_encuentra_los_casi_duplicados(self):
+        items = _items_con_duplicados(2000, proporcion=0.2)
+        fuzzy = deduplicar_items(items, 0.7, modo=MODO_FUZZY)
+        # Cada superviviente es distinto de los demás según el Jaccard exacto (muestra)
+        firmas = [shingles(normalizar_titulo(i["titulo"])) for i in fuzzy[:300]]
+        assert all(jaccard(a, b) < 0.7 for i, a in enumerate(firmas) for b in firmas[i + 1:])
+        assert len(fuzzy) < len(items)
+
+    def test_firma_estable(self):
+        s = shingles(normalizar_titulo("OpenAI lanza GPT-5 con razonamiento"))
+        assert firma_minhash(s) == firma_minhash(frozenset(sorted(s)))
+        assert len(firma_minhash(s)) == 80
+
+
+def test_modo_desconocido():
+    with pytest.raises(ValueError):
+        TitleDeduplicator(modo="exacto")
+    assert MODO_PREFIJO == "prefijo"
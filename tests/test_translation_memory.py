@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+import time
+
+from scripts.utils import common
+from scripts.utils.common import traducir_titulos_ia
+from scripts.utils.translation_memory import MemoriaTraducciones, clave_traduccion, normalizar_texto
+
+
+class _Respuesta:
+    def __init__(self, text):
+        self.text = text
+
+
+class _ClienteFalso:
+    """Traduce anteponiendo "ES " a cada línea "id|título" del prompt y cuenta las llamadas."""
+
+    def __init__(self, fallar: bool = False, espera: float = 0.0, fallar_si: str = ""):
+        self.fallar = fallar
+        self.fallar_si = fallar_si
+        self.espera = espera
+        self.prompts: list[str] = []
+        self.models = self
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.max_en_curso = 0
+
+    def generate_content(self, model, contents):
+        with self._lock:
+            self.prompts.append(contents)
+            self.en_curso += 1
+            self.max_en_curso = max(self.max_en_curso, self.en_curso)
+        try:
+            time.sleep(self.espera)
+        finally:
+            with self._lock:
+                self.en_curso -= 1
+        if self.fallar or (self.fallar_si and self.fallar_si in contents):
+            raise RuntimeError("503 UNAVAILABLE")
+        trads = []
+        for linea in contents.splitlines():
+            id_, sep, titulo = linea.strip().partition("|")
+            if sep and id_.isdigit():
+                trads.append({"id": int(id_), "tr": f"ES {titulo}"})
+        return _Respuesta(json.dumps({"traducciones": trads}))
+
+
+def _memoria(tmp_path) -> MemoriaTraducciones:
+    return MemoriaTraducciones(str(tmp_path / "traducciones.jsonl"))
+
+
+def _traducir(noticias, cliente, memoria):
+    return asyncio.run(traducir_titulos_ia(noticias, cliente, memoria=memoria))
+
+
+class TestMemoria:
+    def test_clave_normaliza_espacios_y_depende_del_idioma(self):
+        assert normalizar_texto("  New   release\n") == "New release"
+        assert clave_traduccion("New release") == clave_traduccion(" New  release ")
+        assert clave_traduccion("New release") != clave_traduccion("New release", "ca")
+        assert clave_traduccion("   ") == ""
+
+    def test_persiste_solo_lo_nuevo(self, tmp_path):
+        memoria = _memoria(tmp_path)
+        assert memoria.buscar("Hello world") is None
+        memoria.guardar("Hello world", "Hola mundo", origen="gemini")
+        memoria.guardar("Hello world", "Hola mundo")
+        memoria.guardar_si_cambio()
+        memoria.guardar_si_cambio()
+        lineas = (tmp_path / "traducciones.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lineas) == 1
+        otra = _memoria(tmp_path)
+        assert otra.buscar("Hello  world") == "Hola mundo"
+        assert otra.aciertos == 1
+
+    def test_gana_la_ultima_y_tolera_lineas_rotas(self, tmp_path):
+        memoria = _memoria(tmp_path)
+        memoria.guardar("Hello", "Hola")
+        memoria.guardar("Hello", "Buenas")
+        memoria.guardar_si_cambio()
+        with open(tmp_path / "traducciones.jsonl", "a", encoding="utf-8") as f:
+            f.write("{roto\n")
+        assert _memoria(tmp_path).buscar("Hello") == "Buenas"
+
+
+class TestTraducirTitulos:
+    def test_solo_envia_lo_nunca_visto(self, tmp_path):
+        memoria = _memoria(tmp_path)
+        cliente = _ClienteFalso()
+        primera = [{"titulo": "Python 3.14 released today"}, {"titulo": "Rust gets a new borrow checker"}]
+        _traducir(primera, cliente, memoria)
+        assert [n["titulo"] for n in primera] == ["ES Python 3.14 released today", "ES Rust gets a new borrow checker"]
+        assert len(cliente.prompts) == 1
+
+        segunda = [{"titulo": "Python 3.14 released today"}, {"titulo": "Go 1.30 adds iterators"}]
+        _traducir(segunda, cliente, memoria)
+        assert len(cliente.prompts) == 2
+        assert "Python 3.14" not in cliente.prompts[1]
+        assert all(n["traducido"] for n in segunda)
+
+        # Todo en memoria: ninguna llamada, también desde otro proceso
+        tercera = [{"titulo": "Go 1.30 adds iterators"}]
+        _traducir(tercera, cliente, _memoria(tmp_path))
+        assert len(cliente.prompts) == 2
+        assert tercera[0]["titulo"] == "ES Go 1.30 adds iterators"
+
+    def test_titulos_repetidos_una_sola_vez(self, tmp_path):
+        cliente = _ClienteFalso()
+        noticias = [{"titulo": "Same headline everywhere"}, {"titulo": "Same  headline everywhere "}]
+        _traducir(noticias, cliente, _memoria(tmp_path))
+        assert cliente.prompts[0].count("Same headline everywhere") == 1
+        assert noticias[1]["titulo"] == "ES Same headline everywhere" and noticias[1]["traducido"]
+
+    def test_fallback_ollama_tambien_se_memoriza(self, tmp_path, monkeypatch):
+        def ollama(noticias, indices, lineas):
+            for i in indices:
+                noticias[i]["titulo"] = "Local " + noticias[i]["titulo"]
+                noticias[i]["traducido"] = True
+            return len(indices)
+
+        monkeypatch.setattr(common, "_traducir_con_ollama", ollama)
+        memoria = _memoria(tmp_path)
+        _traducir([{"titulo": "Offline headline here"}], _ClienteFalso(fallar=True), memoria)
+        assert _memoria(tmp_path).buscar("Offline headline here") == "Local Offline headline here"
+
+    def test_sin_traduccion_no_se_memoriza(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(common, "_traducir_con_ollama", lambda *a: 0)
+        memoria = _memoria(tmp_path)
+        noticias = [{"titulo": "Nothing works today"}]
+        _traducir(noticias, _ClienteFalso(fallar=True), memoria)
+        assert not noticias[0].get("traducido")
+        assert len(_memoria(tmp_path)) == 0
+
+
+class TestLotes:
+    def test_quince_titulos_una_llamada(self, tmp_path):
+        cliente = _ClienteFalso()
+        noticias = [{"titulo": f"Headline number {i} about tech"} for i in range(15)]
+        _traducir(noticias, cliente, _memoria(tmp_path))
+        assert len(cliente.prompts) == 1
+        assert all(n["titulo"].startswith("ES ") for n in noticias)
+
+    def test_lotes_concurrentes_con_limite(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(common, "TRADUCCION_LOTE", 10)
+        monkeypatch.setattr(common, "TRADUCCION_CONCURRENCIA", 2)
+        monkeypatch.setattr(common, "TRADUCCION_INTERVALO", 0.0)
+        cliente = _ClienteFalso(espera=0.05)
+        noticias = [{"titulo": f"Headline number {i} about tech"} for i in range(45)]
+        inicio = time.monotonic()
+        _traducir(noticias, cliente, _memoria(tmp_path))
+        assert len(cliente.prompts) == 5
+        assert cliente.max_en_curso == 2
+        assert time.monotonic() - inicio < 5 * 0.05
+        assert [n["titulo"] for n in noticias] == [f"ES Headline number {i} about tech" for i in range(45)]
+
+    def test_intervalo_entre_llamadas(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(common, "TRADUCCION_LOTE", 1)
+        monkeypatch.setattr(common, "TRADUCCION_INTERVALO", 0.05)
+        inicio = time.monotonic()
+        _traducir([{"titulo": f"Headline number {i} about tech"} for i in range(3)], _ClienteFalso(), _memoria(tmp_path))
+        assert time.monotonic() - inicio >= 0.1
+
+    def test_solo_el_lote_fallido_va_a_ollama(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(common, "TRADUCCION_LOTE", 2)
+        monkeypatch.setattr(common, "TRADUCCION_INTERVALO", 0.0)
+        enviados = []
+        monkeypatch.setattr(common, "_traducir_con_ollama", lambda noticias, indices, lineas: enviados.extend(indices))
+        noticias = [{"titulo": t} for t in ("Alpha headline one", "Beta headline two", "Gamma headline three")]
+        _traducir(noticias, _ClienteFalso(fallar_si="Gamma"), _memoria(tmp_path))
+        assert enviados == [2]
+        assert noticias[0]["titulo"] == "ES Alpha headline one" and not noticias[2].get("traducido")
@@ -22,8 +22,8 @@ class TestNormalizarUrl:
     def test_removes_trailing_slash(self):
         assert normalizar_url("https://example.com/") == "https://example.com"
 
-    def test_keeps_www(self):
-        assert normalizar_url("https://www.example.com") == "https://www.example.com"
+    def test_folds_www(self):
+        assert normalizar_url("https://www.example.com") == "https://example.com"
 
     def test_removes_utm(self):
         assert normalizar_url("https://example.com?utm_source=twitter") == "https://example.com"
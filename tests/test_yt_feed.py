@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+
+from scripts.scrapers.scraper_base import ChannelIdRepository, WebExtractor, YouTubeExtractor
+from scripts.utils.constants_downloadfile import (
+    BADGE_KEY, ENLACE_KEY, ID_VIDEO_KEY, ORIGEN_KEY, TIPO_KEY, TIPO_VAL_SHORTS, TIPO_VAL_VIDEO,
+)
+
+CANAL = "UCabcdefghijklmnopqrstuv"
+
+
+def _feed(entradas: list[tuple[str, str, datetime]]) -> str:
+    cuerpo = "".join(
+        f"<entry><title>{t}</title><link rel=\"alternate\" href=\"{l}\"/>"
+        f"<published>{p.isoformat()}</published></entry>"
+        for t, l, p in entradas
+    )
+    return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">{cuerpo}</feed>'
+
+
+class TestCanalId:
+    def test_desde_enlace_rss(self):
+        html = f'<link rel="alternate" type="application/rss+xml" href="https://www.youtube.com/feeds/videos.xml?channel_id={CANAL}">'
+        assert YouTubeExtractor.canal_id_desde_html(html) == CANAL
+
+    def test_desde_external_id(self):
+        assert YouTubeExtractor.canal_id_desde_html(f'{{"externalId":"{CANAL}"}}') == CANAL
+
+    def test_sin_id(self):
+        assert YouTubeExtractor.canal_id_desde_html("<html></html>") is None
+
+
+class TestChannelIdRepository:
+    def test_persistencia(self, tmp_path):
+        path = str(tmp_path / "ids.json")
+        repo = ChannelIdRepository(path)
+        repo.registrar("https://www.youtube.com/@c/videos", CANAL)
+        repo.guardar_si_cambio()
+        assert ChannelIdRepository(path).obtener("https://www.youtube.com/@c/videos") == CANAL
+
+    def test_id_en_url(self, tmp_path):
+        repo = ChannelIdRepository(str(tmp_path / "ids.json"))
+        assert repo.obtener(f"https://www.youtube.com/channel/{CANAL}/videos") == CANAL
+        assert repo.obtener("https://www.youtube.com/@otro/videos") is None
+
+
+class TestAdaptarFeed:
+    def test_items_de_video(self):
+        ahora = datetime.now(timezone.utc)
+        xml = _feed([
+            ("Nuevo vídeo de Python", "https://www.youtube.com/watch?v=abcdefghijk", ahora),
+            ("Un short", "https://www.youtube.com/shorts/ABCDEFGHIJK", ahora),
+            ("Vídeo antiguo", "https://www.youtube.com/watch?v=zzzzzzzzzzz", ahora - timedelta(days=60)),
+        ])
+        items = YouTubeExtractor().adaptar_items_feed(WebExtractor().extraer_rss(xml, "Canal"))
+        assert [i[ID_VIDEO_KEY] for i in items] == ["abcdefghijk", "ABCDEFGHIJK"]
+        assert [i[TIPO_KEY] for i in items] == [TIPO_VAL_VIDEO, TIPO_VAL_SHORTS]
+        assert items[1][ENLACE_KEY] == "https://www.youtube.com/watch?v=ABCDEFGHIJK"
+        assert all(BADGE_KEY not in i and ORIGEN_KEY not in i for i in items)
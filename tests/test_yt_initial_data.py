@@ -0,0 +1,104 @@
+import json
+
+from scripts.scrapers.scraper_base import YouTubeExtractor
+from scripts.scrapers.yt_initial_data import (
+    FinDeYtInitialData, extraer_yt_initial_data, fin_objeto, localizar_inicio,
+)
+
+
+def _video(i: int) -> dict:
+    return {"richItemRenderer": {"content": {"videoRenderer": {
+        "videoId": f"vid{i:04d}",
+        "title": {"runs": [{"text": f"Video {i} con llaves {{}} y \"comillas\""}]},
+        "publishedTimeText": {"simpleText": "hace 2 días"},
+    }}}}
+
+
+def _pagina(n_videos: int = 30) -> str:
+    data = {
+        "responseContext": {"relleno": "x" * 5000},
+        "contents": {"twoColumnBrowseResultsRenderer": {"tabs": [
+            {"tabRenderer": {"title": "Inicio"}},
+            {"tabRenderer": {"selected": True, "content": {"richGridRenderer": {
+                "contents": [_video(i) for i in range(n_videos)],
+            }}}},
+        ]}},
+    }
+    return (
+        "<html><head><script>var otra = {};</script></head><body>"
+        f"<script>var ytInitialData = {json.dumps(data)};</script>"
+        f"<script>var ytcfg = {{\"pie\": \"{'y' * 2000}\"}};</script></body></html>"
+    )
+
+
+class TestTokenizador:
+    def test_localiza_inicio(self):
+        texto = _pagina(1)
+        assert texto[localizar_inicio(texto)] == "{"
+
+    def test_sin_marcador(self):
+        assert localizar_inicio("<html></html>") == -1
+        assert extraer_yt_initial_data("<html></html>") is None
+
+    def test_fin_objeto_ignora_llaves_en_cadenas(self):
+        texto = 'x = {"a": "} { \\" }", "b": [1, {"c": 2}]}; resto'
+        inicio = texto.index("{")
+        assert json.loads(texto[inicio:fin_objeto(texto, inicio)]) == {"a": '} { " }', "b": [1, {"c": 2}]}
+
+    def test_objeto_incompleto(self):
+        assert fin_objeto('{"a": {"b": 1}', 0) == -1
+
+
+class TestExtraccion:
+    def test_via_rapida_limita_items(self):
+        data = extraer_yt_initial_data(_pagina(30), limite=10)
+        tabs = data["contents"]["twoColumnBrowseResultsRenderer"]["tabs"]
+        items = tabs[0]["tabRenderer"]["content"]["richGridRenderer"]["contents"]
+        assert len(items) == 10
+        assert items[0] == _video(0)
+
+    def test_via_completa_sin_lista_de_videos(self):
+        texto = '<script>var ytInitialData = {"header": {"t": "canal"}};</script>'
+        assert extraer_yt_initial_data(texto) == {"header": {"t": "canal"}}
+
+    def test_mismos_resultados_que_json_completo(self):
+        texto = _pagina(30)
+        inicio = localizar_inicio(texto)
+        completo = json.loads(texto[inicio:fin_objeto(texto, inicio)])
+        ext = YouTubeExtractor()
+        esperados = ext.extraer_desde_json(completo, "Canal", "https://www.youtube.com/@c/videos")
+        obtenidos = ext.extraer_desde_json(extraer_yt_initial_data(texto), "Canal", "https://www.youtube.com/@c/videos")
+        assert [r["id_video"] for r in obtenidos] == [r["id_video"] for r in esperados]
+        assert [r["titulo"] for r in obtenidos] == [r["titulo"] for r in esperados]
+
+
+class TestFinDeYtInitialData:
+    def test_para_tras_cerrar_script(self):
+        cuerpo = _pagina(5).encode("utf-8")
+        parar = FinDeYtInitialData()
+        buffer = bytearray()
+        paradas = []
+        for i in range(0, len(cuerpo), 100):
+            buffer.extend(cuerpo[i:i + 100])
+            if parar(buffer):
+                paradas.append(len(buffer))
+                break
+        assert paradas and paradas[0] < len(cuerpo)
+        assert extraer_yt_initial_data(buffer.decode("utf-8")) is not None
+
+    def test_sin_marcador_no_para(self):
+        parar = FinDeYtInitialData()
+        assert not parar(b"<html><script></script>")
+
+    def test_digest_no_depende_del_corte(self):
+        cuerpo = _pagina(5).encode("utf-8")
+        digests = set()
+        for trozo in (100, 1000, 4096):
+            parar = FinDeYtInitialData()
+            buffer = bytearray()
+            for i in range(0, len(cuerpo), trozo):
+                buffer.extend(cuerpo[i:i + trozo])
+                if parar(buffer):
+                    break
+            digests.add(parar.digest(bytes(buffer)))
+        assert len(digests) == 1